@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -47,6 +48,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Primero para medir el pedido completo; sin PERFILADO_PEDIDOS=1 se quita solo
+    'gestion_aerolinea.middleware.PerfilPedidosMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -81,12 +84,67 @@ WSGI_APPLICATION = 'aerolinea.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# El perfil se elige por entorno: DB_ENGINE=postgresql para producción, SQLite local por defecto.
+# Los PRAGMA de SQLite (WAL, busy_timeout, synchronous) se aplican en gestion_aerolinea.utils.basedatos.
+
+DB_ENGINE = os.environ.get('DB_ENGINE', 'sqlite')
+
+if DB_ENGINE == 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('DB_NAME', 'aerolinea'),
+            'USER': os.environ.get('DB_USER', 'aerolinea'),
+            'PASSWORD': os.environ.get('DB_PASSWORD', ''),
+            'HOST': os.environ.get('DB_HOST', 'localhost'),
+            'PORT': os.environ.get('DB_PORT', '5432'),
+            'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', '60')),
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                # Corta consultas colgadas en lugar de dejar conexiones y bloqueos tomados
+                'options': f"-c statement_timeout={int(os.environ.get('DB_STATEMENT_TIMEOUT_MS', '5000'))}",
+            },
+        }
     }
-}
+    if os.environ.get('DB_POOL_MAX'):
+        # El pool de psycopg reemplaza a las conexiones persistentes de Django
+        DATABASES['default']['CONN_MAX_AGE'] = 0
+        DATABASES['default']['OPTIONS']['pool'] = {
+            'min_size': int(os.environ.get('DB_POOL_MIN', '2')),
+            'max_size': int(os.environ['DB_POOL_MAX']),
+            'timeout': int(os.environ.get('DB_POOL_TIMEOUT', '10')),
+        }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('DB_NAME', BASE_DIR / 'db.sqlite3'),
+            # En archivo y no en memoria: los tests con varios hilos abren una conexión por hilo
+            'TEST': {'NAME': os.environ.get('DB_TEST_NAME', BASE_DIR / 'test_db.sqlite3')},
+        }
+    }
+
+SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', '5000'))
+
+# Caché para fragmentos que son iguales para todos los clientes (vuelos sugeridos, catálogo).
+# CACHE_BACKEND=locmem (por defecto, una por proceso) o file (compartida entre procesos, en CACHE_LOCATION).
+if os.environ.get('CACHE_BACKEND') == 'file':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.environ.get('CACHE_LOCATION', BASE_DIR / 'cache'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'aerolinea',
+        }
+    }
+
+# Ancho de cada franja de tiempo de las claves: un fragmento se recalcula al menos una vez por franja
+CACHE_FRAGMENTOS_SEGUNDOS = int(os.environ.get('CACHE_FRAGMENTOS_SEGUNDOS', '60'))
 
 
 # Password validation
@@ -156,3 +214,23 @@ EMAIL_USE_TLS = True
 DEFAULT_FROM_EMAIL = 'no-reply@tuaerolinea.com'
 
 
+
+# Minutos que una reserva pendiente retiene el asiento antes de vencer
+MINUTOS_RESERVA_PENDIENTE = int(os.environ.get('MINUTOS_RESERVA_PENDIENTE', '15'))
+
+# Barrido de reservas pendientes vencidas dentro del proceso web (segundos entre pasadas).
+# None lo desactiva; en ese caso correr `manage.py liberar_reservas_vencidas` desde cron.
+BARRIDO_RESERVAS_VENCIDAS_SEGUNDOS = None
+
+# Días hacia adelante hasta los que se generan los vuelos de los horarios recurrentes
+HORIZONTE_VUELOS_RECURRENTES_DIAS = 90
+
+# Designador IATA de la aerolínea en los pases de abordar (BCBP)
+DESIGNADOR_AEROLINEA = os.environ.get('DESIGNADOR_AEROLINEA', 'ZZ')
+
+# Perfilado de pedidos por vista (PERFILADO_PEDIDOS=1 lo activa). Las muestras viven en la memoria de cada proceso.
+PERFILADO_PEDIDOS = os.environ.get('PERFILADO_PEDIDOS') == '1'
+PERFILADO_MUESTRAS_POR_VISTA = 500
+# Fracción de pedidos que además corre con cProfile (0 lo desactiva); se guardan los más lentos
+PERFILADO_CPROFILE_FRACCION = float(os.environ.get('PERFILADO_CPROFILE_FRACCION', '0'))
+PERFILADO_CPROFILE_GUARDADOS = 10
@@ -1,17 +1,43 @@
 from django.contrib import admin
 from .models import (
+    Aeropuerto,
     Asiento, 
     Avion, 
     Boleto,
+    EmisionBoleto,
     Pasajero, 
     Reserva, 
+    ResumenAvion,
+    ResumenHorario,
+    SecuenciaCodigo,
     Vuelo, 
+    VueloRecurrente,
 )
+from .utils.codigos import filtro_codigo
+from .utils.exportaciones import exportar_reservas, respuesta_exportacion
+
+class BusquedaPorCodigoMixin:
+    campo_codigo = None
+
+    def get_search_results(self, request, queryset, search_term):
+        resultado, hay_duplicados = super().get_search_results(request, queryset, search_term)
+        # Un texto que pasa el dígito de control también puede ser un nombre o documento: se suman ambos
+        por_codigo = filtro_codigo(self.campo_codigo, search_term)
+        if por_codigo is not None:
+            resultado |= queryset.filter(por_codigo)
+        return resultado, hay_duplicados
+
 
 class AsientoInline(admin.TabularInline):
     model = Asiento
     extra = 0
 
+@admin.register(Aeropuerto)
+class AeropuertoAdmin(admin.ModelAdmin):
+    list_display = ('codigo_iata', 'nombre', 'ciudad')
+    search_fields = ('codigo_iata', 'nombre', 'ciudad')
+
+
 @admin.register(Avion)
 class AvionAdmin(admin.ModelAdmin):
     list_display = ('modelo', 'filas', 'columnas', 'capacidad')
@@ -42,14 +68,60 @@ class AsientoAdmin(admin.ModelAdmin):
 
 
 @admin.register(Reserva)
-class ReservaAdmin(admin.ModelAdmin):
+class ReservaAdmin(BusquedaPorCodigoMixin, admin.ModelAdmin):
     list_display = ('vuelo', 'pasajero', 'asiento', 'estado', 'fecha_reserva', 'precio_total', 'codigo_reserva')
     list_filter = ('estado', 'fecha_reserva')
     search_fields = ('codigo_reserva', 'pasajero__nombre', 'pasajero__apellido')
+    campo_codigo = 'codigo_reserva'
+    actions = ['exportar_csv', 'exportar_xlsx']
+
+    @admin.action(description="Exportar seleccionadas a CSV")
+    def exportar_csv(self, request, queryset):
+        return respuesta_exportacion('Reservas', 'csv', *exportar_reservas(queryset))
+
+    @admin.action(description="Exportar seleccionadas a Excel")
+    def exportar_xlsx(self, request, queryset):
+        return respuesta_exportacion('Reservas', 'xlsx', *exportar_reservas(queryset))
 
 
 @admin.register(Boleto)
-class BoletoAdmin(admin.ModelAdmin):
+class BoletoAdmin(BusquedaPorCodigoMixin, admin.ModelAdmin):
     list_display = ('reserva', 'codigo_barra', 'fecha_emision', 'estado')
     list_filter = ('estado',)
     search_fields = ('codigo_barra',)
+    campo_codigo = 'codigo_barra'
+
+
+@admin.register(EmisionBoleto)
+class EmisionBoletoAdmin(admin.ModelAdmin):
+    list_display = ('boleto', 'estado', 'intentos', 'proximo_intento', 'fecha_actualizacion')
+    list_filter = ('estado',)
+    search_fields = ('boleto__codigo_barra',)
+
+
+@admin.register(ResumenHorario)
+class ResumenHorarioAdmin(admin.ModelAdmin):
+    list_display = ('hora', 'aeropuerto_origen', 'aeropuerto_destino', 'reservas', 'confirmadas', 'canceladas', 'vencidas', 'recaudacion')
+    list_filter = ('hora',)
+
+
+@admin.register(ResumenAvion)
+class ResumenAvionAdmin(admin.ModelAdmin):
+    list_display = ('avion', 'asientos_ofrecidos', 'asientos_pendientes', 'asientos_confirmados')
+
+
+@admin.register(SecuenciaCodigo)
+class SecuenciaCodigoAdmin(admin.ModelAdmin):
+    list_display = ('nombre', 'siguiente')
+    readonly_fields = ('nombre', 'siguiente')
+
+
+@admin.register(VueloRecurrente)
+class VueloRecurrenteAdmin(admin.ModelAdmin):
+    list_display = (
+        'origen', 'destino', 'dias_semana', 'hora_salida', 'avion',
+        'vigente_desde', 'vigente_hasta', 'materializado_hasta', 'activo',
+    )
+    list_filter = ('activo', 'avion')
+    search_fields = ('origen', 'destino')
+    readonly_fields = ('materializado_hasta',)
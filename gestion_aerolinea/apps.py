@@ -1,7 +1,38 @@
+import os
+import sys
+
 from django.apps import AppConfig
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+
+
+def _atiende_pedidos():
+    # Con manage.py solo corre en el proceso de runserver que sirve pedidos, no en el vigilante del autoreload
+    if os.path.basename(sys.argv[0]) != 'manage.py':
+        return True
+    if 'runserver' not in sys.argv:
+        return False
+    return '--noreload' in sys.argv or os.environ.get('RUN_MAIN') == 'true'
 
 
 class GestionAerolineaConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'gestion_aerolinea'
-    
\ No newline at end of file
+
+    def ready(self):
+        from .utils.basedatos import configurar_sqlite
+        connection_created.connect(configurar_sqlite, dispatch_uid='configurar_sqlite')
+
+        from .utils.fragmentos import invalidar_vuelos_al_confirmar
+        for modelo in ('Vuelo', 'Avion'):
+            for nombre, senal in (('guardado', post_save), ('borrado', post_delete)):
+                senal.connect(
+                    invalidar_vuelos_al_confirmar, sender=self.get_model(modelo),
+                    dispatch_uid=f'invalidar_vuelos_{modelo}_{nombre}',
+                )
+
+        intervalo = getattr(settings, 'BARRIDO_RESERVAS_VENCIDAS_SEGUNDOS', None)
+        if intervalo and _atiende_pedidos():
+            from .utils.vencimientos import iniciar_barrido_periodico
+            iniciar_barrido_periodico(intervalo)
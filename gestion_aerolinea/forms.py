@@ -1,5 +1,6 @@
 from django import forms
-from .models import Avion, Pasajero, Reserva, Vuelo, Usuario
+from django.db.models import Q
+from .models import ESTADOS_RESERVA_ACTIVA, Avion, Pasajero, Reserva, Vuelo, Usuario
 from django.utils import timezone
 
 class ReservaForm(forms.ModelForm):
@@ -44,6 +45,38 @@ class PasajeroForm(forms.ModelForm):
         }
 
 
+# Reglas de VueloForm, compartidas con la importación masiva de horarios
+def validar_fecha_salida(fecha_salida, ahora=None):
+    if fecha_salida and fecha_salida < (ahora or timezone.now()):
+        raise forms.ValidationError(
+            "La fecha y hora de salida no pueden ser en el pasado."
+        )
+
+
+def validar_horario_vuelo(fecha_salida, fecha_llegada):
+    if fecha_salida and fecha_llegada:
+        if fecha_llegada <= fecha_salida:
+            raise forms.ValidationError(
+                "La fecha y hora de llegada no pueden ser iguales o anteriores a la de salida."
+            )
+
+
+def validar_cambio_avion(vuelo, avion):
+    # Las reservas activas conservan fila y columna; tienen que existir en el avión nuevo
+    if vuelo.pk is None or avion is None or avion.id == vuelo.avion_id:
+        return
+    fuera = list(
+        Reserva.objects.filter(vuelo=vuelo, estado__in=ESTADOS_RESERVA_ACTIVA)
+        .filter(Q(asiento__fila__gt=avion.filas) | Q(asiento__columna__gt=avion.columnas))
+        .values_list('asiento__numero', flat=True)
+        .order_by('asiento__fila', 'asiento__columna')[:10]
+    )
+    if fuera:
+        raise forms.ValidationError(
+            f"El avión {avion} no tiene los asientos ya reservados en este vuelo: {', '.join(fuera)}."
+        )
+
+
 class VueloForm(forms.ModelForm):
     class Meta:
         model = Vuelo
@@ -69,23 +102,16 @@ class VueloForm(forms.ModelForm):
     
     def clean_fecha_salida(self):
         fecha_salida = self.cleaned_data.get('fecha_salida')
-        if fecha_salida and fecha_salida < timezone.now():
-            raise forms.ValidationError(
-                "La fecha y hora de salida no pueden ser en el pasado."
-            )
+        validar_fecha_salida(fecha_salida)
         return fecha_salida
 
     def clean(self):
         cleaned_data = super().clean()
-        fecha_salida = cleaned_data.get("fecha_salida")
-        fecha_llegada = cleaned_data.get("fecha_llegada")
-
-        if fecha_salida and fecha_llegada:
-            if fecha_llegada <= fecha_salida:
-                raise forms.ValidationError(
-                    "La fecha y hora de llegada no pueden ser iguales o anteriores a la de salida."
-                )
-        
+        validar_horario_vuelo(cleaned_data.get("fecha_salida"), cleaned_data.get("fecha_llegada"))
+        try:
+            validar_cambio_avion(self.instance, cleaned_data.get("avion"))
+        except forms.ValidationError as error:
+            self.add_error('avion', error)
         return cleaned_data
 
 
@@ -105,4 +131,21 @@ class SeleccionarVueloForm(forms.Form):
         queryset=Vuelo.objects.all().order_by('fecha_salida', 'origen', 'destino'),
         label="Selecciona un vuelo",
         widget=forms.Select(attrs={'class': 'form-control'})
-    )
\ No newline at end of file
+    )
+
+class ImportarHorariosForm(forms.Form):
+    archivo = forms.FileField(
+        label="Archivo CSV o JSON",
+        widget=forms.ClearableFileInput(attrs={'class': 'form-control', 'accept': '.csv,.json'}),
+    )
+    todo_o_nada = forms.BooleanField(
+        label="No importar nada si alguna fila tiene errores",
+        required=False,
+        widget=forms.CheckboxInput(attrs={'class': 'form-check-input'}),
+    )
+
+    def clean_archivo(self):
+        archivo = self.cleaned_data['archivo']
+        if not archivo.name.lower().endswith(('.csv', '.json')):
+            raise forms.ValidationError("El archivo debe ser .csv o .json.")
+        return archivo
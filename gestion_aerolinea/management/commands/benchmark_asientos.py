@@ -0,0 +1,51 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from gestion_aerolinea.models import Asiento, Avion
+
+
+class Command(BaseCommand):
+    help = "Mide cuántos asientos por segundo se generan al guardar aviones grandes. No deja datos en la base."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--filas', type=int, default=60)
+        parser.add_argument('--columnas', type=int, default=10)
+        parser.add_argument('--aviones', type=int, default=20, help="Cantidad de aviones a crear por medición.")
+
+    def handle(self, *args, **options):
+        filas = options['filas']
+        columnas = options['columnas']
+        cantidad = options['aviones']
+
+        with transaction.atomic():
+            inicio = time.perf_counter()
+            aviones = [
+                Avion.objects.create(modelo=f"Benchmark {i}", filas=filas, columnas=columnas)
+                for i in range(cantidad)
+            ]
+            duracion_creacion = time.perf_counter() - inicio
+            creados = Asiento.objects.filter(avion__in=aviones).count()
+
+            # Agrandar y luego achicar cada avión ejercita la sincronización incremental
+            inicio = time.perf_counter()
+            for avion in aviones:
+                avion.filas = filas + 10
+                avion.save()
+                avion.filas = filas
+                avion.save()
+            duracion_cambios = time.perf_counter() - inicio
+
+            transaction.set_rollback(True)
+
+        self.stdout.write(f"Layout {filas}x{columnas}, {cantidad} aviones")
+        self.stdout.write(
+            f"Creación: {creados} asientos en {duracion_creacion:.3f}s "
+            f"({creados / duracion_creacion:,.0f} asientos/s)"
+        )
+        modificados = cantidad * 10 * columnas * 2
+        self.stdout.write(
+            f"Cambio de filas: {modificados} asientos agregados/borrados en {duracion_cambios:.3f}s "
+            f"({modificados / duracion_cambios:,.0f} asientos/s)"
+        )
@@ -0,0 +1,149 @@
+import random
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections, transaction
+from django.utils.crypto import get_random_string
+
+from gestion_aerolinea.models import SecuenciaCodigo
+from gestion_aerolinea.utils.basedatos import describir_conexion
+from gestion_aerolinea.utils.codigos import (
+    ALFABETO, LARGO_CODIGO, TAMANO_BLOQUE_CODIGOS, GeneradorCodigos, codificar, decodificar,
+)
+
+SECUENCIA = 'benchmark'
+LOTE_INSERTS = 5000
+
+
+class Command(BaseCommand):
+    help = (
+        "Genera millones de códigos de reserva desde varios hilos y mide códigos por segundo, viajes a la base, "
+        "decodificación, errores de tipeo detectados e inserts en un índice único contra códigos aleatorios. "
+        "No deja datos en la base."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--codigos', type=int, default=1_000_000)
+        parser.add_argument('--hilos', type=int, default=4)
+        parser.add_argument('--bloque', type=int, default=TAMANO_BLOQUE_CODIGOS, help="Números por bloque reservado.")
+        parser.add_argument('--insertar', type=int, default=200_000, help="Filas para comparar los inserts en el índice (0 lo omite).")
+        parser.add_argument('--semilla', type=int, default=0)
+
+    def handle(self, *args, **options):
+        if options['codigos'] < 1 or options['hilos'] < 1 or options['bloque'] < 1:
+            raise CommandError("--codigos, --hilos y --bloque deben ser positivos.")
+        self.stdout.write(f"Base de datos: {describir_conexion(connection)}")
+        SecuenciaCodigo.objects.filter(nombre=SECUENCIA).delete()
+        try:
+            generados = self.generar(options['codigos'], options['hilos'], options['bloque'])
+            self.decodificar(generados)
+            self.errores_tipeo(generados, random.Random(options['semilla']))
+            if options['insertar']:
+                self.insertar(generados[:options['insertar']], random.Random(options['semilla']))
+        finally:
+            SecuenciaCodigo.objects.filter(nombre=SECUENCIA).delete()
+
+    def generar(self, cantidad, hilos, bloque):
+        generador = GeneradorCodigos(SECUENCIA, tamano_bloque=bloque)
+        por_hilo = [cantidad // hilos + (i < cantidad % hilos) for i in range(hilos)]
+        resultados = [None] * hilos
+
+        def trabajar(indice):
+            try:
+                # Un código por llamada, como en una reserva de un asiento
+                resultados[indice] = [generador.siguiente() for _ in range(por_hilo[indice])]
+            finally:
+                connections.close_all()
+
+        inicio = time.perf_counter()
+        trabajadores = [threading.Thread(target=trabajar, args=(i,)) for i in range(hilos)]
+        for trabajador in trabajadores:
+            trabajador.start()
+        for trabajador in trabajadores:
+            trabajador.join()
+        duracion = time.perf_counter() - inicio
+        # Cada viaje a la base reservó exactamente un bloque
+        bloques = (SecuenciaCodigo.objects.get(nombre=SECUENCIA).siguiente - 1) // bloque
+
+        generados = [codigo for lista in resultados for codigo in lista]
+        unicos = len(set(generados))
+        self.stdout.write(
+            f"Generación: {len(generados):,} códigos desde {hilos} hilos en {duracion:.2f}s "
+            f"({len(generados) / duracion:,.0f} códigos/s), {bloques:,} viajes a la base "
+            f"(1 cada {len(generados) / max(bloques, 1):,.0f} códigos)"
+        )
+        if unicos != len(generados):
+            raise CommandError(f"Códigos repetidos: {len(generados) - unicos}")
+        # Cada hilo debe recibir sus códigos en orden creciente: así se insertan al final del índice
+        if any(lista != sorted(lista) for lista in resultados):
+            raise CommandError("Un hilo recibió códigos fuera de orden.")
+        self.stdout.write(f"Sin repetidos; el más largo tiene {max(map(len, generados))} caracteres.")
+        return sorted(generados)
+
+    def decodificar(self, generados):
+        inicio = time.perf_counter()
+        numeros = [decodificar(codigo) for codigo in generados]
+        duracion = time.perf_counter() - inicio
+        if [codificar(numero) for numero in numeros] != generados:
+            raise CommandError("Algún código no vuelve a su número.")
+        self.stdout.write(
+            f"Decodificación con verificación: {len(generados) / duracion:,.0f} códigos/s "
+            f"({duracion / len(generados) * 1e6:.2f} µs por código)"
+        )
+
+    def errores_tipeo(self, generados, azar):
+        muestra = azar.sample(generados, min(len(generados), 100_000))
+        sustituciones = transposiciones = detectadas_sustitucion = detectadas_transposicion = 0
+        for codigo in muestra:
+            caracteres = list(codigo)
+            posicion = azar.randrange(LARGO_CODIGO)
+            caracteres[posicion] = azar.choice(ALFABETO.replace(codigo[posicion], ''))
+            sustituciones += 1
+            detectadas_sustitucion += not self.es_valido(''.join(caracteres))
+
+            posicion = azar.randrange(LARGO_CODIGO - 1)
+            if codigo[posicion] != codigo[posicion + 1]:
+                caracteres = list(codigo)
+                caracteres[posicion], caracteres[posicion + 1] = caracteres[posicion + 1], caracteres[posicion]
+                transposiciones += 1
+                detectadas_transposicion += not self.es_valido(''.join(caracteres))
+        self.stdout.write(
+            f"Errores de tipeo detectados: {100 * detectadas_sustitucion / sustituciones:.2f} % de "
+            f"{sustituciones:,} caracteres cambiados, {100 * detectadas_transposicion / max(transposiciones, 1):.2f} % "
+            f"de {transposiciones:,} vecinos intercambiados"
+        )
+
+    def es_valido(self, codigo):
+        try:
+            decodificar(codigo)
+        except ValueError:
+            return False
+        return True
+
+    def insertar(self, secuenciales, azar):
+        aleatorios = [get_random_string(LARGO_CODIGO + 2, ALFABETO) for _ in secuenciales]
+        for nombre, valores in [('secuenciales', secuenciales), ('aleatorios', aleatorios)]:
+            if nombre == 'aleatorios':
+                azar.shuffle(valores)
+            duracion = self.insertar_en_indice(valores)
+            self.stdout.write(
+                f"Inserts en índice único, códigos {nombre}: {len(valores):,} filas en {duracion:.2f}s "
+                f"({len(valores) / duracion:,.0f} filas/s)"
+            )
+
+    def insertar_en_indice(self, valores):
+        # Tabla temporal con la misma forma que la columna de códigos; muere con la conexión
+        with connection.cursor() as cursor:
+            cursor.execute('DROP TABLE IF EXISTS benchmark_codigos')
+            cursor.execute('CREATE TEMPORARY TABLE benchmark_codigos (codigo varchar(20) NOT NULL UNIQUE)')
+            inicio = time.perf_counter()
+            for desde in range(0, len(valores), LOTE_INSERTS):
+                with transaction.atomic():
+                    cursor.executemany(
+                        'INSERT INTO benchmark_codigos (codigo) VALUES (%s)',
+                        [(valor,) for valor in valores[desde:desde + LOTE_INSERTS]],
+                    )
+            duracion = time.perf_counter() - inicio
+            cursor.execute('DROP TABLE benchmark_codigos')
+        return duracion
@@ -0,0 +1,290 @@
+import json
+import random
+import threading
+import time
+from datetime import timedelta
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+from django.utils import timezone, translation
+from django.utils.crypto import get_random_string
+
+from gestion_aerolinea.models import Aeropuerto, Avion, Pasajero, Reserva, Vuelo
+from gestion_aerolinea.utils.basedatos import describir_conexion
+from gestion_aerolinea.utils.perfilado import contar_consultas, nueva_muestra, percentil, perfilando
+from home.models import Usuario
+
+# Pasos del embudo de compra, en orden
+PASOS = ['buscar', 'detalles', 'cantidad_pasajeros', 'mapa_asientos', 'reservar', 'confirmar']
+
+
+class Command(BaseCommand):
+    help = (
+        "Carga aviones, vuelos, usuarios y pasajeros y recorre el embudo de compra (búsqueda → detalle → "
+        "pasajeros → asientos → reserva → confirmación) desde N clientes en paralelo. Informa pedidos por "
+        "segundo, latencias y consultas por paso, guarda el resultado en JSON y lo compara con una línea base. "
+        "Borra los datos al terminar."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clientes', type=int, default=8)
+        parser.add_argument('--iteraciones', type=int, default=10, help="Compras por cliente.")
+        parser.add_argument('--aviones', type=int, default=4)
+        parser.add_argument('--vuelos', type=int, default=20)
+        parser.add_argument('--rutas', type=int, default=4)
+        parser.add_argument('--filas', type=int, default=20)
+        parser.add_argument('--columnas', type=int, default=6)
+        parser.add_argument('--por-reserva', type=int, default=2, help="Pasajeros por compra.")
+        parser.add_argument('--semilla', type=int, default=None)
+        parser.add_argument('--salida', help="Archivo JSON donde guardar el resultado.")
+        parser.add_argument('--linea-base', help="Resultado JSON anterior contra el que comparar.")
+        parser.add_argument(
+            '--tolerancia', type=float, default=0.3,
+            help="Empeoramiento relativo admitido en la latencia p50 y en pedidos por segundo (0.3 = 30%%).",
+        )
+
+    def handle(self, *args, **options):
+        linea_base = None
+        if options['linea_base']:
+            with open(options['linea_base'], encoding='utf-8') as archivo:
+                linea_base = json.load(archivo)
+
+        prefijo = f"embudo_{get_random_string(6).lower()}"
+        azar = random.Random(options['semilla'])
+        # ALLOWED_HOSTS: el cliente de pruebas pide a 'testserver'
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']), \
+                translation.override(settings.LANGUAGES[0][0]):
+            try:
+                datos = self.sembrar(prefijo, options)
+                self.stdout.write(
+                    f"Datos: {options['aviones']} aviones, {len(datos['vuelos'])} vuelos, "
+                    f"{options['clientes']} clientes con {options['por_reserva']} pasajeros cada uno"
+                )
+                resultado = self.recorrer(datos, azar, options)
+            finally:
+                self.limpiar(prefijo)
+
+        self.mostrar(resultado)
+        if options['salida']:
+            with open(options['salida'], 'w', encoding='utf-8') as archivo:
+                json.dump(resultado, archivo, ensure_ascii=False, indent=2)
+            self.stdout.write(f"Resultado guardado en {options['salida']}")
+        if linea_base is not None:
+            regresiones = self.comparar(resultado, linea_base, options['tolerancia'])
+            if regresiones:
+                raise CommandError("Regresiones frente a la línea base: " + "; ".join(regresiones))
+            self.stdout.write(self.style.SUCCESS("Sin regresiones frente a la línea base."))
+
+    def sembrar(self, prefijo, options):
+        ciudades = [Aeropuerto.resolver(f"{prefijo} {i}") for i in range(options['rutas'] + 1)]
+        aviones = [
+            Avion.objects.create(modelo=f"{prefijo}-{i}", filas=options['filas'], columnas=options['columnas'])
+            for i in range(options['aviones'])
+        ]
+        ahora = timezone.now()
+        vuelos = []
+        for i in range(options['vuelos']):
+            # Cada ruta une dos ciudades consecutivas, así las búsquedas devuelven varios vuelos
+            ruta = i % options['rutas']
+            salida = ahora + timedelta(days=1 + i // options['rutas'], hours=ruta)
+            vuelos.append(Vuelo.objects.create(
+                origen=ciudades[ruta].ciudad, destino=ciudades[ruta + 1].ciudad,
+                fecha_salida=salida, fecha_llegada=salida + timedelta(hours=2),
+                estado='programado', precio_base=100, avion=aviones[i % len(aviones)],
+            ))
+        asientos = {avion.id: list(avion.asientos.values_list('id', flat=True)) for avion in aviones}
+
+        clientes = []
+        for i in range(options['clientes']):
+            usuario = Usuario.objects.create(username=f"{prefijo}_{i}", perfil='cliente')
+            pasajeros = Pasajero.objects.bulk_create(
+                Pasajero(
+                    usuario=usuario, nombre=f"Pasajero {j}", apellido=prefijo, tipo_documento='dni',
+                    numero_documento=f"{prefijo}{i}-{j}"[:20], email=f"{prefijo}@example.com",
+                    fecha_nacimiento='1990-01-01',
+                )
+                for j in range(options['por_reserva'])
+            )
+            clientes.append((usuario, [pasajero.id for pasajero in pasajeros]))
+        empleado = Usuario.objects.create(username=f"{prefijo}_empleado", perfil='empleado')
+        return {'vuelos': vuelos, 'asientos': asientos, 'clientes': clientes, 'empleado': empleado}
+
+    def recorrer(self, datos, azar, options):
+        por_reserva = options['por_reserva']
+        muestras = {paso: [] for paso in PASOS}
+        totales = {'reservas': 0, 'conflictos': 0, 'sin_lugar': 0}
+        tomados = {vuelo.id: set() for vuelo in datos['vuelos']}
+        bloqueo = threading.Lock()
+        url_reservas = reverse('ver_reservas_cliente')
+
+        def pedir(paso, cliente, metodo, url, datos_post=None):
+            muestra = nueva_muestra()
+            inicio = time.perf_counter()
+            try:
+                with perfilando(muestra), connection.execute_wrapper(contar_consultas):
+                    respuesta = getattr(cliente, metodo)(url, datos_post or {})
+                error = respuesta.status_code >= 400
+            except Exception:
+                respuesta, error = None, True
+            muestra['total_ms'] = (time.perf_counter() - inicio) * 1000
+            muestra['error'] = error
+            with bloqueo:
+                muestras[paso].append(muestra)
+            return respuesta
+
+        # Los hilos nuevos no heredan el idioma activo, que define el prefijo de las URLs
+        idioma = translation.get_language()
+
+        def comprar(usuario, pasajeros, azar_cliente):
+            cliente = Client()
+            cliente.force_login(usuario)
+            empleado = Client()
+            empleado.force_login(datos['empleado'])
+            try:
+                translation.activate(idioma)
+                for _ in range(options['iteraciones']):
+                    vuelo = azar_cliente.choice(datos['vuelos'])
+                    busqueda = urlencode({'origen': vuelo.origen, 'destino': vuelo.destino})
+                    pedir('buscar', cliente, 'get', f"{reverse('buscar_vuelos')}?{busqueda}")
+                    pedir('detalles', cliente, 'get', reverse('detalles_vuelo', args=[vuelo.id]))
+                    pedir('cantidad_pasajeros', cliente, 'post', reverse('seleccionar_pasajeros', args=[vuelo.id]),
+                          {'adultos': por_reserva, 'menores': 0})
+                    url_asientos = reverse('seleccionar_asiento', args=[vuelo.id])
+                    pedir('mapa_asientos', cliente, 'get', url_asientos)
+
+                    with bloqueo:
+                        libres = [a for a in datos['asientos'][vuelo.avion_id] if a not in tomados[vuelo.id]]
+                    if len(libres) < por_reserva:
+                        with bloqueo:
+                            totales['sin_lugar'] += 1
+                        continue
+                    elegidos = azar_cliente.sample(libres, por_reserva)
+                    respuesta = pedir('reservar', cliente, 'post', url_asientos, {
+                        'asientos': elegidos, 'pasajeros': pasajeros,
+                    })
+                    if respuesta is None or respuesta.get('Location') != url_reservas:
+                        with bloqueo:
+                            totales['conflictos'] += 1
+                        continue
+                    with bloqueo:
+                        tomados[vuelo.id].update(elegidos)
+                        totales['reservas'] += 1
+
+                    pendientes = Reserva.objects.filter(
+                        vuelo=vuelo, usuario_reserva=usuario, asiento_id__in=elegidos, estado='pendiente',
+                    ).values_list('id', flat=True)
+                    for reserva_id in list(pendientes):
+                        pedir('confirmar', empleado, 'post', reverse('confirmar_reserva_empleado', args=[reserva_id]))
+            finally:
+                translation.deactivate()
+                connection.close()
+
+        hilos = [
+            threading.Thread(target=comprar, args=(usuario, pasajeros, random.Random(azar.random())))
+            for usuario, pasajeros in datos['clientes']
+        ]
+        inicio = time.perf_counter()
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+        duracion = time.perf_counter() - inicio
+
+        pedidos = sum(len(lista) for lista in muestras.values())
+        return {
+            'fecha': timezone.now().isoformat(),
+            'base_datos': describir_conexion(connection),
+            'parametros': {
+                clave: options[clave] for clave in (
+                    'clientes', 'iteraciones', 'aviones', 'vuelos', 'rutas', 'filas', 'columnas', 'por_reserva',
+                )
+            },
+            'total': {
+                'pedidos': pedidos,
+                'errores': sum(muestra['error'] for lista in muestras.values() for muestra in lista),
+                'duracion_s': round(duracion, 3),
+                'pedidos_por_segundo': round(pedidos / duracion, 1) if duracion else 0,
+                **totales,
+            },
+            'pasos': {paso: self.resumir(lista, duracion) for paso, lista in muestras.items() if lista},
+        }
+
+    @staticmethod
+    def resumir(muestras, duracion):
+        latencias = sorted(muestra['total_ms'] for muestra in muestras)
+        consultas = sorted(muestra['consultas'] for muestra in muestras)
+        bd = sorted(muestra['bd_ms'] for muestra in muestras)
+        return {
+            'pedidos': len(muestras),
+            'errores': sum(muestra['error'] for muestra in muestras),
+            'pedidos_por_segundo': round(len(muestras) / duracion, 1) if duracion else 0,
+            'latencia_ms': {f'p{p}': round(percentil(latencias, p), 2) for p in (50, 95, 99)},
+            'consultas': {'min': consultas[0], 'p50': percentil(consultas, 50), 'max': consultas[-1]},
+            'bd_ms_p50': round(percentil(bd, 50), 2),
+        }
+
+    def limpiar(self, prefijo):
+        # Vuelos, asientos, reservas, boletos y resúmenes caen en cascada con aviones, usuarios y aeropuertos
+        Avion.objects.filter(modelo__startswith=prefijo).delete()
+        Usuario.objects.filter(username__startswith=prefijo).delete()
+        Aeropuerto.objects.filter(ciudad__startswith=prefijo).delete()
+
+    def mostrar(self, resultado):
+        total = resultado['total']
+        self.stdout.write(f"Base de datos: {resultado['base_datos']}")
+        self.stdout.write(
+            f"{total['pedidos']} pedidos en {total['duracion_s']}s ({total['pedidos_por_segundo']} pedidos/s), "
+            f"errores: {total['errores']}, reservas: {total['reservas']}, conflictos: {total['conflictos']}, "
+            f"sin lugar: {total['sin_lugar']}"
+        )
+        self.stdout.write(
+            f"  {'Paso':<20} {'Pedidos':>7} {'Ped/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} "
+            f"{'Consultas (mín/p50/máx)':>24}"
+        )
+        for paso, datos in resultado['pasos'].items():
+            latencia = datos['latencia_ms']
+            self.stdout.write(
+                f"  {paso:<20} {datos['pedidos']:>7} {datos['pedidos_por_segundo']:>8} {latencia['p50']:>9} "
+                f"{latencia['p95']:>9} {latencia['p99']:>9} "
+                f"{datos['consultas']['min']:>14} / {datos['consultas']['p50']} / {datos['consultas']['max']}"
+            )
+
+    def comparar(self, resultado, base, tolerancia):
+        if resultado['parametros'] != base.get('parametros'):
+            self.stdout.write(self.style.WARNING(
+                f"La línea base se midió con otros parámetros: {base.get('parametros')}"
+            ))
+        if resultado['base_datos'] != base.get('base_datos'):
+            self.stdout.write(self.style.WARNING(f"La línea base se midió contra {base.get('base_datos')}"))
+
+        regresiones = []
+        actual, anterior = resultado['total'], base['total']
+        if actual['pedidos_por_segundo'] < anterior['pedidos_por_segundo'] * (1 - tolerancia):
+            regresiones.append(
+                f"pedidos/s {actual['pedidos_por_segundo']} < {anterior['pedidos_por_segundo']}"
+            )
+        if actual['errores'] > anterior['errores']:
+            regresiones.append(f"errores {actual['errores']} > {anterior['errores']}")
+
+        # p50 y no p95: con pocas muestras por paso las colas varían demasiado entre corridas
+        self.stdout.write(f"  {'Paso':<20} {'p50 ms':>19} {'Consultas mín.':>15}")
+        for paso, datos in resultado['pasos'].items():
+            previo = base['pasos'].get(paso)
+            if previo is None:
+                continue
+            p50, p50_previo = datos['latencia_ms']['p50'], previo['latencia_ms']['p50']
+            consultas, consultas_previas = datos['consultas']['min'], previo['consultas']['min']
+            self.stdout.write(
+                f"  {paso:<20} {p50_previo:>8} → {p50:<8} {consultas_previas:>6} → {consultas:<6}"
+            )
+            if p50 > p50_previo * (1 + tolerancia):
+                regresiones.append(f"{paso}: p50 {p50} ms > {p50_previo} ms")
+            # El mínimo es el camino sin reintentos por contención: no depende de la carga
+            if consultas > consultas_previas:
+                regresiones.append(f"{paso}: {consultas} consultas > {consultas_previas}")
+        return regresiones
@@ -0,0 +1,86 @@
+import random
+import time
+from collections import Counter
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from gestion_aerolinea.models import Aeropuerto, Asiento, Boleto, Pasajero, Reserva, Vuelo
+from gestion_aerolinea.utils.codigos import codificar
+from gestion_aerolinea.utils.pase_abordar import ESCALA_PNG_QR, NIVEL_QR, datos_bcbp
+from gestion_aerolinea.utils.perfilado import percentil
+from gestion_aerolinea.utils.qr import NIVELES, codificar_qr
+
+NOMBRES = ['Ana', 'Juan', 'María José', 'Lucía', 'Martín', 'Sofía', 'Agustín', 'Valentina']
+APELLIDOS = ['Pérez', 'González', 'Fernández de la Torre', 'López', 'Martínez', 'Rodríguez', 'Núñez']
+AEROPUERTOS = ['AEP', 'EZE', 'COR', 'MDZ', 'BRC', 'IGR', 'USH', 'SLA']
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide el codificador QR de los pases de abordar: códigos por segundo, latencias y tamaño de las "
+        "imágenes SVG y PNG. Arma los pases en memoria, sin tocar la base ni el storage."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--codigos', type=int, default=2000)
+        parser.add_argument('--nivel', choices=list(NIVELES), default=NIVEL_QR)
+        parser.add_argument('--escala', type=int, default=ESCALA_PNG_QR, help="Píxeles por módulo en el PNG.")
+        parser.add_argument('--semilla', type=int, default=0)
+
+    def handle(self, *args, **options):
+        if options['codigos'] < 1 or options['escala'] < 1:
+            raise CommandError("--codigos y --escala deben ser positivos.")
+        azar = random.Random(options['semilla'])
+        pases = [datos_bcbp(self.boleto(azar, i)) for i in range(1, options['codigos'] + 1)]
+
+        tiempos = {'matriz': [], 'svg': [], 'png': []}
+        bytes_svg = bytes_png = 0
+        versiones = Counter()
+        inicio = time.perf_counter()
+        for datos in pases:
+            marca = time.perf_counter()
+            codigo = codificar_qr(datos, options['nivel'])
+            tiempos['matriz'].append(time.perf_counter() - marca)
+            marca = time.perf_counter()
+            bytes_svg += len(codigo.a_svg().encode())
+            tiempos['svg'].append(time.perf_counter() - marca)
+            marca = time.perf_counter()
+            bytes_png += len(codigo.a_png(escala=options['escala']))
+            tiempos['png'].append(time.perf_counter() - marca)
+            versiones[codigo.version] += 1
+        duracion = time.perf_counter() - inicio
+
+        cantidad = len(pases)
+        self.stdout.write(
+            f"{cantidad:,} pases de {min(map(len, pases))}-{max(map(len, pases))} caracteres, nivel {options['nivel']}; "
+            "versiones: " + ", ".join(f"{version} ({veces})" for version, veces in sorted(versiones.items()))
+        )
+        self.stdout.write(f"Total: {cantidad / duracion:,.0f} pases/s con matriz, SVG y PNG ({duracion:.2f}s)")
+        self.stdout.write(f"  {'Etapa':<8} {'Por seg.':>10} {'p50 ms':>8} {'p99 ms':>8}")
+        for etapa, valores in tiempos.items():
+            ordenados = sorted(valores)
+            self.stdout.write(
+                f"  {etapa:<8} {cantidad / sum(valores):>10,.0f} {percentil(ordenados, 50) * 1000:>8.2f} "
+                f"{percentil(ordenados, 99) * 1000:>8.2f}"
+            )
+        self.stdout.write(
+            f"Tamaño promedio: SVG {bytes_svg / cantidad:,.0f} bytes, PNG {bytes_png / cantidad:,.0f} bytes "
+            f"(escala {options['escala']})"
+        )
+
+    def boleto(self, azar, numero):
+        # Instancias sin guardar con la misma forma que las que arma la vista del boleto
+        salida = timezone.now() + timedelta(days=azar.randrange(1, 365), minutes=azar.randrange(0, 1440))
+        origen, destino = azar.sample(AEROPUERTOS, 2)
+        vuelo = Vuelo(
+            id=azar.randrange(1, 100_000), origen=origen, destino=destino, fecha_salida=salida,
+            aeropuerto_origen=Aeropuerto(codigo_iata=origen), aeropuerto_destino=Aeropuerto(codigo_iata=destino),
+        )
+        reserva = Reserva(
+            id=numero, vuelo=vuelo, codigo_reserva=codificar(numero),
+            pasajero=Pasajero(nombre=azar.choice(NOMBRES), apellido=azar.choice(APELLIDOS)),
+            asiento=Asiento(fila=azar.randrange(1, 60), columna=azar.randrange(1, 10), tipo='economica'),
+        )
+        return Boleto(id=numero, reserva=reserva, codigo_barra=codificar(numero))
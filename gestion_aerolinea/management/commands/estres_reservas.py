@@ -0,0 +1,131 @@
+import random
+import threading
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from django.utils import timezone
+from django.utils.crypto import get_random_string
+
+from gestion_aerolinea.models import Avion, Pasajero, Reserva, Vuelo
+from gestion_aerolinea.utils.basedatos import describir_conexion
+from gestion_aerolinea.utils.inventario import ESTADOS_OCUPADOS, InventarioAsientos, verificar_inventario
+from gestion_aerolinea.utils.reservas import reservar_asientos
+from home.models import Usuario
+
+
+class Command(BaseCommand):
+    help = (
+        "Llena un avión completo con reservas hechas desde N clientes en paralelo y verifica "
+        "que no haya asientos reservados dos veces ni capacidad perdida. Borra los datos al terminar."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clientes', type=int, default=8)
+        parser.add_argument('--filas', type=int, default=30)
+        parser.add_argument('--columnas', type=int, default=6)
+        parser.add_argument('--por-reserva', type=int, default=2, help="Asientos por cada reserva.")
+        parser.add_argument('--semilla', type=int, default=None)
+
+    def handle(self, *args, **options):
+        prefijo = f"estres_{get_random_string(6).lower()}"
+        azar = random.Random(options['semilla'])
+        por_reserva = options['por_reserva']
+
+        avion = Avion.objects.create(modelo=prefijo, filas=options['filas'], columnas=options['columnas'])
+        ahora = timezone.now()
+        vuelo = Vuelo.objects.create(
+            origen='Origen', destino='Destino',
+            fecha_salida=ahora + timedelta(days=7),
+            fecha_llegada=ahora + timedelta(days=7, hours=2),
+            estado='programado', precio_base=100, avion=avion,
+        )
+        clientes = []
+        for i in range(options['clientes']):
+            usuario = Usuario.objects.create(username=f"{prefijo}_{i}", perfil='cliente')
+            pasajeros = [
+                Pasajero.objects.create(
+                    usuario=usuario, nombre=f"Pasajero {j}", apellido=prefijo,
+                    tipo_documento='dni', numero_documento=f"{prefijo}{i}-{j}"[:20],
+                    email=f"{prefijo}@example.com", fecha_nacimiento='1990-01-01',
+                )
+                for j in range(por_reserva)
+            ]
+            clientes.append((usuario, pasajeros, random.Random(azar.random())))
+
+        asientos = list(avion.asientos.all())
+        totales = {'reservas': 0, 'asientos': 0, 'conflictos': 0, 'reintentos': 0}
+        bloqueo_totales = threading.Lock()
+
+        def cliente(usuario, pasajeros, azar_cliente):
+            try:
+                while True:
+                    estado = Vuelo.objects.select_related('avion').get(id=vuelo.id)
+                    if estado.asientos_libres <= 0:
+                        return
+                    inventario = InventarioAsientos.de_vuelo(estado)
+                    libres = [a for a in asientos if not inventario.ocupado(a.fila, a.columna)]
+                    if not libres:
+                        return
+                    elegidos = azar_cliente.sample(libres, min(por_reserva, len(libres)))
+                    resultado = reservar_asientos(
+                        vuelo, usuario,
+                        [(asiento.id, pasajero.id) for asiento, pasajero in zip(elegidos, pasajeros)]
+                    )
+                    with bloqueo_totales:
+                        totales['reintentos'] += resultado.intentos - 1
+                        if resultado.exito:
+                            totales['reservas'] += 1
+                            totales['asientos'] += len(resultado.reservas)
+                        else:
+                            totales['conflictos'] += 1
+            finally:
+                connection.close()
+
+        hilos = [threading.Thread(target=cliente, args=datos) for datos in clientes]
+        inicio = time.perf_counter()
+        try:
+            for hilo in hilos:
+                hilo.start()
+            for hilo in hilos:
+                hilo.join()
+            duracion = time.perf_counter() - inicio
+
+            vuelo.refresh_from_db()
+            activas = Reserva.objects.filter(vuelo=vuelo, estado__in=ESTADOS_OCUPADOS)
+            duplicados = activas.values('asiento').annotate(n=Count('id')).filter(n__gt=1).count()
+            ocupados = activas.count()
+            inventario = verificar_inventario(vuelo)
+
+            self.stdout.write(f"Base de datos: {describir_conexion(connection)}")
+            self.stdout.write(
+                f"{options['clientes']} clientes, avión {avion.filas}x{avion.columnas} "
+                f"({avion.capacidad} asientos) lleno en {duracion:.2f}s"
+            )
+            self.stdout.write(
+                f"Reservas: {totales['reservas']} ({totales['asientos'] / duracion:,.1f} asientos/s), "
+                f"conflictos: {totales['conflictos']}, reintentos: {totales['reintentos']}"
+            )
+
+            errores = []
+            if duplicados:
+                errores.append(f"{duplicados} asientos reservados más de una vez")
+            if ocupados != avion.capacidad or totales['asientos'] != ocupados:
+                errores.append(
+                    f"capacidad perdida: {ocupados} asientos reservados, "
+                    f"{totales['asientos']} informados, capacidad {avion.capacidad}"
+                )
+            if (
+                inventario['sin_marcar'] or inventario['marcados_sin_reserva'] or vuelo.asientos_libres != 0
+                or inventario['contadores_registrados'] != inventario['contadores_esperados']
+            ):
+                errores.append(f"inventario inconsistente: {inventario}")
+            if errores:
+                raise CommandError("; ".join(errores))
+
+            self.stdout.write(self.style.SUCCESS("Sin doble reserva ni capacidad perdida."))
+        finally:
+            avion.delete()
+            Usuario.objects.filter(username__startswith=prefijo).delete()
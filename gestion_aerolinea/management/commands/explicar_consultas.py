@@ -0,0 +1,83 @@
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from gestion_aerolinea.models import ESTADOS_RESERVA_ACTIVA, Pasajero, Reserva, ResumenHorario, Vuelo
+from gestion_aerolinea.utils.paginacion import TAMANO_PAGINA
+from gestion_aerolinea.utils.vencimientos import TAMANO_LOTE_VENCIMIENTOS, con_asientos_disponibles, reservas_vencidas
+
+# Recorridos completos de tabla, sin índice, según el motor
+RECORRIDO_COMPLETO = {
+    'sqlite': re.compile(r'\bSCAN (\w+)(?!\w| USING)'),
+    'postgresql': re.compile(r'Seq Scan on (\w+)'),
+}
+
+
+def consultas_frecuentes():
+    # Las mismas consultas que arman las vistas y utilidades, con valores de ejemplo
+    ahora = timezone.now()
+    pagina = TAMANO_PAGINA + 1
+    return [
+        ('Reservas del cliente', Reserva.objects.filter(usuario_reserva_id=1).order_by('-fecha_reserva')),
+        ('Reservas del cliente por estado',
+         Reserva.objects.filter(usuario_reserva_id=1, estado='pendiente').order_by('-fecha_reserva')),
+        ('Historial del cliente',
+         Reserva.objects.filter(usuario_reserva_id=1, estado='confirmada', vuelo__fecha_salida__lt=ahora)
+         .order_by('-vuelo__fecha_salida')),
+        ('Reservas activas del vuelo', Reserva.objects.filter(vuelo_id=1, estado__in=ESTADOS_RESERVA_ACTIVA)),
+        ('Asiento con reserva activa',
+         Reserva.objects.filter(vuelo_id=1, asiento_id=1, estado__in=ESTADOS_RESERVA_ACTIVA)),
+        ('Reporte de pasajeros', Reserva.objects.filter(vuelo_id=1, estado='confirmada')),
+        ('Reservas (empleado)', Reserva.objects.order_by('-fecha_reserva', '-id')[:pagina]),
+        ('Reservas por estado (empleado)',
+         Reserva.objects.filter(estado='pendiente').order_by('-fecha_reserva', '-id')[:pagina]),
+        ('Reservas vencidas', reservas_vencidas(ahora).order_by('expira_en', 'id')[:TAMANO_LOTE_VENCIMIENTOS]),
+        ('Vuelos próximos',
+         con_asientos_disponibles(Vuelo.objects.filter(fecha_salida__gte=ahora), ahora)
+         .order_by('fecha_salida', 'id')[:pagina]),
+        ('Vuelos (empleado)', con_asientos_disponibles(Vuelo.objects, ahora).order_by('-fecha_salida', '-id')[:pagina]),
+        ('Búsqueda de vuelos',
+         con_asientos_disponibles(
+             Vuelo.objects.filter(aeropuerto_origen_id__in=[1], aeropuerto_destino_id__in=[2], fecha_salida__gte=ahora),
+             ahora,
+         ).order_by('fecha_salida', 'id')[:pagina]),
+        ('Pasajeros del cliente', Pasajero.objects.filter(usuario_id=1).order_by('apellido', 'nombre')),
+        ('Pasajeros (empleado)', Pasajero.objects.order_by('apellido', 'nombre', 'id')[:pagina]),
+        ('Resúmenes del panel', ResumenHorario.objects.filter(hora__gte=ahora)),
+    ]
+
+
+class Command(BaseCommand):
+    help = "Muestra el plan (EXPLAIN) de las consultas frecuentes y falla si alguna recorre una tabla completa."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--detalle', action='store_true', help="Imprimir el plan completo de cada consulta.")
+
+    def handle(self, *args, **options):
+        patron = RECORRIDO_COMPLETO.get(connection.vendor)
+        if patron is None:
+            raise CommandError(f"El motor {connection.vendor} no está soportado por este chequeo.")
+
+        sin_indice = []
+        with transaction.atomic():
+            if connection.vendor == 'postgresql':
+                # Con tablas chicas el planificador prefiere Seq Scan; así se ve si hay un índice utilizable
+                with connection.cursor() as cursor:
+                    cursor.execute('SET LOCAL enable_seqscan = off')
+
+            for nombre, consulta in consultas_frecuentes():
+                plan = consulta.explain()
+                recorridos = patron.findall(plan)
+                estilo = self.style.ERROR if recorridos else self.style.SUCCESS
+                estado = f"recorre {', '.join(recorridos)} completa" if recorridos else "usa índice"
+                self.stdout.write(estilo(f"{nombre:<35} {estado}"))
+                if options['detalle'] or recorridos:
+                    for linea in plan.splitlines():
+                        self.stdout.write(f"    {linea}")
+                if recorridos:
+                    sin_indice.append(nombre)
+
+        if sin_indice:
+            raise CommandError("Consultas sin índice: " + ", ".join(sin_indice))
@@ -0,0 +1,372 @@
+import random
+import re
+import time
+from array import array
+from itertools import islice
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import DEFAULT_DB_ALIAS, connection, connections, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from gestion_aerolinea.models import Aeropuerto, Avion, Boleto, Pasajero, Reserva, Vuelo
+from gestion_aerolinea.utils.basedatos import describir_conexion
+from gestion_aerolinea.utils.fragmentos import invalidar_vuelos
+from gestion_aerolinea.utils.inventario import InventarioAsientos
+from gestion_aerolinea.utils.resumenes import recalcular_resumenes
+from gestion_aerolinea.utils.vencimientos import tiempo_reserva_pendiente
+from home.models import Usuario
+
+CIUDADES = [
+    'Buenos Aires', 'Córdoba', 'Mendoza', 'Rosario', 'Salta', 'Bariloche', 'Ushuaia', 'Neuquén',
+    'Tucumán', 'Iguazú', 'Mar del Plata', 'Comodoro Rivadavia', 'Jujuy', 'El Calafate', 'Trelew',
+    'Santiago', 'Montevideo', 'Asunción', 'Lima', 'São Paulo', 'Río de Janeiro', 'Bogotá', 'Madrid', 'Miami',
+]
+# (modelo, filas, columnas)
+FLOTA = [
+    ('Airbus A320', 30, 6),
+    ('Boeing 737-800', 31, 6),
+    ('Embraer E190', 25, 4),
+    ('Airbus A330', 40, 8),
+    ('Boeing 787-8', 36, 9),
+]
+NOMBRES = [
+    'Juan', 'María', 'Lucía', 'Martín', 'Sofía', 'Mateo', 'Valentina', 'Santiago', 'Camila', 'Benjamín',
+    'Martina', 'Joaquín', 'Julieta', 'Tomás', 'Catalina', 'Nicolás', 'Florencia', 'Facundo', 'Agustina', 'Diego',
+]
+APELLIDOS = [
+    'González', 'Rodríguez', 'Gómez', 'Fernández', 'López', 'Díaz', 'Martínez', 'Pérez', 'García', 'Sánchez',
+    'Romero', 'Sosa', 'Álvarez', 'Torres', 'Ruiz', 'Ramírez', 'Flores', 'Acosta', 'Benítez', 'Medina',
+]
+# Vuelos que se generan e insertan por transacción, con sus reservas y boletos
+VUELOS_POR_TRANSACCION = 500
+DIAS_ANTICIPACION_MAXIMA = 60
+# Columnas que el generador llena, en el orden de sus tuplas (el id va primero)
+CAMPOS_VUELO = [
+    'origen', 'destino', 'aeropuerto_origen', 'aeropuerto_destino', 'fecha_salida', 'fecha_llegada', 'duracion',
+    'estado', 'precio_base', 'avion', 'inventario_asientos', 'asientos_libres', 'asientos_pendientes',
+    'asientos_confirmados', 'recaudacion',
+]
+CAMPOS_RESERVA = [
+    'vuelo', 'pasajero', 'asiento', 'usuario_reserva', 'estado', 'fecha_reserva', 'expira_en', 'precio_total',
+    'codigo_reserva',
+]
+CAMPOS_BOLETO = ['reserva', 'codigo_barra', 'fecha_emision', 'estado']
+
+
+class Command(BaseCommand):
+    help = (
+        "Genera usuarios, pasajeros, aviones con sus asientos, vuelos, reservas y boletos sintéticos con "
+        "popularidad de rutas, ocupación y cancelaciones configurables. Con la misma semilla, prefijo y fecha "
+        "de referencia genera los mismos datos. Los contadores e inventarios de los vuelos quedan consistentes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--usuarios', type=int, default=10000)
+        parser.add_argument('--pasajeros-por-usuario', type=float, default=2.0, help="Promedio.")
+        parser.add_argument('--aviones', type=int, default=40)
+        parser.add_argument('--vuelos', type=int, default=5000)
+        parser.add_argument('--dias-pasados', type=int, default=180)
+        parser.add_argument('--dias-futuros', type=int, default=90)
+        parser.add_argument('--ocupacion', type=float, default=0.8, help="Factor de ocupación medio (0-1).")
+        parser.add_argument(
+            '--popularidad-rutas', type=float, default=1.1,
+            help="Exponente de la distribución de Zipf entre rutas (0 = todas iguales).",
+        )
+        parser.add_argument('--tasa-cancelacion', type=float, default=0.08, help="Fracción de reservas canceladas.")
+        parser.add_argument(
+            '--tasa-pendientes', type=float, default=0.05,
+            help="Fracción de las reservas activas de vuelos futuros que siguen pendientes.",
+        )
+        parser.add_argument('--semilla', type=int, default=0)
+        parser.add_argument('--prefijo', default='gen', help="Prefijo de usuarios, documentos y códigos generados.")
+        parser.add_argument('--fecha-referencia', help="Día tomado como hoy (AAAA-MM-DD); por defecto, hoy.")
+        parser.add_argument('--lote', type=int, default=5000, help="Filas por INSERT.")
+        parser.add_argument(
+            '--sin-resumenes', action='store_true',
+            help="No reconstruir los resúmenes del panel al terminar (correr recalcular_resumenes después).",
+        )
+
+    def handle(self, *args, **options):
+        prefijo = options['prefijo']
+        if not re.fullmatch(r'[a-z0-9]{1,6}', prefijo):
+            raise CommandError("El prefijo debe tener entre 1 y 6 letras minúsculas o números.")
+        if Usuario.objects.filter(username__startswith=f"{prefijo}_").exists():
+            raise CommandError(f"Ya hay datos generados con el prefijo '{prefijo}'; use otro.")
+        if options['vuelos'] and (options['usuarios'] < 1 or options['aviones'] < 1):
+            raise CommandError("Para generar vuelos hace falta al menos un usuario y un avión.")
+        if not 0 <= options['ocupacion'] <= 1 or not 0 <= options['tasa_cancelacion'] < 1:
+            raise CommandError("--ocupacion debe estar entre 0 y 1 y --tasa-cancelacion entre 0 y menos de 1.")
+
+        self.azar = random.Random(options['semilla'])
+        self.opciones = options
+        self.prefijo = prefijo
+        self.lote = options['lote']
+        if options['fecha_referencia']:
+            # Mediodía del día indicado: con la misma fecha las salidas y reservas se repiten exactas
+            self.ahora = timezone.make_aware(datetime.fromisoformat(options['fecha_referencia']).replace(hour=12))
+        else:
+            self.ahora = timezone.now()
+        self.plazo_pendiente = tiempo_reserva_pendiente()
+        self.filas = {}
+
+        self.stdout.write(f"Base de datos: {describir_conexion(connection)}")
+        inicio = time.perf_counter()
+        try:
+            self.medir('usuarios', self.generar_usuarios)
+            self.medir('pasajeros', self.generar_pasajeros)
+            self.medir('aviones y asientos', self.generar_aviones)
+            self.medir('vuelos, reservas y boletos', self.generar_vuelos)
+        finally:
+            # Los ids se asignaron a mano: las secuencias de PostgreSQL tienen que seguir desde el último
+            with connection.cursor() as cursor:
+                for sql in connection.ops.sequence_reset_sql(no_style(), [Usuario, Pasajero, Vuelo, Reserva, Boleto]):
+                    cursor.execute(sql)
+        duracion = time.perf_counter() - inicio
+        total = sum(self.filas.values())
+        self.stdout.write(
+            f"Total: {total:,} filas en {duracion:.1f}s ({total / duracion:,.0f} filas/s): "
+            + ", ".join(f"{modelo} {cantidad:,}" for modelo, cantidad in self.filas.items())
+        )
+
+        # Las inserciones directas no disparan señales ni pasan por los resúmenes incrementales
+        invalidar_vuelos()
+        if not options['sin_resumenes']:
+            inicio = time.perf_counter()
+            horas, aviones = recalcular_resumenes()
+            self.stdout.write(f"Resúmenes reconstruidos ({horas:,} horas-ruta, {aviones} aviones) en {time.perf_counter() - inicio:.1f}s")
+
+    def medir(self, etapa, funcion):
+        antes = sum(self.filas.values())
+        inicio = time.perf_counter()
+        funcion()
+        duracion = time.perf_counter() - inicio
+        filas = sum(self.filas.values()) - antes
+        self.stdout.write(f"  {etapa}: {filas:,} filas en {duracion:.1f}s ({filas / max(duracion, 1e-9):,.0f} filas/s)")
+
+    @staticmethod
+    def primer_id(modelo):
+        return (modelo.objects.aggregate(ultimo=Max('pk'))['ultimo'] or 0) + 1
+
+    def insertar(self, modelo, campos, filas):
+        # INSERT con executemany en lugar de bulk_create: armar una instancia por fila y prepararla campo por
+        # campo cuesta más que la inserción misma. Cada fila trae el id y los valores de `campos`, en orden;
+        # el resto de las columnas lleva su valor por defecto. Cada lote va en su propia transacción.
+        # La conexión real y no el proxy `connection`, que resuelve el hilo en cada acceso
+        conexion = connections[DEFAULT_DB_ALIAS]
+        meta = modelo._meta
+        columnas = [meta.pk] + [meta.get_field(campo) for campo in campos]
+        resto = [campo for campo in meta.concrete_fields if campo not in columnas]
+        fijos = tuple(campo.get_db_prep_save(campo.get_default(), conexion) for campo in resto)
+        adaptar = [
+            (indice, adaptador) for indice, campo in enumerate(columnas)
+            if (adaptador := self.adaptador(campo, conexion))
+        ]
+        nombres = ', '.join(conexion.ops.quote_name(campo.column) for campo in columnas + resto)
+        marcadores = ', '.join(['%s'] * (len(columnas) + len(resto)))
+        sql = f"INSERT INTO {conexion.ops.quote_name(meta.db_table)} ({nombres}) VALUES ({marcadores})"
+
+        filas = iter(filas)
+        while lote := list(islice(filas, self.lote)):
+            if adaptar:
+                valores = []
+                for fila in lote:
+                    fila = list(fila)
+                    for indice, adaptador in adaptar:
+                        if fila[indice] is not None:
+                            fila[indice] = adaptador(fila[indice])
+                    valores.append((*fila, *fijos))
+            else:
+                valores = [(*fila, *fijos) for fila in lote]
+            with transaction.atomic(), conexion.cursor() as cursor:
+                cursor.executemany(sql, valores)
+            self.filas[modelo.__name__] = self.filas.get(modelo.__name__, 0) + len(lote)
+
+    @staticmethod
+    def adaptador(campo, conexion):
+        # Lo mismo que get_db_prep_save sin las validaciones de cada valor, que el generador ya arma bien
+        tipo = campo.get_internal_type()
+        if tipo == 'DateTimeField':
+            return conexion.ops.adapt_datetimefield_value
+        if tipo == 'DateField':
+            return conexion.ops.adapt_datefield_value
+        if tipo == 'DecimalField':
+            return lambda valor: conexion.ops.adapt_decimalfield_value(valor, campo.max_digits, campo.decimal_places)
+        if tipo in ('DurationField', 'BinaryField'):
+            return lambda valor: campo.get_db_prep_save(valor, conexion)
+        return None
+
+    def generar_usuarios(self):
+        # Todos con la misma contraseña inutilizable: hashear una por usuario costaría más que insertarlos
+        clave = make_password(None)
+        azar = self.azar
+        self.primer_usuario = self.primer_id(Usuario)
+        self.cantidad_usuarios = self.opciones['usuarios']
+        self.insertar(
+            Usuario,
+            ['username', 'password', 'first_name', 'last_name', 'email', 'perfil', 'date_joined'],
+            (
+                (
+                    self.primer_usuario + i, f"{self.prefijo}_{i}", clave, azar.choice(NOMBRES), azar.choice(APELLIDOS),
+                    f"{self.prefijo}_{i}@example.com", 'cliente', self.ahora - timedelta(days=azar.randint(0, 3 * 365)),
+                )
+                for i in range(self.cantidad_usuarios)
+            ),
+        )
+
+    def generar_pasajeros(self):
+        # Los pasajeros de cada usuario tienen ids contiguos: los del usuario u van de
+        # inicio_pasajeros[u] a inicio_pasajeros[u + 1] (sin incluir), contados desde primer_pasajero
+        azar = self.azar
+        promedio = self.opciones['pasajeros_por_usuario']
+        self.primer_pasajero = self.primer_id(Pasajero)
+        self.inicio_pasajeros = array('q', [0])
+        for _ in range(self.cantidad_usuarios):
+            cantidad = max(1, round(azar.expovariate(1 / promedio))) if promedio > 1 else 1
+            self.inicio_pasajeros.append(self.inicio_pasajeros[-1] + cantidad)
+
+        def pasajeros():
+            for usuario in range(self.cantidad_usuarios):
+                for i in range(self.inicio_pasajeros[usuario], self.inicio_pasajeros[usuario + 1]):
+                    yield (
+                        self.primer_pasajero + i, self.primer_usuario + usuario, azar.choice(NOMBRES),
+                        azar.choice(APELLIDOS), 'dni', f"{self.prefijo}-{i}", f"{self.prefijo}_{usuario}@example.com",
+                        (self.ahora - timedelta(days=azar.randint(2 * 365, 85 * 365))).date(),
+                    )
+
+        self.insertar(
+            Pasajero,
+            ['usuario', 'nombre', 'apellido', 'tipo_documento', 'numero_documento', 'email', 'fecha_nacimiento'],
+            pasajeros(),
+        )
+
+    def generar_aviones(self):
+        # Pocas filas: pasan por Avion.save, que crea los asientos
+        self.aviones = []
+        for i in range(self.opciones['aviones']):
+            modelo, filas, columnas = FLOTA[i % len(FLOTA)]
+            avion = Avion.objects.create(modelo=f"{modelo} {self.prefijo}-{i:03d}", filas=filas, columnas=columnas)
+            # En orden fila por fila, el mismo que los bits del inventario
+            avion.ids_asientos = list(avion.asientos.order_by('fila', 'columna').values_list('id', flat=True))
+            self.aviones.append(avion)
+        self.filas['Avion'] = len(self.aviones)
+        self.filas['Asiento'] = sum(avion.capacidad for avion in self.aviones)
+
+    def rutas(self):
+        aeropuertos = [Aeropuerto.resolver(ciudad) for ciudad in CIUDADES]
+        rutas = [(origen, destino) for origen in aeropuertos for destino in aeropuertos if origen != destino]
+        self.azar.shuffle(rutas)
+        exponente = self.opciones['popularidad_rutas']
+        pesos = [1 / (posicion ** exponente) for posicion in range(1, len(rutas) + 1)]
+        # Duración y precio propios de cada ruta
+        datos = [
+            (origen, destino, timedelta(minutes=self.azar.randrange(60, 600, 5)), self.azar.randrange(50, 900))
+            for origen, destino in rutas
+        ]
+        return datos, pesos
+
+    def generar_vuelos(self):
+        azar = self.azar
+        opciones = self.opciones
+        rutas, pesos = self.rutas()
+        rutas_vuelos = azar.choices(rutas, weights=pesos, k=opciones['vuelos'])
+        primera_salida = self.ahora - timedelta(days=opciones['dias_pasados'])
+        rango = int(timedelta(days=opciones['dias_pasados'] + opciones['dias_futuros']).total_seconds() // 300)
+
+        self.siguiente_vuelo = self.primer_id(Vuelo)
+        self.siguiente_reserva = self.primer_id(Reserva)
+        self.siguiente_boleto = self.primer_id(Boleto)
+        for desde in range(0, len(rutas_vuelos), VUELOS_POR_TRANSACCION):
+            planes = [
+                self.planificar_vuelo(ruta, primera_salida + timedelta(minutes=5 * azar.randrange(rango)))
+                for ruta in rutas_vuelos[desde:desde + VUELOS_POR_TRANSACCION]
+            ]
+            reservas, boletos = [], []
+            for vuelo, plan in planes:
+                for reserva in self.reservas_vuelo(vuelo, plan):
+                    reservas.append(reserva)
+                    if reserva[5] == 'confirmada':
+                        boletos.append(self.boleto(reserva, salida=vuelo[5]))
+            # Los contadores de cada vuelo ya cuentan sus reservas: entran juntos o no entran
+            with transaction.atomic():
+                self.insertar(Vuelo, CAMPOS_VUELO, [vuelo for vuelo, _ in planes])
+                self.insertar(Reserva, CAMPOS_RESERVA, reservas)
+                self.insertar(Boleto, CAMPOS_BOLETO, boletos)
+
+    def planificar_vuelo(self, ruta, salida):
+        # Decide los asientos ocupados antes de insertar, así el vuelo entra con inventario y contadores finales
+        azar = self.azar
+        opciones = self.opciones
+        origen, destino, duracion, precio = ruta
+        avion = azar.choice(self.aviones)
+        capacidad = avion.capacidad
+        ya_salio = salida <= self.ahora
+
+        media = opciones['ocupacion']
+        ocupacion = azar.betavariate(media * 12, (1 - media) * 12) if 0 < media < 1 else media
+        if not ya_salio:
+            # Los vuelos lejanos todavía se están vendiendo
+            dias = (salida - self.ahora).days
+            ocupacion *= max(0.1, 1 - dias / DIAS_ANTICIPACION_MAXIMA) if dias < DIAS_ANTICIPACION_MAXIMA else 0.1
+        activos = azar.sample(range(capacidad), round(ocupacion * capacidad))
+        tasa = opciones['tasa_cancelacion']
+        canceladas = azar.choices(range(capacidad), k=round(len(activos) * tasa / (1 - tasa))) if activos else []
+        pendientes = 0 if ya_salio else round(len(activos) * opciones['tasa_pendientes'])
+
+        inventario = InventarioAsientos(avion.filas, avion.columnas)
+        for indice in activos:
+            fila, columna = divmod(indice, avion.columnas)
+            inventario.ocupar(fila + 1, columna + 1)
+        precio_base = Decimal(precio + azar.randint(-20, 20))
+        confirmados = len(activos) - pendientes
+        vuelo = (
+            self.siguiente_vuelo, origen.ciudad, destino.ciudad, origen.id, destino.id,
+            salida, salida + duracion, duracion, 'finalizado' if ya_salio else 'programado',
+            precio_base, avion.id, bytes(inventario),
+            capacidad - len(activos), pendientes, confirmados, precio_base * confirmados,
+        )
+        self.siguiente_vuelo += 1
+        # Los pendientes son los últimos en reservar
+        estados = ['confirmada'] * confirmados + ['pendiente'] * pendientes + ['cancelada'] * len(canceladas)
+        return vuelo, (avion, list(zip(activos + canceladas, estados)))
+
+    def reservas_vuelo(self, vuelo, plan):
+        azar = self.azar
+        avion, asientos = plan
+        vuelo_id, salida, precio = vuelo[0], vuelo[5], vuelo[9]
+        limite_venta = min(salida, self.ahora)
+        reservas = []
+        grupo, estado_grupo = 0, None
+        for indice, estado in asientos:
+            if grupo == 0 or estado != estado_grupo:
+                # Compras de 1 a 4 asientos hechas por el mismo usuario en el mismo momento
+                grupo, estado_grupo = azar.choice((1, 1, 1, 2, 2, 3, 4)), estado
+                usuario = azar.randrange(self.cantidad_usuarios)
+                primero, ultimo = self.inicio_pasajeros[usuario], self.inicio_pasajeros[usuario + 1]
+                if estado == 'pendiente':
+                    fecha = self.ahora - timedelta(seconds=azar.randrange(int(self.plazo_pendiente.total_seconds())))
+                else:
+                    fecha = limite_venta - timedelta(minutes=azar.randrange(DIAS_ANTICIPACION_MAXIMA * 24 * 60))
+            grupo -= 1
+            reservas.append((
+                self.siguiente_reserva, vuelo_id, self.primer_pasajero + azar.randrange(primero, ultimo),
+                avion.ids_asientos[indice], self.primer_usuario + usuario, estado, fecha,
+                fecha + self.plazo_pendiente if estado == 'pendiente' else None, precio,
+                # Largo distinto de los códigos que genera la aplicación (10), así no pueden coincidir
+                f"{self.prefijo.upper()}R{self.siguiente_reserva:012d}",
+            ))
+            self.siguiente_reserva += 1
+        return reservas
+
+    def boleto(self, reserva, salida):
+        boleto = (
+            self.siguiente_boleto, reserva[0], f"{self.prefijo.upper()}B{reserva[0]:012d}",
+            min(reserva[6] + timedelta(minutes=self.azar.randrange(1, 15)), self.ahora),
+            'usado' if salida <= self.ahora else 'emitido',
+        )
+        self.siguiente_boleto += 1
+        return boleto
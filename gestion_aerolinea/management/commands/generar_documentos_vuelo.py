@@ -0,0 +1,42 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from gestion_aerolinea.models import Vuelo
+from gestion_aerolinea.utils.lotes import documentos_vuelo, zip_en_streaming
+
+
+class Command(BaseCommand):
+    help = "Genera en un ZIP todos los boletos confirmados de un vuelo y su manifiesto de pasajeros."
+
+    def add_arguments(self, parser):
+        parser.add_argument('vuelo_id', type=int)
+        parser.add_argument('--salida', help="Ruta del ZIP a generar (por defecto Vuelo-<id>-documentos.zip).")
+        parser.add_argument('--procesos', type=int, default=None, help="Procesos para renderizar PDF (por defecto, uno por CPU).")
+        parser.add_argument('--url-base', default='http://127.0.0.1:8000/', help="URL usada para resolver recursos estáticos.")
+
+    def handle(self, *args, **options):
+        try:
+            vuelo = Vuelo.objects.select_related('avion').get(id=options['vuelo_id'])
+        except Vuelo.DoesNotExist:
+            raise CommandError(f"No existe el vuelo {options['vuelo_id']}.")
+
+        salida = options['salida'] or f"Vuelo-{vuelo.id}-documentos.zip"
+        cantidad = 0
+
+        def contar(documentos):
+            nonlocal cantidad
+            for documento in documentos:
+                cantidad += 1
+                yield documento
+
+        inicio = time.perf_counter()
+        with open(salida, 'wb') as archivo:
+            documentos = documentos_vuelo(vuelo, options['url_base'], options['procesos'])
+            for parte in zip_en_streaming(contar(documentos)):
+                archivo.write(parte)
+        duracion = time.perf_counter() - inicio
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{cantidad} documentos en {salida} ({duracion:.2f}s, {cantidad / duracion:,.1f} documentos/s)"
+        ))
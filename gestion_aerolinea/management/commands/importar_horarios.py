@@ -0,0 +1,48 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from gestion_aerolinea.utils.importacion import TAMANO_LOTE_IMPORTACION, importar_horario, leer_horario
+
+
+class Command(BaseCommand):
+    help = (
+        "Importa un horario de vuelos (y opcionalmente aviones) desde CSV o JSON, validando cada fila con las "
+        "mismas reglas que el alta manual e insertando por lotes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('archivo')
+        parser.add_argument('--lote', type=int, default=TAMANO_LOTE_IMPORTACION, help="Vuelos por bulk_create.")
+        parser.add_argument('--todo-o-nada', action='store_true', help="No importar nada si alguna fila tiene errores.")
+        parser.add_argument('--simular', action='store_true', help="Validar sin guardar.")
+        parser.add_argument('--max-errores', type=int, default=50, help="Errores a mostrar.")
+
+    def handle(self, *args, **options):
+        inicio = time.perf_counter()
+        try:
+            with open(options['archivo'], 'rb') as archivo:
+                aviones, filas = leer_horario(archivo, options['archivo'])
+                resultado = importar_horario(
+                    aviones, filas, lote=options['lote'],
+                    todo_o_nada=options['todo_o_nada'], simular=options['simular'],
+                )
+        except (OSError, ValueError) as error:
+            raise CommandError(str(error))
+        segundos = time.perf_counter() - inicio
+
+        for fila, mensaje in resultado.errores[:options['max_errores']]:
+            ubicacion = f"Fila {fila}" if isinstance(fila, int) else fila
+            self.stdout.write(self.style.ERROR(f"  {ubicacion}: {mensaje}"))
+        if len(resultado.errores) > options['max_errores']:
+            self.stdout.write(f"  ... y {len(resultado.errores) - options['max_errores']} errores más.")
+
+        resumen = (
+            f"{resultado.filas_leidas} filas leídas, {resultado.vuelos_creados} vuelos válidos, "
+            f"{resultado.vuelos_duplicados} ya cargados, "
+            f"{resultado.aviones_creados} aviones nuevos, {len(resultado.errores)} errores en {segundos:.2f}s"
+        )
+        if resultado.descartado:
+            self.stdout.write(self.style.WARNING(f"{resumen}. No se guardó nada."))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"{resumen}."))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from gestion_aerolinea.utils.vencimientos import TAMANO_LOTE_VENCIMIENTOS, liberar_reservas_vencidas
+
+
+class Command(BaseCommand):
+    help = "Libera los asientos de las reservas pendientes cuyo plazo venció. Pensado para correr desde cron."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=TAMANO_LOTE_VENCIMIENTOS, help="Reservas por transacción.")
+
+    def handle(self, *args, **options):
+        liberados = liberar_reservas_vencidas(options['lote'])
+        total = sum(liberados.values())
+        self.stdout.write(f"{total} asientos liberados de reservas vencidas en {len(liberados)} vuelos.")
+        for vuelo_id, cantidad in sorted(liberados.items()):
+            self.stdout.write(f"  Vuelo {vuelo_id}: {cantidad}")
@@ -0,0 +1,24 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from gestion_aerolinea.utils.recurrencias import fin_horizonte, materializar_vuelos_recurrentes
+
+
+class Command(BaseCommand):
+    help = (
+        "Genera los vuelos de los horarios recurrentes hasta el horizonte de reservas. Las búsquedas ya lo hacen "
+        "a demanda; correrlo desde cron deja los vuelos listos también para los listados de empleados."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dias', type=int, help="Horizonte en días (por defecto HORIZONTE_VUELOS_RECURRENTES_DIAS).")
+
+    def handle(self, *args, **options):
+        if options['dias'] is not None:
+            hasta = timezone.localdate() + timedelta(days=options['dias'])
+        else:
+            hasta = fin_horizonte()
+        creados = materializar_vuelos_recurrentes(hasta)
+        self.stdout.write(self.style.SUCCESS(f"{creados} vuelos generados hasta el {hasta:%d/%m/%Y}."))
@@ -0,0 +1,77 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import NoReverseMatch, reverse
+from django.utils import translation
+
+from gestion_aerolinea.utils.perfilado import METRICAS, perfiles_lentos, reiniciar_perfilado, resumen_perfilado
+from home.models import Usuario
+
+
+class Command(BaseCommand):
+    help = (
+        "Pide cada ruta (o nombre de URL sin argumentos) varias veces con el perfilado activo y muestra "
+        "p50/p95/p99 por vista. Corre en este proceso: las muestras del servidor web se ven en /empleado/perfilado/."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('rutas', nargs='+', help="Rutas como /cliente/vuelos/ o nombres de URL como panel_empleado.")
+        parser.add_argument('--usuario', help="Usuario con el que se inicia sesión.")
+        parser.add_argument('--repeticiones', type=int, default=20)
+        parser.add_argument(
+            '--cprofile', type=float, default=0,
+            help="Fracción de pedidos que corre con cProfile (1 = todos).",
+        )
+        parser.add_argument('--perfiles', type=int, default=1, help="Perfiles más lentos a mostrar.")
+
+    def handle(self, *args, **options):
+        # Sin setup_test_environment: su instrumentación de plantillas inflaría los tiempos
+        perfilado = override_settings(
+            PERFILADO_PEDIDOS=True,
+            PERFILADO_CPROFILE_FRACCION=options['cprofile'],
+            ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'],
+        )
+        with perfilado, translation.override(settings.LANGUAGES[0][0]):
+            rutas = [self.resolver(ruta) for ruta in options['rutas']]
+            reiniciar_perfilado()
+            cliente = Client()
+            if options['usuario']:
+                usuario = Usuario.objects.filter(username=options['usuario']).first()
+                if usuario is None:
+                    raise CommandError(f"No existe el usuario '{options['usuario']}'.")
+                cliente.force_login(usuario)
+            for ruta in rutas:
+                for _ in range(options['repeticiones']):
+                    respuesta = cliente.get(ruta)
+                    if respuesta.streaming:
+                        # Consumir el contenido para cerrar la respuesta y su cursor
+                        for _ in respuesta.streaming_content:
+                            pass
+                if respuesta.status_code >= 400:
+                    self.stderr.write(f"{ruta}: respuesta {respuesta.status_code}")
+            self.mostrar(resumen_perfilado(), perfiles_lentos()[:options['perfiles']])
+
+    def resolver(self, ruta):
+        if ruta.startswith('/'):
+            return ruta
+        try:
+            return reverse(ruta)
+        except NoReverseMatch:
+            raise CommandError(f"'{ruta}' no es una ruta ni un nombre de URL sin argumentos.")
+
+    def mostrar(self, resumen, perfiles):
+        ancho = max([len(vista) for vista in resumen] + [5])
+        self.stdout.write(f"{'Vista':<{ancho}}  {'Pedidos':>7}  " + "  ".join(f"{metrica:>26}" for metrica in METRICAS))
+        self.stdout.write(f"{'':<{ancho}}  {'':>7}  " + "  ".join(f"{'p50 / p95 / p99':>26}" for _ in METRICAS))
+        for vista, datos in resumen.items():
+            columnas = [
+                f"{datos[metrica]['p50']:.1f} / {datos[metrica]['p95']:.1f} / {datos[metrica]['p99']:.1f}"
+                for metrica in METRICAS
+            ]
+            self.stdout.write(f"{vista:<{ancho}}  {datos['pedidos']:>7}  " + "  ".join(f"{c:>26}" for c in columnas))
+
+        for perfil in perfiles:
+            self.stdout.write("")
+            self.stdout.write(self.style.MIGRATE_HEADING(f"{perfil['vista']} ({perfil['ruta']}): {perfil['total_ms']} ms"))
+            self.stdout.write(perfil['estadisticas'])
@@ -0,0 +1,21 @@
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+
+FILAS_PRESUPUESTO = [10, 1000, 10000]
+
+
+class Command(BaseCommand):
+    help = (
+        "Corre los tests de presupuesto de consultas de gestion_aerolinea.tests: carga N filas por tabla en "
+        "la base de tests y verifica con assertNumQueries que cada listado o reporte use siempre las mismas consultas."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--filas', type=int, nargs='+', choices=FILAS_PRESUPUESTO, default=FILAS_PRESUPUESTO)
+
+    def handle(self, *args, **options):
+        call_command(
+            'test',
+            *[f'gestion_aerolinea.tests.PresupuestoConsultas{filas}FilasTests' for filas in options['filas']],
+            verbosity=options['verbosity'],
+        )
@@ -0,0 +1,33 @@
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+from gestion_aerolinea.utils.emision import procesar_trabajo, tomar_trabajos
+
+
+class Command(BaseCommand):
+    help = "Worker que genera y envía por correo los boletos encolados al confirmar reservas."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hilos', type=int, default=4, help="Cantidad de envíos en paralelo.")
+        parser.add_argument('--lote', type=int, default=20, help="Trabajos tomados por vuelta.")
+        parser.add_argument('--intervalo', type=float, default=5, help="Segundos de espera cuando la cola está vacía.")
+        parser.add_argument('--una-vez', action='store_true', help="Procesar lo pendiente y terminar.")
+
+    def handle(self, *args, **options):
+        with ThreadPoolExecutor(max_workers=options['hilos']) as pool:
+            while True:
+                trabajos = tomar_trabajos(options['lote'])
+                if trabajos:
+                    resultados = Counter(pool.map(procesar_trabajo, trabajos))
+                    self.stdout.write(
+                        f"{len(trabajos)} boletos procesados: "
+                        + ", ".join(f"{estado} {cantidad}" for estado, cantidad in sorted(resultados.items()))
+                    )
+                    continue
+
+                if options['una_vez']:
+                    return
+                time.sleep(options['intervalo'])
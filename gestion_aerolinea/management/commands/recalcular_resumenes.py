@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from gestion_aerolinea.utils.resumenes import recalcular_resumenes
+
+
+class Command(BaseCommand):
+    help = (
+        "Reconstruye los resúmenes del panel de empleados desde las reservas. Correr una vez después de migrar "
+        "o si los resúmenes quedaron desfasados; después se mantienen solos con cada reserva."
+    )
+
+    def handle(self, *args, **options):
+        horas, aviones = recalcular_resumenes()
+        self.stdout.write(self.style.SUCCESS(f"{horas} resúmenes por hora y ruta, {aviones} resúmenes por avión."))
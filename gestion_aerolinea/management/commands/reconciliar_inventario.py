@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand
+
+from gestion_aerolinea.models import Vuelo
+from gestion_aerolinea.utils.inventario import reconstruir_inventario, verificar_inventario
+
+
+class Command(BaseCommand):
+    help = "Compara el inventario de asientos y los contadores de cada vuelo contra sus reservas."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--vuelo', type=int, help="Revisar solo el vuelo con este id.")
+        parser.add_argument('--reparar', action='store_true', help="Reconstruir inventario y contadores con diferencias.")
+
+    def handle(self, *args, **options):
+        vuelos = Vuelo.objects.select_related('avion').order_by('id')
+        if options['vuelo']:
+            vuelos = vuelos.filter(id=options['vuelo'])
+
+        revisados = 0
+        con_diferencias = 0
+        for vuelo in vuelos.iterator(chunk_size=200):
+            revisados += 1
+            resultado = verificar_inventario(vuelo)
+            consistente = (
+                not resultado['sin_marcar']
+                and not resultado['marcados_sin_reserva']
+                and resultado['libres_registrados'] == resultado['libres_esperados']
+                and resultado['contadores_registrados'] == resultado['contadores_esperados']
+            )
+            if consistente:
+                continue
+
+            con_diferencias += 1
+            self.stdout.write(self.style.WARNING(
+                f"Vuelo {vuelo.id}: reservados sin marcar {resultado['sin_marcar']}, "
+                f"marcados sin reserva {resultado['marcados_sin_reserva']}, "
+                f"libres {resultado['libres_registrados']} (esperado {resultado['libres_esperados']}), "
+                f"contadores {resultado['contadores_registrados']} (esperado {resultado['contadores_esperados']})"
+            ))
+            if options['reparar']:
+                reconstruir_inventario(vuelo)
+
+        accion = "reparados" if options['reparar'] else "con diferencias"
+        self.stdout.write(self.style.SUCCESS(f"{revisados} vuelos revisados, {con_diferencias} {accion}."))
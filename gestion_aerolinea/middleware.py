@@ -0,0 +1,47 @@
+import cProfile
+import time
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+
+from .utils.perfilado import (
+    capturar_cprofile, contar_consultas, guardar_perfil, instrumentar_plantillas, nueva_muestra, perfilando,
+    registrar_muestra,
+)
+
+
+class PerfilPedidosMiddleware:
+    # Registra por vista el tiempo total, las consultas, las plantillas y WeasyPrint de cada pedido.
+    # En respuestas en streaming solo se mide hasta armar la respuesta, no el envío del contenido.
+    def __init__(self, get_response):
+        if not settings.PERFILADO_PEDIDOS:
+            raise MiddlewareNotUsed
+        instrumentar_plantillas()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        muestra = nueva_muestra()
+        perfil = cProfile.Profile() if capturar_cprofile() else None
+        if perfil is not None:
+            try:
+                perfil.enable()
+            except ValueError:
+                # Ya hay otro perfilador activo
+                perfil = None
+
+        inicio = time.perf_counter()
+        try:
+            with perfilando(muestra), connection.execute_wrapper(contar_consultas):
+                response = self.get_response(request)
+        finally:
+            if perfil is not None:
+                perfil.disable()
+        muestra['total_ms'] = (time.perf_counter() - inicio) * 1000
+
+        coincidencia = getattr(request, 'resolver_match', None)
+        vista = coincidencia.view_name if coincidencia and coincidencia.view_name else f'sin_nombre:{response.status_code}'
+        registrar_muestra(vista, muestra)
+        if perfil is not None:
+            guardar_perfil(vista, request.path, muestra['total_ms'], perfil)
+        return response
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.4 on 2026-10-18 15:27
+
+from django.db import migrations, models
+
+
+def construir_inventarios(apps, schema_editor):
+    Vuelo = apps.get_model('gestion_aerolinea', 'Vuelo')
+    Reserva = apps.get_model('gestion_aerolinea', 'Reserva')
+
+    for vuelo in Vuelo.objects.select_related('avion'):
+        columnas = vuelo.avion.columnas
+        bits = bytearray((vuelo.avion.filas * columnas + 7) // 8)
+        posiciones = Reserva.objects.filter(
+            vuelo=vuelo,
+            estado__in=['confirmada', 'pendiente'],
+        ).values_list('asiento__fila', 'asiento__columna')
+        ocupados = 0
+        for fila, columna in posiciones:
+            indice = (fila - 1) * columnas + (columna - 1)
+            if not bits[indice >> 3] & (1 << (indice & 7)):
+                bits[indice >> 3] |= 1 << (indice & 7)
+                ocupados += 1
+        vuelo.inventario_asientos = bytes(bits)
+        vuelo.asientos_libres = vuelo.avion.capacidad - ocupados
+        vuelo.save(update_fields=['inventario_asientos', 'asientos_libres'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gestion_aerolinea', '0013_vuelo_imagen'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='vuelo',
+            name='asientos_libres',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='vuelo',
+            name='inventario_asientos',
+            field=models.BinaryField(default=b''),
+        ),
+        migrations.RunPython(construir_inventarios, migrations.RunPython.noop),
+    ]
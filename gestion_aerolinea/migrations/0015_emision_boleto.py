@@ -0,0 +1,33 @@
+# Generated by Django 5.2.4 on 2026-10-18 15:31
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gestion_aerolinea', '0014_vuelo_inventario_asientos'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmisionBoleto',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('estado', models.CharField(choices=[('pendiente', 'Pendiente'), ('procesando', 'Procesando'), ('enviado', 'Enviado'), ('fallido', 'Fallido')], default='pendiente', max_length=20)),
+                ('url_base', models.CharField(max_length=200)),
+                ('intentos', models.IntegerField(default=0)),
+                ('proximo_intento', models.DateTimeField(default=django.utils.timezone.now)),
+                ('tomado_por', models.CharField(blank=True, max_length=32)),
+                ('ultimo_error', models.TextField(blank=True)),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True)),
+                ('fecha_actualizacion', models.DateTimeField(auto_now=True)),
+                ('boleto', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='emision', to='gestion_aerolinea.boleto')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['estado', 'proximo_intento'], name='emision_estado_proximo')],
+            },
+        ),
+    ]
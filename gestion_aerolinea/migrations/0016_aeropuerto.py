@@ -0,0 +1,106 @@
+# Generated by Django 5.2.4 on 2026-10-18 15:33
+
+import django.db.models.deletion
+import unicodedata
+
+from django.db import migrations, models
+
+
+AEROPUERTOS = [
+    ('AEP', 'Aeroparque Jorge Newbery', 'Buenos Aires'),
+    ('EZE', 'Aeropuerto Internacional Ministro Pistarini', 'Buenos Aires'),
+    ('COR', 'Aeropuerto Internacional Ingeniero Ambrosio Taravella', 'Córdoba'),
+    ('MDZ', 'Aeropuerto Internacional El Plumerillo', 'Mendoza'),
+    ('LUQ', 'Aeropuerto Brigadier Mayor César Raúl Ojeda', 'San Luis'),
+    ('ROS', 'Aeropuerto Internacional Islas Malvinas', 'Rosario'),
+    ('BRC', 'Aeropuerto Internacional Teniente Luis Candelaria', 'San Carlos de Bariloche'),
+    ('SLA', 'Aeropuerto Internacional Martín Miguel de Güemes', 'Salta'),
+    ('TUC', 'Aeropuerto Internacional Teniente General Benjamín Matienzo', 'San Miguel de Tucumán'),
+    ('NQN', 'Aeropuerto Internacional Presidente Perón', 'Neuquén'),
+    ('IGR', 'Aeropuerto Internacional Cataratas del Iguazú', 'Puerto Iguazú'),
+    ('USH', 'Aeropuerto Internacional Malvinas Argentinas', 'Ushuaia'),
+    ('FTE', 'Aeropuerto Internacional Comandante Armando Tola', 'El Calafate'),
+    ('MDQ', 'Aeropuerto Internacional Astor Piazzolla', 'Mar del Plata'),
+    ('UAQ', 'Aeropuerto Domingo Faustino Sarmiento', 'San Juan'),
+    ('SCL', 'Aeropuerto Internacional Arturo Merino Benítez', 'Santiago de Chile'),
+    ('MVD', 'Aeropuerto Internacional de Carrasco', 'Montevideo'),
+    ('GRU', 'Aeropuerto Internacional de Guarulhos', 'São Paulo'),
+]
+
+
+def normalizar(texto):
+    sin_acentos = unicodedata.normalize('NFKD', texto or '')
+    sin_acentos = ''.join(c for c in sin_acentos if not unicodedata.combining(c))
+    return ' '.join(sin_acentos.casefold().split())
+
+
+def cargar_aeropuertos(apps, schema_editor):
+    Aeropuerto = apps.get_model('gestion_aerolinea', 'Aeropuerto')
+    Vuelo = apps.get_model('gestion_aerolinea', 'Vuelo')
+
+    for codigo, nombre, ciudad in AEROPUERTOS:
+        Aeropuerto.objects.get_or_create(
+            codigo_iata=codigo,
+            defaults={'nombre': nombre, 'ciudad': ciudad, 'clave_busqueda': normalizar(ciudad)},
+        )
+
+    resueltos = {}
+
+    def resolver(texto):
+        clave = normalizar(texto)
+        if clave not in resueltos:
+            aeropuerto = (
+                Aeropuerto.objects.filter(models.Q(clave_busqueda=clave) | models.Q(codigo_iata=texto.strip().upper()))
+                .order_by('codigo_iata').first()
+            )
+            if aeropuerto is None:
+                aeropuerto = Aeropuerto.objects.create(ciudad=texto.strip(), clave_busqueda=clave)
+            resueltos[clave] = aeropuerto
+        return resueltos[clave]
+
+    for vuelo in Vuelo.objects.all():
+        vuelo.aeropuerto_origen = resolver(vuelo.origen)
+        vuelo.aeropuerto_destino = resolver(vuelo.destino)
+        vuelo.save(update_fields=['aeropuerto_origen', 'aeropuerto_destino'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gestion_aerolinea', '0015_emision_boleto'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Aeropuerto',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('codigo_iata', models.CharField(blank=True, max_length=3, null=True, unique=True)),
+                ('nombre', models.CharField(blank=True, max_length=100)),
+                ('ciudad', models.CharField(max_length=100)),
+                ('clave_busqueda', models.CharField(db_index=True, editable=False, max_length=100)),
+            ],
+            options={
+                'ordering': ['ciudad', 'codigo_iata'],
+            },
+        ),
+        migrations.AddField(
+            model_name='vuelo',
+            name='aeropuerto_destino',
+            field=models.ForeignKey(db_index=False, editable=False, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='vuelos_llegada', to='gestion_aerolinea.aeropuerto'),
+        ),
+        migrations.AddField(
+            model_name='vuelo',
+            name='aeropuerto_origen',
+            field=models.ForeignKey(db_index=False, editable=False, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='vuelos_salida', to='gestion_aerolinea.aeropuerto'),
+        ),
+        migrations.AddIndex(
+            model_name='vuelo',
+            index=models.Index(fields=['aeropuerto_origen', 'aeropuerto_destino', 'fecha_salida'], name='vuelo_ruta_salida'),
+        ),
+        migrations.AddIndex(
+            model_name='vuelo',
+            index=models.Index(fields=['aeropuerto_destino', 'fecha_salida'], name='vuelo_destino_salida'),
+        ),
+        migrations.RunPython(cargar_aeropuertos, migrations.RunPython.noop),
+    ]
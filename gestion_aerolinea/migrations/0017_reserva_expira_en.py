@@ -0,0 +1,40 @@
+# Generated by Django 5.2.4 on 2026-10-18 15:39
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def dar_plazo_a_pendientes(apps, schema_editor):
+    # Las reservas pendientes previas reciben el plazo completo desde ahora en lugar de vencer de golpe
+    Reserva = apps.get_model('gestion_aerolinea', 'Reserva')
+    minutos = getattr(settings, 'MINUTOS_RESERVA_PENDIENTE', 15)
+    Reserva.objects.filter(estado='pendiente').update(expira_en=timezone.now() + timedelta(minutes=minutos))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gestion_aerolinea', '0016_aeropuerto'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reserva',
+            name='expira_en',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AlterField(
+            model_name='reserva',
+            name='estado',
+            field=models.CharField(choices=[('pendiente', 'Pendiente'), ('confirmada', 'Confirmada'), ('cancelada', 'Cancelada'), ('vencida', 'Vencida')], default='pendiente', max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='reserva',
+            index=models.Index(condition=models.Q(('estado', 'pendiente')), fields=['expira_en'], name='reserva_pendiente_expira'),
+        ),
+        migrations.RunPython(dar_plazo_a_pendientes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 5.2.4 on 2026-10-18 15:41
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gestion_aerolinea', '0017_reserva_expira_en'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='reserva',
+            unique_together=set(),
+        ),
+        migrations.AlterField(
+            model_name='pasajero',
+            name='usuario',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='pasajeros_creados', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='reserva',
+            name='usuario_reserva',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='reservas_creadas', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='reserva',
+            name='vuelo',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='reservas', to='gestion_aerolinea.vuelo'),
+        ),
+        migrations.AddIndex(
+            model_name='pasajero',
+            index=models.Index(fields=['usuario', 'apellido', 'nombre'], name='pasajero_usuario_nombre'),
+        ),
+        migrations.AddIndex(
+            model_name='pasajero',
+            index=models.Index(fields=['apellido', 'nombre', 'id'], name='pasajero_nombre'),
+        ),
+        migrations.AddIndex(
+            model_name='reserva',
+            index=models.Index(fields=['vuelo', 'estado'], name='reserva_vuelo_estado'),
+        ),
+        migrations.AddIndex(
+            model_name='reserva',
+            index=models.Index(fields=['usuario_reserva', '-fecha_reserva'], name='reserva_usuario_fecha'),
+        ),
+        migrations.AddIndex(
+            model_name='reserva',
+            index=models.Index(fields=['usuario_reserva', 'estado', '-fecha_reserva'], name='reserva_usuario_estado_fecha'),
+        ),
+        migrations.AddIndex(
+            model_name='reserva',
+            index=models.Index(fields=['-fecha_reserva', '-id'], name='reserva_fecha'),
+        ),
+        migrations.AddIndex(
+            model_name='reserva',
+            index=models.Index(fields=['estado', '-fecha_reserva', '-id'], name='reserva_estado_fecha'),
+        ),
+        migrations.AddIndex(
+            model_name='vuelo',
+            index=models.Index(fields=['fecha_salida', 'id'], name='vuelo_salida'),
+        ),
+        migrations.AddConstraint(
+            model_name='reserva',
+            constraint=models.UniqueConstraint(condition=models.Q(('estado__in', ['confirmada', 'pendiente'])), fields=('vuelo', 'asiento'), name='reserva_asiento_activo'),
+        ),
+    ]
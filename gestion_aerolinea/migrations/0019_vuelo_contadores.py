@@ -0,0 +1,47 @@
+# Generated by Django 5.2.4 on 2026-10-18 15:44
+
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+
+
+def calcular_contadores(apps, schema_editor):
+    Vuelo = apps.get_model('gestion_aerolinea', 'Vuelo')
+    Reserva = apps.get_model('gestion_aerolinea', 'Reserva')
+
+    totales = Reserva.objects.values('vuelo_id').annotate(
+        pendientes=Count('id', filter=Q(estado='pendiente')),
+        confirmados=Count('id', filter=Q(estado='confirmada')),
+        recaudacion=Sum('precio_total', filter=Q(estado='confirmada'), default=0),
+    )
+    for total in totales:
+        Vuelo.objects.filter(id=total['vuelo_id']).update(
+            asientos_pendientes=total['pendientes'],
+            asientos_confirmados=total['confirmados'],
+            recaudacion=total['recaudacion'],
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gestion_aerolinea', '0018_indices_consultas'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='vuelo',
+            name='asientos_confirmados',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='vuelo',
+            name='asientos_pendientes',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='vuelo',
+            name='recaudacion',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=12),
+        ),
+        migrations.RunPython(calcular_contadores, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.4 on 2026-10-18 15:48
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gestion_aerolinea', '0019_vuelo_contadores'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumenAvion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('asientos_ofrecidos', models.IntegerField(default=0)),
+                ('asientos_pendientes', models.IntegerField(default=0)),
+                ('asientos_confirmados', models.IntegerField(default=0)),
+                ('avion', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='resumen', to='gestion_aerolinea.avion')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ResumenHorario',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hora', models.DateTimeField()),
+                ('reservas', models.IntegerField(default=0)),
+                ('confirmadas', models.IntegerField(default=0)),
+                ('canceladas', models.IntegerField(default=0)),
+                ('vencidas', models.IntegerField(default=0)),
+                ('recaudacion', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('aeropuerto_destino', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='gestion_aerolinea.aeropuerto')),
+                ('aeropuerto_origen', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='gestion_aerolinea.aeropuerto')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('hora', 'aeropuerto_origen', 'aeropuerto_destino'), name='resumen_hora_ruta')],
+            },
+        ),
+    ]
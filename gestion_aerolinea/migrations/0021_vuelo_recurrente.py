@@ -0,0 +1,42 @@
+# Generated by Django 5.2.4 on 2026-10-18 15:58
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gestion_aerolinea', '0020_resumenes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VueloRecurrente',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('origen', models.CharField(max_length=100)),
+                ('destino', models.CharField(max_length=100)),
+                ('dias_semana', models.CharField(help_text='Días en que opera, 1 = lunes … 7 = domingo. Ej.: 135 para lunes, miércoles y viernes.', max_length=7)),
+                ('hora_salida', models.TimeField()),
+                ('duracion', models.DurationField()),
+                ('precio_base', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('vigente_desde', models.DateField()),
+                ('vigente_hasta', models.DateField()),
+                ('activo', models.BooleanField(default=True)),
+                ('materializado_hasta', models.DateField(blank=True, editable=False, null=True)),
+                ('aeropuerto_destino', models.ForeignKey(editable=False, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='gestion_aerolinea.aeropuerto')),
+                ('aeropuerto_origen', models.ForeignKey(editable=False, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='gestion_aerolinea.aeropuerto')),
+                ('avion', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recurrencias', to='gestion_aerolinea.avion')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='vuelo',
+            name='recurrencia',
+            field=models.ForeignKey(blank=True, db_index=False, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='vuelos', to='gestion_aerolinea.vuelorecurrente'),
+        ),
+        migrations.AddConstraint(
+            model_name='vuelo',
+            constraint=models.UniqueConstraint(condition=models.Q(('recurrencia__isnull', False)), fields=('recurrencia', 'fecha_salida'), name='vuelo_recurrencia_salida'),
+        ),
+    ]
@@ -1,6 +1,18 @@
-from django.db import models
+from datetime import datetime, timedelta
+
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
+from django.db.models import Q
+from django.utils import timezone
 from home.models import Usuario 
 
+from .utils.texto import normalizar_busqueda
+
+
+TAMANO_LOTE_ASIENTOS = 500
+# Estados de reserva que retienen el asiento; el resto (cancelada, vencida) queda solo como historial
+ESTADOS_RESERVA_ACTIVA = ['confirmada', 'pendiente']
+
 
 class Avion(models.Model):
     modelo = models.CharField(max_length=100)
@@ -8,30 +20,115 @@ class Avion(models.Model):
     filas = models.IntegerField()
     columnas = models.IntegerField()
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instancia = super().from_db(db, field_names, values)
+        instancia._grilla_original = (instancia.__dict__.get('filas'), instancia.__dict__.get('columnas'))
+        return instancia
+
     def save(self, *args, **kwargs):
         self.capacidad = self.filas * self.columnas
-        
-        super().save(*args, **kwargs)
+        es_nuevo = self._state.adding
+        # Cambiar solo el modelo no toca asientos ni inventarios
+        cambio_grilla = es_nuevo or (self.filas, self.columnas) != getattr(self, '_grilla_original', None)
+
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if cambio_grilla:
+                self.sincronizar_asientos(es_nuevo=es_nuevo)
+        self._grilla_original = (self.filas, self.columnas)
+
+    def sincronizar_asientos(self, es_nuevo=False):
+        # Crea en lotes los asientos que faltan y borra los que quedaron fuera de la grilla
+        existentes = set()
+        if not es_nuevo:
+            fuera_de_grilla = self.asientos.filter(
+                Q(fila__gt=self.filas) | Q(columna__gt=self.columnas)
+            )
+            if Reserva.objects.filter(asiento__in=fuera_de_grilla).exists():
+                raise ValueError(
+                    "No se puede reducir el avión: hay asientos con reservas fuera de las nuevas filas/columnas."
+                )
+            fuera_de_grilla.delete()
+            existentes = set(self.asientos.values_list('fila', 'columna'))
+
+        nuevos = [
+            Asiento(
+                avion=self,
+                numero=f"{fila_num}-{columna_num}",
+                fila=fila_num,
+                columna=columna_num,
+                estado='disponible',
+                tipo='economica'
+            )
+            for fila_num in range(1, self.filas + 1)
+            for columna_num in range(1, self.columnas + 1)
+            if (fila_num, columna_num) not in existentes
+        ]
+        Asiento.objects.bulk_create(nuevos, batch_size=TAMANO_LOTE_ASIENTOS)
+
+        if not es_nuevo:
+            from .utils.inventario import reconstruir_inventarios_avion
+            from .utils.resumenes import reconstruir_resumen_avion
+            reconstruir_inventarios_avion(self)
+            reconstruir_resumen_avion(self.id)
+        return len(nuevos)
 
-        if not self.asientos.exists():
-            for fila_num in range(1, self.filas + 1):
-                for columna_num in range(1, self.columnas + 1):
-                    numero_asiento = f"{fila_num}-{columna_num}" 
-                    Asiento.objects.create(
-                        avion=self,
-                        numero=numero_asiento,
-                        fila=fila_num,
-                        columna=columna_num,
-                        estado='disponible',
-                        tipo='economica' 
-                    )
     def __str__(self):
         return f"{self.modelo} ({self.capacidad} asientos)"
 
+class Aeropuerto(models.Model):
+    codigo_iata = models.CharField(max_length=3, unique=True, null=True, blank=True)
+    nombre = models.CharField(max_length=100, blank=True)
+    ciudad = models.CharField(max_length=100)
+    clave_busqueda = models.CharField(max_length=100, db_index=True, editable=False)
+
+    class Meta:
+        ordering = ['ciudad', 'codigo_iata']
+
+    def save(self, *args, **kwargs):
+        if self.codigo_iata:
+            self.codigo_iata = self.codigo_iata.upper()
+        self.clave_busqueda = normalizar_busqueda(self.ciudad)
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def buscar(cls, texto):
+        # Coincidencia exacta por código IATA o por ciudad normalizada, nunca por substring
+        texto = (texto or '').strip()
+        return cls.objects.filter(
+            Q(clave_busqueda=normalizar_busqueda(texto)) | Q(codigo_iata=texto.upper())
+        )
+
+    def coincide(self, texto):
+        texto = (texto or '').strip()
+        return self.clave_busqueda == normalizar_busqueda(texto) or self.codigo_iata == texto.upper()
+
+    @classmethod
+    def resolver(cls, texto):
+        aeropuerto = cls.buscar(texto).order_by('codigo_iata').first()
+        if aeropuerto is None:
+            aeropuerto = cls.objects.create(ciudad=texto.strip())
+        return aeropuerto
+
+    def __str__(self):
+        if self.codigo_iata:
+            return f"{self.ciudad} ({self.codigo_iata})"
+        return self.ciudad
+
+
 class Vuelo(models.Model):
     imagen = models.ImageField(upload_to='vuelos_imagenes/', null=True, blank=True)
     origen = models.CharField(max_length=100)
     destino = models.CharField(max_length=100)
+    aeropuerto_origen = models.ForeignKey(
+        Aeropuerto, on_delete=models.PROTECT, related_name='vuelos_salida',
+        null=True, editable=False, db_index=False
+    )
+    aeropuerto_destino = models.ForeignKey(
+        Aeropuerto, on_delete=models.PROTECT, related_name='vuelos_llegada',
+        null=True, editable=False, db_index=False
+    )
     fecha_salida = models.DateTimeField()
     fecha_llegada = models.DateTimeField()
     duracion = models.DurationField(blank=True, null=True)
@@ -43,6 +140,43 @@ class Vuelo(models.Model):
     ])
     precio_base = models.DecimalField(max_digits=10, decimal_places=2)
     avion = models.ForeignKey(Avion, on_delete=models.CASCADE)
+    # Horario que generó este vuelo, si vino de uno recurrente
+    recurrencia = models.ForeignKey(
+        'VueloRecurrente', on_delete=models.SET_NULL, related_name='vuelos',
+        null=True, blank=True, editable=False, db_index=False
+    )
+    inventario_asientos = models.BinaryField(default=b'', editable=False)
+    asientos_libres = models.IntegerField(default=0, editable=False)
+    # Contadores que utils.inventario mantiene en la misma transacción que reserva, confirma o cancela
+    asientos_pendientes = models.IntegerField(default=0, editable=False)
+    asientos_confirmados = models.IntegerField(default=0, editable=False)
+    recaudacion = models.DecimalField(max_digits=12, decimal_places=2, default=0, editable=False)
+
+    class Meta:
+        # Los FK de aeropuertos no llevan índice propio: los cubren estos índices compuestos
+        indexes = [
+            models.Index(fields=['aeropuerto_origen', 'aeropuerto_destino', 'fecha_salida'], name='vuelo_ruta_salida'),
+            models.Index(fields=['aeropuerto_destino', 'fecha_salida'], name='vuelo_destino_salida'),
+            models.Index(fields=['fecha_salida', 'id'], name='vuelo_salida'),
+        ]
+        # Cada horario recurrente genera a lo sumo un vuelo por salida
+        constraints = [
+            models.UniqueConstraint(
+                fields=['recurrencia', 'fecha_salida'], name='vuelo_recurrencia_salida',
+                condition=Q(recurrencia__isnull=False),
+            ),
+        ]
+
+    @property
+    def porcentaje_ocupacion(self):
+        capacidad = self.avion.capacidad
+        return round(100 * self.asientos_confirmados / capacidad) if capacidad else 0
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instancia = super().from_db(db, field_names, values)
+        instancia._avion_id_original = instancia.__dict__.get('avion_id')
+        return instancia
 
     def __str__(self):
         return f"Vuelo de {self.origen} a {self.destino} ({self.fecha_salida.date()})"
@@ -52,11 +186,98 @@ class Vuelo(models.Model):
             raise ValueError("La fecha de llegada no puede ser anterior a la fecha de salida.")
         elif self.duracion is None:
             self.duracion = self.fecha_llegada - self.fecha_salida
+
+        if self.aeropuerto_origen_id is None or not self.aeropuerto_origen.coincide(self.origen):
+            self.aeropuerto_origen = Aeropuerto.resolver(self.origen)
+        if self.aeropuerto_destino_id is None or not self.aeropuerto_destino.coincide(self.destino):
+            self.aeropuerto_destino = Aeropuerto.resolver(self.destino)
+
+        es_nuevo = self._state.adding
+        if es_nuevo:
+            self.inventario_asientos = b''
+            self.asientos_libres = self.avion.capacidad
+        avion_anterior = getattr(self, '_avion_id_original', self.avion_id)
+        cambio_avion = not es_nuevo and self.avion_id != avion_anterior
+
+        from .utils.resumenes import reconstruir_resumen_avion, registrar_movimiento
+        # Si el inventario no se puede rearmar en el avión nuevo, el cambio de avión tampoco se guarda
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if es_nuevo:
+                registrar_movimiento(self, ofrecidos=self.avion.capacidad)
+            if cambio_avion:
+                from .utils.inventario import reconstruir_inventario
+                reconstruir_inventario(self)
+                reconstruir_resumen_avion(avion_anterior)
+                reconstruir_resumen_avion(self.avion_id)
+        self._avion_id_original = self.avion_id
+
+    def delete(self, *args, **kwargs):
+        resultado = super().delete(*args, **kwargs)
+        from .utils.resumenes import reconstruir_resumen_avion
+        reconstruir_resumen_avion(self.avion_id)
+        return resultado
+
+
+class VueloRecurrente(models.Model):
+    # Plantilla semanal: los Vuelo concretos se generan a medida que entran en el horizonte de reservas
+    DIAS_SEMANA = '1234567'
+
+    origen = models.CharField(max_length=100)
+    destino = models.CharField(max_length=100)
+    aeropuerto_origen = models.ForeignKey(
+        Aeropuerto, on_delete=models.PROTECT, related_name='+', null=True, editable=False
+    )
+    aeropuerto_destino = models.ForeignKey(
+        Aeropuerto, on_delete=models.PROTECT, related_name='+', null=True, editable=False
+    )
+    avion = models.ForeignKey(Avion, on_delete=models.CASCADE, related_name='recurrencias')
+    dias_semana = models.CharField(
+        max_length=7, help_text="Días en que opera, 1 = lunes … 7 = domingo. Ej.: 135 para lunes, miércoles y viernes."
+    )
+    hora_salida = models.TimeField()
+    duracion = models.DurationField()
+    precio_base = models.DecimalField(max_digits=10, decimal_places=2)
+    vigente_desde = models.DateField()
+    vigente_hasta = models.DateField()
+    activo = models.BooleanField(default=True)
+    # Último día para el que ya existen sus Vuelo
+    materializado_hasta = models.DateField(null=True, blank=True, editable=False)
+
+    def clean(self):
+        if not self.dias_semana or set(self.dias_semana) - set(self.DIAS_SEMANA):
+            raise ValidationError({'dias_semana': "Usa dígitos del 1 (lunes) al 7 (domingo)."})
+        if self.vigente_desde and self.vigente_hasta and self.vigente_hasta < self.vigente_desde:
+            raise ValidationError({'vigente_hasta': "La vigencia no puede terminar antes de empezar."})
+        if self.duracion is not None and self.duracion <= timedelta(0):
+            raise ValidationError({'duracion': "La duración debe ser positiva."})
+
+    def save(self, *args, **kwargs):
+        self.dias_semana = ''.join(sorted(set(self.dias_semana)))
+        if self.aeropuerto_origen_id is None or not self.aeropuerto_origen.coincide(self.origen):
+            self.aeropuerto_origen = Aeropuerto.resolver(self.origen)
+        if self.aeropuerto_destino_id is None or not self.aeropuerto_destino.coincide(self.destino):
+            self.aeropuerto_destino = Aeropuerto.resolver(self.destino)
         super().save(*args, **kwargs)
 
+    def ocurrencias(self, desde, hasta):
+        # Genera las salidas entre dos fechas (inclusive) de a una, sin armar la temporada completa
+        dias = {int(dia) for dia in self.dias_semana}
+        fecha = max(desde, self.vigente_desde)
+        ultima = min(hasta, self.vigente_hasta)
+        while fecha <= ultima:
+            if fecha.isoweekday() in dias:
+                yield timezone.make_aware(datetime.combine(fecha, self.hora_salida))
+            fecha += timedelta(days=1)
+
+    def __str__(self):
+        return f"{self.origen} a {self.destino} ({self.dias_semana} {self.hora_salida:%H:%M})"
+
 
 class Pasajero(models.Model):
-    usuario = models.ForeignKey(Usuario, on_delete=models.CASCADE, related_name='pasajeros_creados')
+    usuario = models.ForeignKey(
+        Usuario, on_delete=models.CASCADE, related_name='pasajeros_creados', db_index=False
+    )
     nombre = models.CharField(max_length=100)
     apellido = models.CharField(max_length=100)
     tipo_documento = models.CharField(max_length=20, choices=[
@@ -68,6 +289,12 @@ class Pasajero(models.Model):
     email = models.EmailField()
     telefono = models.CharField(max_length=15, blank=True, null=True)
     fecha_nacimiento = models.DateField()
+    class Meta:
+        indexes = [
+            models.Index(fields=['usuario', 'apellido', 'nombre'], name='pasajero_usuario_nombre'),
+            models.Index(fields=['apellido', 'nombre', 'id'], name='pasajero_nombre'),
+        ]
+
     def edad(self):
         from datetime import date
         today = date.today()
@@ -110,25 +337,47 @@ class Asiento(models.Model):
 
 
 class Reserva(models.Model):
-    vuelo = models.ForeignKey(Vuelo, on_delete=models.CASCADE, related_name='reservas')
+    vuelo = models.ForeignKey(Vuelo, on_delete=models.CASCADE, related_name='reservas', db_index=False)
     pasajero = models.ForeignKey(Pasajero, on_delete=models.CASCADE, related_name='reservas')
     asiento = models.ForeignKey(Asiento, on_delete=models.CASCADE, related_name='reservas')
     usuario_reserva = models.ForeignKey(
         Usuario, 
         on_delete=models.CASCADE, 
-        related_name='reservas_creadas'
+        related_name='reservas_creadas',
+        db_index=False,
     )
     estado = models.CharField(max_length=20, choices=[
         ('pendiente', 'Pendiente'),
         ('confirmada', 'Confirmada'),
         ('cancelada', 'Cancelada'),
+        ('vencida', 'Vencida'),
     ], default='pendiente')
     fecha_reserva = models.DateTimeField(auto_now_add=True)
+    # Solo las reservas pendientes vencen; al confirmarse se limpia
+    expira_en = models.DateTimeField(null=True, blank=True, editable=False)
     precio_total = models.DecimalField(max_digits=10, decimal_places=2)
     codigo_reserva = models.CharField(max_length=20, unique=True)
 
     class Meta:
-        unique_together = ('vuelo', 'asiento')
+        # Un asiento solo puede tener una reserva activa; las canceladas y vencidas no impiden revenderlo
+        constraints = [
+            models.UniqueConstraint(
+                fields=['vuelo', 'asiento'], name='reserva_asiento_activo',
+                condition=Q(estado__in=ESTADOS_RESERVA_ACTIVA),
+            ),
+        ]
+        # Los FK de vuelo y usuario no llevan índice propio: los cubren estos índices compuestos
+        indexes = [
+            models.Index(fields=['vuelo', 'estado'], name='reserva_vuelo_estado'),
+            models.Index(fields=['usuario_reserva', '-fecha_reserva'], name='reserva_usuario_fecha'),
+            models.Index(fields=['usuario_reserva', 'estado', '-fecha_reserva'], name='reserva_usuario_estado_fecha'),
+            models.Index(fields=['-fecha_reserva', '-id'], name='reserva_fecha'),
+            models.Index(fields=['estado', '-fecha_reserva', '-id'], name='reserva_estado_fecha'),
+            models.Index(
+                fields=['expira_en'], name='reserva_pendiente_expira',
+                condition=Q(estado='pendiente'),
+            ),
+        ]
 
     def __str__(self):
         return f"Reserva de {self.pasajero} en {self.vuelo} - Asiento: {self.asiento.numero}"
@@ -148,3 +397,70 @@ class Boleto(models.Model):
 
     def __str__(self):
         return f"Boleto de {self.reserva.pasajero} - Código: {self.codigo_barra}"
+
+
+class SecuenciaCodigo(models.Model):
+    # Próximo número libre de cada tipo de código; cada proceso toma bloques enteros (ver utils/codigos.py)
+    nombre = models.CharField(max_length=20, unique=True)
+    siguiente = models.BigIntegerField(default=1)
+
+    def __str__(self):
+        return f"{self.nombre}: {self.siguiente}"
+
+
+class EmisionBoleto(models.Model):
+    ESTADO_EMISION = [
+        ('pendiente', 'Pendiente'),
+        ('procesando', 'Procesando'),
+        ('enviado', 'Enviado'),
+        ('fallido', 'Fallido'),
+    ]
+
+    boleto = models.OneToOneField(Boleto, on_delete=models.CASCADE, related_name='emision')
+    estado = models.CharField(max_length=20, choices=ESTADO_EMISION, default='pendiente')
+    url_base = models.CharField(max_length=200)
+    intentos = models.IntegerField(default=0)
+    proximo_intento = models.DateTimeField(default=timezone.now)
+    tomado_por = models.CharField(max_length=32, blank=True)
+    ultimo_error = models.TextField(blank=True)
+    fecha_creacion = models.DateTimeField(auto_now_add=True)
+    fecha_actualizacion = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['estado', 'proximo_intento'], name='emision_estado_proximo'),
+        ]
+
+    def __str__(self):
+        return f"Emisión de {self.boleto.codigo_barra} ({self.get_estado_display()})"
+
+
+class ResumenHorario(models.Model):
+    # Movimientos de reservas por hora y ruta; el panel de empleados lee de acá y no de Reserva
+    hora = models.DateTimeField()
+    aeropuerto_origen = models.ForeignKey(Aeropuerto, on_delete=models.CASCADE, related_name='+')
+    aeropuerto_destino = models.ForeignKey(Aeropuerto, on_delete=models.CASCADE, related_name='+')
+    reservas = models.IntegerField(default=0)
+    confirmadas = models.IntegerField(default=0)
+    canceladas = models.IntegerField(default=0)
+    vencidas = models.IntegerField(default=0)
+    recaudacion = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['hora', 'aeropuerto_origen', 'aeropuerto_destino'], name='resumen_hora_ruta'),
+        ]
+
+
+class ResumenAvion(models.Model):
+    # Suma de los contadores de todos los vuelos del avión, para el factor de ocupación por avión
+    avion = models.OneToOneField(Avion, on_delete=models.CASCADE, related_name='resumen')
+    asientos_ofrecidos = models.IntegerField(default=0)
+    asientos_pendientes = models.IntegerField(default=0)
+    asientos_confirmados = models.IntegerField(default=0)
+
+    @property
+    def porcentaje_ocupacion(self):
+        if not self.asientos_ofrecidos:
+            return 0
+        return round(100 * self.asientos_confirmados / self.asientos_ofrecidos)
@@ -0,0 +1,825 @@
+import io
+import math
+import random
+import threading
+import zipfile
+from datetime import timedelta
+from unittest import mock
+
+from django.conf import settings
+from django.contrib import admin
+from django.contrib.messages import get_messages
+from django.core.management import call_command
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Count, F
+from django.test import Client, RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone, translation
+
+from home.models import Usuario
+
+from .models import Aeropuerto, Avion, Boleto, EmisionBoleto, Pasajero, Reserva, SecuenciaCodigo, Vuelo
+from .utils.codigos import (
+    ALFABETO, LARGO_CODIGO, MAXIMO_CODIGO, GeneradorCodigos, codificar, decodificar, reservar_bloque,
+)
+from .utils.emision import encolar_emision, procesar_trabajo, tomar_trabajos
+from .utils.exportaciones import csv_en_streaming, xlsx_en_streaming
+from .utils.importacion import importar_horario
+from .utils.inventario import ESTADOS_OCUPADOS, InventarioAsientos, contar_reservas, verificar_inventario
+from .utils.paginacion import clave_pagina, paginar_keyset
+from .utils.reservas import reservar_asientos
+from .utils.resumenes import recalcular_resumenes
+from .utils.vencimientos import con_asientos_disponibles, liberar_reservas_vencidas
+
+# Consultas por vista, sin importar cuántas filas haya (sesión y usuario incluidos)
+PRESUPUESTO_CONSULTAS = {
+    'gestionar_reservas_empleado': 3,
+    'gestionar_reservas_empleado_filtradas': 3,
+    'ver_reservas_cliente': 3,
+    'historial_vuelos_cliente': 3,
+    'detalle_pasajero_empleado': 4,
+    'reporte_pasajeros_vuelo': 5,
+    'gestionar_vuelos_empleado': 3,
+    # Una consulta más para ver si hay horarios recurrentes por generar
+    'ver_vuelos_cliente': 4,
+    'buscar_vuelos': 6,
+    'gestionar_pasajeros_empleado': 3,
+    'gestionar_pasajeros': 3,
+    'mi_perfil': 3,
+    'gestionar_usuarios': 3,
+    'panel_empleado': 7,
+}
+
+
+def cargar_datos_presupuesto(filas):
+    # N filas por tabla con bulk_create; el vuelo con todas las reservas ya salió, así también aparece en el historial
+    prefijo = f"presupuesto{filas}"
+    cliente = Usuario.objects.create(username=f"{prefijo}_cliente", perfil='cliente')
+    empleado = Usuario.objects.create(username=f"{prefijo}_empleado", perfil='empleado')
+    admin = Usuario.objects.create(username=f"{prefijo}_admin", perfil='admin')
+    Usuario.objects.bulk_create(
+        Usuario(username=f"{prefijo}_{i}", perfil='cliente') for i in range(filas)
+    )
+
+    columnas = 10
+    avion = Avion.objects.create(modelo=prefijo, filas=math.ceil(filas / columnas), columnas=columnas)
+    origen, destino = Aeropuerto.resolver('Mendoza'), Aeropuerto.resolver('Córdoba')
+    ahora = timezone.now()
+
+    def vuelo(salida):
+        return Vuelo(
+            origen='Mendoza', destino='Córdoba', aeropuerto_origen=origen, aeropuerto_destino=destino,
+            fecha_salida=salida, fecha_llegada=salida + timedelta(hours=2), duracion=timedelta(hours=2),
+            estado='programado', precio_base=100, avion=avion, asientos_libres=avion.capacidad,
+        )
+
+    vuelo_reservado = Vuelo.objects.bulk_create([vuelo(ahora - timedelta(days=1))])[0]
+    Vuelo.objects.bulk_create(vuelo(ahora + timedelta(hours=i + 1)) for i in range(filas))
+
+    pasajeros = Pasajero.objects.bulk_create(
+        Pasajero(
+            usuario=cliente, nombre=f"Pasajero {i}", apellido=prefijo, tipo_documento='dni',
+            numero_documento=f"{prefijo}-{i}", email=f"{prefijo}@example.com", fecha_nacimiento='1990-01-01',
+        )
+        for i in range(filas)
+    )
+    asientos = list(avion.asientos.all()[:filas])
+    # Cada pasajero viaja en varios asientos para que su detalle también crezca con N
+    Reserva.objects.bulk_create(
+        Reserva(
+            vuelo=vuelo_reservado, pasajero=pasajeros[i % 10], asiento=asiento, usuario_reserva=cliente,
+            estado='confirmada', precio_total=100, codigo_reserva=f"P{filas}-{i}",
+        )
+        for i, asiento in enumerate(asientos)
+    )
+    # Con resúmenes cargados el panel también busca los aeropuertos de las rutas
+    recalcular_resumenes()
+    return {
+        'cliente': cliente, 'empleado': empleado, 'admin': admin,
+        'vuelo': vuelo_reservado, 'pasajero': pasajeros[0],
+    }
+
+
+def crear_vuelo(avion, dias=7, **campos):
+    salida = timezone.now() + timedelta(days=dias)
+    datos = {
+        'origen': 'Mendoza', 'destino': 'Córdoba', 'fecha_salida': salida,
+        'fecha_llegada': salida + timedelta(hours=2), 'estado': 'programado', 'precio_base': 100,
+    }
+    datos.update(campos)
+    return Vuelo.objects.create(avion=avion, **datos)
+
+
+def crear_cliente(nombre, pasajeros=1):
+    usuario = Usuario.objects.create(username=nombre, perfil='cliente', email=f"{nombre}@example.com")
+    return usuario, [
+        Pasajero.objects.create(
+            usuario=usuario, nombre=f"Pasajero {i}", apellido=nombre.title(), tipo_documento='dni',
+            numero_documento=f"{nombre}-{i}", email=f"{nombre}@example.com", fecha_nacimiento='1990-01-01',
+        )
+        for i in range(pasajeros)
+    ]
+
+
+def reservar(vuelo, usuario, pares):
+    # pares: (asiento, pasajero); falla el test si la reserva no se concreta
+    resultado = reservar_asientos(vuelo, usuario, [(asiento.id, pasajero.id) for asiento, pasajero in pares])
+    assert resultado.exito, resultado.conflictos
+    return resultado.reservas
+
+
+class PresupuestoConsultasMixin:
+    # Cada listado o reporte se resuelve con la misma cantidad de consultas con 10, 1.000 o 10.000 filas
+    filas = None
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.datos = cargar_datos_presupuesto(cls.filas)
+
+    def setUp(self):
+        # Los datos se cargan sin señales: se mide con la caché de vuelos vacía
+        cache.clear()
+
+    def vistas(self):
+        datos = self.datos
+        return [
+            ('gestionar_reservas_empleado', datos['empleado'], reverse('gestionar_reservas_empleado'), None),
+            ('gestionar_reservas_empleado_filtradas', datos['empleado'],
+             reverse('gestionar_reservas_empleado_filtradas', args=['confirmada']), None),
+            ('ver_reservas_cliente', datos['cliente'], reverse('ver_reservas_cliente'), None),
+            ('historial_vuelos_cliente', datos['cliente'], reverse('historial_vuelos_cliente'), None),
+            ('detalle_pasajero_empleado', datos['empleado'],
+             reverse('detalle_pasajero_empleado', args=[datos['pasajero'].id]), None),
+            ('reporte_pasajeros_vuelo', datos['empleado'], reverse('reporte_pasajeros_vuelo'),
+             {'vuelo': datos['vuelo'].id}),
+            ('gestionar_vuelos_empleado', datos['empleado'], reverse('gestionar_vuelos_empleado'), None),
+            ('ver_vuelos_cliente', datos['cliente'], reverse('ver_vuelos_cliente'), None),
+            ('buscar_vuelos', datos['cliente'], reverse('buscar_vuelos') + '?origen=Mendoza&destino=Córdoba', None),
+            ('gestionar_pasajeros_empleado', datos['empleado'], reverse('gestionar_pasajeros_empleado'), None),
+            ('gestionar_pasajeros', datos['cliente'], reverse('gestionar_pasajeros'), None),
+            ('mi_perfil', datos['cliente'], reverse('mi_perfil'), None),
+            ('gestionar_usuarios', datos['admin'], reverse('gestionar_usuarios'), None),
+            ('panel_empleado', datos['empleado'], reverse('panel_empleado'), None),
+        ]
+
+    def test_vistas_dentro_del_presupuesto(self):
+        with translation.override(settings.LANGUAGES[0][0]):
+            for nombre, usuario, url, post in self.vistas():
+                with self.subTest(vista=nombre):
+                    self.client.force_login(usuario)
+                    with self.assertNumQueries(PRESUPUESTO_CONSULTAS[nombre]):
+                        respuesta = self.client.post(url, post) if post else self.client.get(url)
+                    self.assertEqual(respuesta.status_code, 200)
+
+
+class PresupuestoConsultas10FilasTests(PresupuestoConsultasMixin, TestCase):
+    filas = 10
+
+
+class PresupuestoConsultas1000FilasTests(PresupuestoConsultasMixin, TestCase):
+    filas = 1000
+
+
+class PresupuestoConsultas10000FilasTests(PresupuestoConsultasMixin, TestCase):
+    filas = 10000
+
+
+class ReservasConcurrentesTests(TransactionTestCase):
+    # Varios clientes llenan el mismo avión a la vez: el inventario, los contadores y las reservas deben coincidir
+    clientes = 8
+    por_reserva = 2
+
+    def setUp(self):
+        self.avion = Avion.objects.create(modelo='Concurrencia', filas=10, columnas=6)
+        ahora = timezone.now()
+        self.vuelo = Vuelo.objects.create(
+            origen='Mendoza', destino='Córdoba', fecha_salida=ahora + timedelta(days=7),
+            fecha_llegada=ahora + timedelta(days=7, hours=2), estado='programado', precio_base=100, avion=self.avion,
+        )
+        self.usuarios = []
+        for i in range(self.clientes):
+            usuario = Usuario.objects.create(username=f"concurrencia_{i}", perfil='cliente')
+            pasajeros = [
+                Pasajero.objects.create(
+                    usuario=usuario, nombre=f"Pasajero {j}", apellido='Concurrencia', tipo_documento='dni',
+                    numero_documento=f"concurrencia-{i}-{j}", email='concurrencia@example.com',
+                    fecha_nacimiento='1990-01-01',
+                )
+                for j in range(self.por_reserva)
+            ]
+            self.usuarios.append((usuario, pasajeros))
+
+    def test_reservas_en_paralelo_mantienen_el_inventario(self):
+        asientos = list(self.avion.asientos.all())
+        reservados = []
+        errores = []
+        bloqueo = threading.Lock()
+        inicio = threading.Barrier(self.clientes)
+
+        def cliente(numero, usuario, pasajeros):
+            azar = random.Random(numero)
+            try:
+                inicio.wait()
+                while True:
+                    vuelo = Vuelo.objects.select_related('avion').get(id=self.vuelo.id)
+                    inventario = InventarioAsientos.de_vuelo(vuelo)
+                    libres = [a for a in asientos if not inventario.ocupado(a.fila, a.columna)]
+                    if not libres:
+                        return
+                    elegidos = azar.sample(libres, min(self.por_reserva, len(libres)))
+                    resultado = reservar_asientos(
+                        vuelo, usuario, [(asiento.id, pasajero.id) for asiento, pasajero in zip(elegidos, pasajeros)]
+                    )
+                    if resultado.exito:
+                        with bloqueo:
+                            reservados.extend(reserva.asiento_id for reserva in resultado.reservas)
+            except Exception as e:
+                errores.append(e)
+            finally:
+                connection.close()
+
+        hilos = [
+            threading.Thread(target=cliente, args=(numero, usuario, pasajeros))
+            for numero, (usuario, pasajeros) in enumerate(self.usuarios)
+        ]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+        self.assertEqual(errores, [])
+
+        self.vuelo.refresh_from_db()
+        activas = Reserva.objects.filter(vuelo=self.vuelo, estado__in=ESTADOS_OCUPADOS)
+        self.assertFalse(activas.values('asiento').annotate(n=Count('id')).filter(n__gt=1).exists())
+        self.assertEqual(sorted(activas.values_list('asiento_id', flat=True)), sorted(reservados))
+        self.assertEqual(len(reservados), self.avion.capacidad)
+
+        inventario = verificar_inventario(self.vuelo)
+        self.assertEqual(inventario['sin_marcar'], [])
+        self.assertEqual(inventario['marcados_sin_reserva'], [])
+        self.assertEqual(self.vuelo.asientos_libres, 0)
+        self.assertEqual(inventario['contadores_registrados'], contar_reservas(self.vuelo))
+
+
+class GrillaAvionTests(TransactionTestCase):
+    # TransactionTestCase: los códigos de reserva se piden en otra conexión, que en SQLite no puede
+    # escribir mientras el test tiene abierta su transacción
+    def setUp(self):
+        self.avion = Avion.objects.create(modelo='Grilla', filas=3, columnas=3)
+
+    def posiciones(self):
+        return set(self.avion.asientos.values_list('fila', 'columna'))
+
+    def test_agrandar_crea_solo_los_asientos_nuevos(self):
+        ids = set(self.avion.asientos.values_list('id', flat=True))
+        self.avion.filas, self.avion.columnas = 4, 5
+        self.avion.save()
+
+        self.assertEqual(self.posiciones(), {(f, c) for f in range(1, 5) for c in range(1, 6)})
+        self.assertLessEqual(ids, set(self.avion.asientos.values_list('id', flat=True)))
+        self.assertEqual(Avion.objects.get(id=self.avion.id).capacidad, 20)
+
+    def test_achicar_borra_los_asientos_fuera_de_la_grilla(self):
+        self.avion.filas, self.avion.columnas = 2, 2
+        self.avion.save()
+
+        self.assertEqual(self.posiciones(), {(1, 1), (1, 2), (2, 1), (2, 2)})
+        self.assertEqual(Avion.objects.get(id=self.avion.id).capacidad, 4)
+
+    def test_no_achica_si_un_asiento_fuera_de_la_grilla_tiene_reserva(self):
+        vuelo = crear_vuelo(self.avion)
+        usuario, (pasajero,) = crear_cliente('grilla')
+        reservar(vuelo, usuario, [(self.avion.asientos.get(fila=3, columna=3), pasajero)])
+
+        self.avion.filas = 2
+        with self.assertRaises(ValueError):
+            self.avion.save()
+
+        self.avion.refresh_from_db()
+        self.assertEqual((self.avion.filas, self.avion.capacidad), (3, 9))
+        self.assertEqual(len(self.posiciones()), 9)
+
+    def test_cambiar_el_modelo_no_sincroniza_asientos(self):
+        avion = Avion.objects.get(id=self.avion.id)
+        avion.modelo = 'Grilla renombrada'
+        with CaptureQueriesContext(connection) as consultas:
+            avion.save()
+
+        tablas = ('gestion_aerolinea_asiento', 'gestion_aerolinea_vuelo', 'gestion_aerolinea_reserva')
+        self.assertFalse([c['sql'] for c in consultas.captured_queries if any(t in c['sql'] for t in tablas)])
+
+    def test_cambiar_la_grilla_reconstruye_los_inventarios_en_lote(self):
+        vuelos = [crear_vuelo(self.avion, dias=i + 1) for i in range(30)]
+        usuario, pasajeros = crear_cliente('lote', pasajeros=2)
+        asientos = [self.avion.asientos.get(fila=1, columna=3), self.avion.asientos.get(fila=3, columna=2)]
+        for vuelo in vuelos[:2]:
+            reservar(vuelo, usuario, zip(asientos, pasajeros))
+
+        self.avion.filas, self.avion.columnas = 4, 4
+        with CaptureQueriesContext(connection) as consultas:
+            self.avion.save()
+
+        # Las consultas no dependen de la cantidad de vuelos del avión
+        self.assertLess(len(consultas), 20)
+        for vuelo in Vuelo.objects.filter(avion=self.avion).select_related('avion'):
+            inventario = verificar_inventario(vuelo)
+            self.assertEqual(inventario['sin_marcar'], [])
+            self.assertEqual(inventario['marcados_sin_reserva'], [])
+            self.assertEqual(inventario['libres_registrados'], inventario['libres_esperados'])
+            self.assertEqual(inventario['contadores_registrados'], inventario['contadores_esperados'])
+        self.assertEqual(Vuelo.objects.get(id=vuelos[0].id).asientos_libres, 14)
+
+
+class VencimientosTests(TransactionTestCase):
+    # TransactionTestCase por los códigos de reserva y de boleto, igual que GrillaAvionTests
+    def setUp(self):
+        self.avion = Avion.objects.create(modelo='Vencimientos', filas=2, columnas=3)
+        self.vuelo = crear_vuelo(self.avion)
+        self.usuario, self.pasajeros = crear_cliente('vencimientos', pasajeros=2)
+        self.empleado = Usuario.objects.create(username='vencimientos_empleado', perfil='empleado')
+        self.asientos = list(self.avion.asientos.order_by('fila', 'columna'))
+        self.reservas = reservar(self.vuelo, self.usuario, zip(self.asientos, self.pasajeros))
+
+    def vencer(self, reserva):
+        Reserva.objects.filter(id=reserva.id).update(expira_en=timezone.now() - timedelta(seconds=1))
+
+    def assertInventarioConsistente(self):
+        self.vuelo.refresh_from_db()
+        inventario = verificar_inventario(self.vuelo)
+        self.assertEqual(inventario['sin_marcar'], [])
+        self.assertEqual(inventario['marcados_sin_reserva'], [])
+        self.assertEqual(inventario['libres_registrados'], inventario['libres_esperados'])
+        self.assertEqual(inventario['contadores_registrados'], inventario['contadores_esperados'])
+
+    def confirmar(self, reserva):
+        cliente = Client()
+        cliente.force_login(self.empleado)
+        with translation.override(settings.LANGUAGES[0][0]):
+            respuesta = cliente.post(reverse('confirmar_reserva_empleado', args=[reserva.id]))
+        return [mensaje.message for mensaje in get_messages(respuesta.wsgi_request)]
+
+    @override_settings(MINUTOS_RESERVA_PENDIENTE=30)
+    def test_el_plazo_sale_de_la_configuracion(self):
+        antes = timezone.now()
+        (reserva,) = reservar(self.vuelo, self.usuario, [(self.asientos[2], self.pasajeros[0])])
+        reserva.refresh_from_db()
+        self.assertGreaterEqual(reserva.expira_en, antes + timedelta(minutes=30))
+        self.assertLessEqual(reserva.expira_en, timezone.now() + timedelta(minutes=30))
+
+    def test_el_barrido_libera_solo_las_reservas_vencidas(self):
+        self.vencer(self.reservas[0])
+
+        self.assertEqual(liberar_reservas_vencidas(), {self.vuelo.id: 1})
+        self.assertEqual(Reserva.objects.get(id=self.reservas[0].id).estado, 'vencida')
+        self.assertEqual(Reserva.objects.get(id=self.reservas[1].id).estado, 'pendiente')
+        self.assertInventarioConsistente()
+        self.assertEqual(self.vuelo.asientos_libres, 5)
+        # Una segunda pasada no encuentra nada
+        self.assertEqual(liberar_reservas_vencidas(), {})
+
+    def test_un_asiento_vencido_se_puede_volver_a_reservar(self):
+        self.vencer(self.reservas[0])
+        otro, (pasajero,) = crear_cliente('vencimientos_otro')
+
+        (reserva,) = reservar(self.vuelo, otro, [(self.asientos[0], pasajero)])
+
+        self.assertEqual(Reserva.objects.get(id=self.reservas[0].id).estado, 'vencida')
+        self.assertEqual(reserva.asiento_id, self.asientos[0].id)
+        self.assertInventarioConsistente()
+
+    def test_no_se_confirma_una_reserva_vencida(self):
+        self.vencer(self.reservas[0])
+
+        mensajes = self.confirmar(self.reservas[0])
+
+        self.assertEqual(Reserva.objects.get(id=self.reservas[0].id).estado, 'pendiente')
+        self.assertFalse(Boleto.objects.filter(reserva=self.reservas[0]).exists())
+        self.assertIn('venció', mensajes[0])
+        self.assertInventarioConsistente()
+
+    def test_se_confirma_una_reserva_vigente(self):
+        self.confirmar(self.reservas[0])
+
+        self.assertEqual(Reserva.objects.get(id=self.reservas[0].id).estado, 'confirmada')
+        self.assertTrue(Boleto.objects.filter(reserva=self.reservas[0]).exists())
+        self.assertInventarioConsistente()
+
+    def test_los_listados_cuentan_las_reservas_vencidas_como_disponibles(self):
+        self.vencer(self.reservas[0])
+
+        vuelo = con_asientos_disponibles(Vuelo.objects.all()).get(id=self.vuelo.id)
+        self.assertEqual((vuelo.asientos_libres, vuelo.asientos_disponibles), (4, 5))
+
+        cliente = Client()
+        cliente.force_login(self.usuario)
+        with translation.override(settings.LANGUAGES[0][0]):
+            respuesta = cliente.get(reverse('detalles_vuelo', args=[self.vuelo.id]))
+        self.assertContains(respuesta, '(5 libres)')
+
+
+class CodigosTests(TestCase):
+    def test_codificar_y_decodificar_vuelven_al_mismo_numero(self):
+        for numero in [1, 31, 32, 1023, 123_456, MAXIMO_CODIGO]:
+            codigo = codificar(numero)
+            self.assertEqual(len(codigo), LARGO_CODIGO)
+            self.assertEqual(decodificar(codigo), numero)
+            # Como se tipea a mano: minúsculas, guion y letras que se confunden
+            tipeado = f"{codigo[:4]}-{codigo[4:]}".lower().replace('0', 'o').replace('1', 'l')
+            self.assertEqual(decodificar(tipeado), numero)
+
+    def test_rechaza_un_digito_de_control_equivocado(self):
+        codigo = codificar(987_654)
+        for caracter in ALFABETO.replace(codigo[-1], ''):
+            with self.assertRaises(ValueError):
+                decodificar(codigo[:-1] + caracter)
+
+    def test_rechaza_largos_y_caracteres_invalidos(self):
+        for texto in ['', 'ABC', codificar(5) + '0', 'UUUUUUUU']:
+            with self.assertRaises(ValueError):
+                decodificar(texto)
+        with self.assertRaises(ValueError):
+            codificar(MAXIMO_CODIGO + 1)
+
+    def test_el_orden_de_los_codigos_es_el_de_sus_numeros(self):
+        numeros = [1, 2, 31, 32, 33, 1000, 40_000]
+        self.assertEqual(sorted(codificar(numero) for numero in numeros), [codificar(numero) for numero in numeros])
+
+
+class BloquesCodigosTests(TransactionTestCase):
+    # Fuera de un test con transacción propia: dentro de atomic el bloque se pide en otra conexión
+    def test_bloques_consecutivos_fuera_de_una_transaccion(self):
+        self.assertEqual(reservar_bloque('prueba', 10), (1, 11))
+        self.assertEqual(reservar_bloque('prueba', 5), (11, 16))
+        self.assertEqual(SecuenciaCodigo.objects.get(nombre='prueba').siguiente, 16)
+
+    def test_el_bloque_pedido_dentro_de_atomic_sobrevive_al_rollback(self):
+        with transaction.atomic():
+            self.assertEqual(reservar_bloque('prueba', 10), (1, 11))
+            transaction.set_rollback(True)
+        # Si el bloque se hubiera revertido, otro proceso podría recibir los mismos números
+        self.assertEqual(SecuenciaCodigo.objects.get(nombre='prueba').siguiente, 11)
+        self.assertEqual(reservar_bloque('prueba', 10), (11, 21))
+
+    def test_el_generador_reparte_codigos_unicos_y_crecientes(self):
+        generador = GeneradorCodigos('prueba', tamano_bloque=100)
+        codigos = generador.tomar(250) + [generador.siguiente() for _ in range(60)]
+
+        self.assertEqual([decodificar(codigo) for codigo in codigos], list(range(1, 311)))
+        # Un bloque de 250 para el pedido grande y uno de 100 para los sueltos
+        self.assertEqual(SecuenciaCodigo.objects.get(nombre='prueba').siguiente, 351)
+
+
+class BusquedaPorCodigoAdminTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        avion = Avion.objects.create(modelo='Busqueda', filas=1, columnas=2)
+        vuelo = crear_vuelo(avion)
+        usuario, _ = crear_cliente('busqueda')
+        cls.codigo = codificar(4242)
+        # Un apellido que también pasa el dígito de control
+        cls.apellido = codificar(777)
+        asientos = list(avion.asientos.order_by('columna'))
+        cls.por_codigo = Reserva.objects.create(
+            vuelo=vuelo, asiento=asientos[0], usuario_reserva=usuario, precio_total=100, codigo_reserva=cls.codigo,
+            pasajero=Pasajero.objects.create(
+                usuario=usuario, nombre='Ana', apellido='Paz', tipo_documento='dni', numero_documento='busqueda-1',
+                email='a@example.com', fecha_nacimiento='1990-01-01',
+            ),
+        )
+        cls.por_apellido = Reserva.objects.create(
+            vuelo=vuelo, asiento=asientos[1], usuario_reserva=usuario, precio_total=100, codigo_reserva='LEGADO0001',
+            pasajero=Pasajero.objects.create(
+                usuario=usuario, nombre='Juan', apellido=cls.apellido, tipo_documento='dni',
+                numero_documento='busqueda-2', email='j@example.com', fecha_nacimiento='1990-01-01',
+            ),
+        )
+
+    def buscar(self, texto):
+        modelo_admin = admin.site._registry[Reserva]
+        resultado, _ = modelo_admin.get_search_results(RequestFactory().get('/'), Reserva.objects.all(), texto)
+        return set(resultado)
+
+    def test_un_codigo_tipeado_a_mano_encuentra_su_reserva(self):
+        self.assertEqual(self.buscar(f"{self.codigo[:4]}-{self.codigo[4:]}".lower()), {self.por_codigo})
+
+    def test_un_texto_con_forma_de_codigo_no_pierde_los_otros_resultados(self):
+        self.assertEqual(self.buscar(self.apellido), {self.por_apellido})
+        self.assertEqual(self.buscar('Ana'), {self.por_codigo})
+
+
+@mock.patch('gestion_aerolinea.utils.emision.enviar_boleto_por_email', return_value=(True, ''))
+class EmisionBoletosTests(TransactionTestCase):
+    # procesar_trabajo cierra la conexión como lo hace el worker, y dentro del atomic de TestCase eso la rompe
+    def setUp(self):
+        avion = Avion.objects.create(modelo='Emision', filas=1, columnas=1)
+        usuario, (pasajero,) = crear_cliente('emision')
+        reserva = Reserva.objects.create(
+            vuelo=crear_vuelo(avion), asiento=avion.asientos.get(), pasajero=pasajero, usuario_reserva=usuario,
+            precio_total=100, codigo_reserva='EMISION001', estado='confirmada',
+        )
+        self.boleto = Boleto.objects.create(reserva=reserva, codigo_barra='EMISION001')
+
+    def test_el_worker_que_tiene_el_trabajo_registra_el_envio(self, enviar):
+        encolar_emision(self.boleto, 'http://testserver')
+        (trabajo,) = tomar_trabajos(10)
+        self.assertEqual(procesar_trabajo(trabajo), 'enviado')
+        self.assertEqual(EmisionBoleto.objects.get().estado, 'enviado')
+
+    def test_un_trabajo_reclamado_por_otro_worker_descarta_el_resultado(self, enviar):
+        encolar_emision(self.boleto, 'http://testserver')
+        (lento,) = tomar_trabajos(10)
+        # Pasado el tiempo máximo, otro worker lo reclama como abandonado
+        EmisionBoleto.objects.update(fecha_actualizacion=timezone.now() - timedelta(hours=1))
+        (nuevo,) = tomar_trabajos(10)
+        self.assertNotEqual(lento.tomado_por, nuevo.tomado_por)
+
+        self.assertEqual(procesar_trabajo(lento), 'descartado')
+        emision = EmisionBoleto.objects.get()
+        self.assertEqual((emision.estado, emision.tomado_por, emision.intentos), ('procesando', nuevo.tomado_por, 2))
+
+
+@override_settings(TIME_ZONE='America/Argentina/Mendoza')
+class ExportacionReservasTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        avion = Avion.objects.create(modelo='Exportacion', filas=1, columnas=3)
+        vuelo = crear_vuelo(avion)
+        usuario, pasajeros = crear_cliente('exportacion', pasajeros=3)
+        pasajeros[0].nombre = '=HIPERVINCULO("http://example.com")'
+        pasajeros[0].save()
+        cls.empleado = Usuario.objects.create(username='exportacion_empleado', perfil='empleado')
+        # Reservado a las 23:30 del 1 de marzo y a las 00:30 del 2 de marzo, hora de Mendoza (UTC-3)
+        fechas = ['2025-03-02T02:30:00Z', '2025-03-02T03:30:00Z', '2025-03-03T03:30:00Z']
+        for i, (asiento, pasajero, fecha) in enumerate(zip(avion.asientos.order_by('columna'), pasajeros, fechas)):
+            reserva = Reserva.objects.create(
+                vuelo=vuelo, asiento=asiento, pasajero=pasajero, usuario_reserva=usuario,
+                precio_total=-10 if i == 0 else 100, codigo_reserva=f"EXPORTA{i:03d}",
+            )
+            Reserva.objects.filter(id=reserva.id).update(fecha_reserva=fecha)
+
+    def exportar(self, **parametros):
+        self.client.force_login(self.empleado)
+        with translation.override(settings.LANGUAGES[0][0]):
+            url = reverse('exportar_reservas_empleado')
+        respuesta = self.client.get(url, parametros)
+        return b''.join(respuesta.streaming_content).decode('utf-8-sig')
+
+    def test_el_rango_de_fechas_usa_los_dias_de_la_zona_local(self):
+        with CaptureQueriesContext(connection) as consultas:
+            self.assertEqual(self.exportar(desde='2025-03-01', hasta='2025-03-01').count('EXPORTA'), 1)
+        # Compara la columna contra límites, sin convertir cada fila a fecha
+        self.assertFalse([c['sql'] for c in consultas.captured_queries if 'cast_date' in c['sql']])
+        contenido = self.exportar(desde='2025-03-02', hasta='2025-03-02')
+        self.assertEqual(contenido.count('EXPORTA'), 1)
+        self.assertIn('EXPORTA001', contenido)
+
+    def test_los_textos_con_forma_de_formula_salen_como_texto(self):
+        contenido = self.exportar(desde='2025-03-01', hasta='2025-03-01')
+        self.assertIn('"\'=HIPERVINCULO(""http://example.com"")"', contenido)
+        # Los números negativos no son texto y se exportan tal cual
+        self.assertIn(',-10', contenido)
+
+    def test_csv_y_xlsx_escapan_los_mismos_prefijos(self):
+        filas = [['=1+1', '+1', '-1', '@SUMA', '\tx', '\rx', 'normal', -1]]
+        csv = b''.join(csv_en_streaming(['a'] * 8, filas)).decode('utf-8-sig')
+        self.assertIn("'=1+1,'+1,'-1,'@SUMA,'\tx,\"'\rx\",normal,-1", csv)
+        xlsx = b''.join(xlsx_en_streaming(['a'] * 8, filas))
+        with zipfile.ZipFile(io.BytesIO(xlsx)) as archivo:
+            hoja = archivo.read('xl/worksheets/sheet1.xml').decode()
+        for texto in ["'=1+1", "'+1", "'-1", "'@SUMA", "'\tx", "'\rx"]:
+            self.assertIn(f'<t xml:space="preserve">{texto}</t>', hoja)
+        self.assertIn('<v>-1</v>', hoja)
+
+
+class ImportacionHorariosTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.avion = Avion.objects.create(modelo='Importacion', filas=1, columnas=2)
+
+    def fila(self, origen='Córdoba', destino='Mendoza', dias=10):
+        salida = timezone.localtime().replace(hour=8, minute=0, second=0, microsecond=0) + timedelta(days=dias)
+        return {
+            'origen': origen, 'destino': destino, 'fecha_salida': salida.strftime('%Y-%m-%d %H:%M'),
+            'fecha_llegada': (salida + timedelta(hours=2)).strftime('%Y-%m-%d %H:%M'),
+            'precio_base': '100', 'avion': str(self.avion.id),
+        }
+
+    def importar(self, *filas):
+        return importar_horario([], enumerate(filas, start=1))
+
+    def test_las_ciudades_escritas_distinto_resuelven_el_mismo_aeropuerto(self):
+        with CaptureQueriesContext(connection) as consultas:
+            resultado = self.importar(self.fila(), self.fila(' cordoba ', 'MENDOZA', dias=11))
+        self.assertEqual((resultado.vuelos_creados, resultado.errores), (2, []))
+        # Una búsqueda por ciudad distinta, no por forma de escribirla
+        busquedas = [c for c in consultas.captured_queries if 'FROM "gestion_aerolinea_aeropuerto"' in c['sql']]
+        self.assertEqual(len(busquedas), 2)
+        rutas = Vuelo.objects.values_list('aeropuerto_origen', 'aeropuerto_destino').distinct()
+        self.assertEqual(len(rutas), 1)
+
+    def test_un_vuelo_repetido_en_el_archivo_se_carga_una_vez(self):
+        resultado = self.importar(self.fila(), self.fila('cordoba', 'Mendoza'), self.fila(dias=11))
+        self.assertEqual((resultado.vuelos_creados, resultado.vuelos_duplicados), (2, 1))
+        self.assertEqual(Vuelo.objects.count(), 2)
+
+    def test_reimportar_el_horario_no_duplica_vuelos(self):
+        self.importar(self.fila(), self.fila(dias=11))
+        resultado = self.importar(self.fila(), self.fila(dias=11), self.fila('Mendoza', 'Córdoba'))
+        self.assertEqual((resultado.vuelos_creados, resultado.vuelos_duplicados), (1, 2))
+        self.assertEqual(Vuelo.objects.count(), 3)
+
+
+class PaginacionKeysetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        avion = Avion.objects.create(modelo='Paginacion', filas=1, columnas=1)
+        base = timezone.now().replace(microsecond=0) + timedelta(days=30)
+        # Salidas repetidas y otras separadas por un microsegundo o un milisegundo
+        desplazamientos = [0, 0, 0, 1, 1, 999, 1000, 1000, 1001, 0, 2000, 2000, 2000, 2000, 1]
+        for microsegundos in desplazamientos:
+            salida = base + timedelta(microseconds=microsegundos)
+            crear_vuelo(avion, fecha_salida=salida, fecha_llegada=salida + timedelta(hours=2))
+        cls.vuelos = Vuelo.objects.all()
+
+    def pagina(self, orden, url='/', tamano=4):
+        return paginar_keyset(RequestFactory().get(url), self.vuelos, orden, tamano=tamano)
+
+    def recorrer(self, orden, tamano):
+        # Avanza hasta la última página y vuelve por los enlaces 'anterior' hasta la primera
+        # Un cursor que no avanza repetiría páginas para siempre: se corta al pasar la cantidad de filas
+        limite = self.vuelos.count()
+        paginas = [self.pagina(orden, tamano=tamano)]
+        while paginas[-1].url_siguiente:
+            self.assertLessEqual(len(paginas), limite, "La paginación no avanza")
+            paginas.append(self.pagina(orden, '/' + paginas[-1].url_siguiente, tamano))
+        adelante = [[vuelo.id for vuelo in pagina] for pagina in paginas]
+
+        atras = [adelante[-1]]
+        pagina = paginas[-1]
+        while pagina.url_anterior:
+            self.assertLessEqual(len(atras), limite, "La paginación no retrocede")
+            pagina = self.pagina(orden, '/' + pagina.url_anterior, tamano)
+            atras.insert(0, [vuelo.id for vuelo in pagina])
+        return adelante, atras
+
+    def test_recorre_todas_las_filas_una_vez_en_ambos_sentidos(self):
+        for orden in (['fecha_salida'], ['-fecha_salida']):
+            desempate = '-id' if orden[0].startswith('-') else 'id'
+            esperado = list(self.vuelos.order_by(*orden, desempate).values_list('id', flat=True))
+            for tamano in (1, 2, 4, 7):
+                with self.subTest(orden=orden, tamano=tamano):
+                    adelante, atras = self.recorrer(orden, tamano)
+                    self.assertEqual(sum(adelante, []), esperado)
+                    self.assertEqual(sum(atras, []), esperado)
+                    self.assertEqual(atras, adelante)
+
+    def test_la_primera_pagina_no_tiene_anterior_ni_la_ultima_siguiente(self):
+        adelante, _ = self.recorrer(['fecha_salida'], 4)
+        self.assertEqual([len(ids) for ids in adelante], [4, 4, 4, 3])
+        self.assertIsNone(self.pagina(['fecha_salida']).url_anterior)
+
+    def test_la_clave_de_pagina_depende_solo_del_cursor(self):
+        orden = ['fecha_salida']
+        primera = self.pagina(orden, tamano=1)
+        segunda = self.pagina(orden, '/' + primera.url_siguiente, tamano=1)
+        tercera = self.pagina(orden, '/' + segunda.url_siguiente, tamano=1)
+        # Las dos primeras salidas son iguales: el cursor las distingue por el id
+        self.assertEqual(primera.objetos[0].fecha_salida, segunda.objetos[0].fecha_salida)
+
+        def clave(url):
+            return clave_pagina(RequestFactory().get(url), orden)
+
+        self.assertEqual(clave('/'), '')
+        self.assertEqual(clave('/?despues=no-es-un-cursor'), '')
+        self.assertEqual(clave('/' + primera.url_siguiente), clave('/' + primera.url_siguiente + '&origen=x'))
+        self.assertNotEqual(clave('/' + primera.url_siguiente), clave('/' + segunda.url_siguiente))
+        self.assertNotEqual(clave('/' + segunda.url_siguiente), clave('/' + tercera.url_anterior))
+        self.assertTrue(clave('/' + tercera.url_anterior).startswith('antes:'))
+
+
+@mock.patch('gestion_aerolinea.utils.pdf.html_a_pdf', side_effect=lambda html, url_base: html.encode())
+class PdfBoletoTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        avion = Avion.objects.create(modelo='Boleto', filas=1, columnas=1)
+        cls.usuario, (pasajero,) = crear_cliente('boleto')
+        cls.reserva = Reserva.objects.create(
+            vuelo=crear_vuelo(avion), asiento=avion.asientos.get(), pasajero=pasajero, usuario_reserva=cls.usuario,
+            precio_total=100, codigo_reserva='BOLETO0001', estado='confirmada',
+        )
+        Boleto.objects.create(reserva=cls.reserva, codigo_barra='BOLETO0001')
+
+    def setUp(self):
+        # Un storage vacío por test: los PDF guardados no pasan de un test a otro
+        self.enterContext(override_settings(STORAGES={
+            **settings.STORAGES, 'default': {'BACKEND': 'django.core.files.storage.InMemoryStorage'},
+        }))
+
+    def descargar(self, etag=None):
+        self.client.force_login(self.usuario)
+        with translation.override(settings.LANGUAGES[0][0]):
+            url = reverse('ver_boleto', args=[self.reserva.id])
+        cabeceras = {'If-None-Match': etag} if etag else {}
+        return self.client.get(url, {'descargar': 1}, headers=cabeceras)
+
+    def test_un_etag_vigente_responde_304_sin_renderizar(self, renderizar):
+        respuesta = self.descargar()
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(respuesta['Content-Type'], 'application/pdf')
+        etag = respuesta['ETag']
+
+        no_modificado = self.descargar(etag)
+        self.assertEqual(no_modificado.status_code, 304)
+        self.assertEqual(no_modificado['ETag'], etag)
+        # Sin ETag se sirve el PDF guardado
+        self.assertEqual(self.descargar().content, respuesta.content)
+        self.assertEqual(renderizar.call_count, 1)
+
+    def test_cambiar_un_dato_impreso_cambia_la_clave_y_vuelve_a_renderizar(self, renderizar):
+        salida = self.reserva.vuelo.fecha_salida
+        # El estado del boleto y la hora de salida no van en el QR: solo los cubre la clave del PDF
+        cambios = [
+            ('apellido', lambda: Pasajero.objects.filter(id=self.reserva.pasajero_id).update(apellido='Otro')),
+            ('estado', lambda: Boleto.objects.filter(reserva=self.reserva).update(estado='usado')),
+            ('salida', lambda: Vuelo.objects.filter(id=self.reserva.vuelo_id).update(
+                fecha_salida=salida.replace(minute=(salida.minute + 30) % 60),
+            )),
+        ]
+        etag = self.descargar()['ETag']
+        for numero, (campo, cambiar) in enumerate(cambios, start=2):
+            with self.subTest(campo=campo):
+                cambiar()
+                respuesta = self.descargar(etag)
+                self.assertEqual(respuesta.status_code, 200)
+                self.assertNotEqual(respuesta['ETag'], etag)
+                self.assertEqual(renderizar.call_count, numero)
+                etag = respuesta['ETag']
+        self.assertIn(b'Otro', respuesta.content)
+
+    def test_un_dato_que_no_se_imprime_no_invalida_el_pdf(self, renderizar):
+        etag = self.descargar()['ETag']
+        Pasajero.objects.filter(id=self.reserva.pasajero_id).update(email='otro@example.com')
+        Reserva.objects.filter(id=self.reserva.id).update(precio_total=250)
+
+        self.assertEqual(self.descargar(etag).status_code, 304)
+        self.assertEqual(renderizar.call_count, 1)
+
+
+# reservar_asientos toma códigos en otra conexión: dentro del atomic de TestCase SQLite quedaría bloqueado
+class ReconciliarInventarioTests(TransactionTestCase):
+    def setUp(self):
+        avion = Avion.objects.create(modelo='Reconciliar', filas=1, columnas=3)
+        usuario, (pasajero,) = crear_cliente('reconciliar')
+        asientos = list(avion.asientos.order_by('columna'))
+        self.contadores, self.bitmap, self.sano = [crear_vuelo(avion, dias=dias) for dias in (5, 6, 7)]
+        for vuelo in (self.contadores, self.bitmap, self.sano):
+            reservar(vuelo, usuario, [(asientos[1], pasajero)])
+
+        Vuelo.objects.filter(id=self.contadores.id).update(
+            asientos_libres=F('asientos_libres') + 1, asientos_pendientes=0,
+        )
+        # El asiento reservado queda libre en el bitmap y otro aparece ocupado sin reserva
+        inventario = InventarioAsientos.de_vuelo(self.bitmap)
+        inventario.liberar(1, 2)
+        inventario.ocupar(1, 3)
+        Vuelo.objects.filter(id=self.bitmap.id).update(inventario_asientos=bytes(inventario))
+
+    def reconciliar(self, *argumentos):
+        salida = io.StringIO()
+        call_command('reconciliar_inventario', *argumentos, stdout=salida)
+        return salida.getvalue()
+
+    def assertConsistente(self, vuelo, consistente=True):
+        resultado = verificar_inventario(Vuelo.objects.select_related('avion').get(id=vuelo.id))
+        diferencias = (
+            resultado['sin_marcar'] or resultado['marcados_sin_reserva']
+            or resultado['libres_registrados'] != resultado['libres_esperados']
+            or resultado['contadores_registrados'] != resultado['contadores_esperados']
+        )
+        self.assertEqual(not diferencias, consistente, resultado)
+
+    def test_informa_las_diferencias_sin_tocar_nada(self):
+        salida = self.reconciliar()
+        self.assertIn(
+            f"Vuelo {self.contadores.id}: reservados sin marcar [], marcados sin reserva [], libres 3 (esperado 2)", salida,
+        )
+        self.assertIn("'asientos_pendientes': 0", salida)
+        self.assertIn(f"Vuelo {self.bitmap.id}: reservados sin marcar [(1, 2)], marcados sin reserva [(1, 3)]", salida)
+        self.assertNotIn(f"Vuelo {self.sano.id}:", salida)
+        self.assertIn("3 vuelos revisados, 2 con diferencias.", salida)
+        self.assertConsistente(self.contadores, False)
+        self.assertConsistente(self.bitmap, False)
+
+    def test_reparar_reconstruye_inventario_y_contadores(self):
+        self.assertIn("3 vuelos revisados, 2 reparados.", self.reconciliar('--reparar'))
+        for vuelo in (self.contadores, self.bitmap, self.sano):
+            self.assertConsistente(vuelo)
+        self.assertIn("3 vuelos revisados, 0 con diferencias.", self.reconciliar())
+
+    def test_un_solo_vuelo(self):
+        salida = self.reconciliar('--vuelo', str(self.bitmap.id), '--reparar')
+        self.assertIn("1 vuelos revisados, 1 reparados.", salida)
+        self.assertConsistente(self.bitmap)
+        self.assertConsistente(self.contadores, False)
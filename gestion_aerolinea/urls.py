@@ -9,12 +9,18 @@ from .views import (
     CrearVueloView,
     DetallePasajeroEmpleadoView,
     DetallesVueloView,
+    DocumentosVueloView,
     EditarAvionView,
     EditarPasajeroView,
     EditarVueloView,
     EliminarAvionView,      
     EliminarPasajeroView,
     EliminarVueloView,
+    EstadoCacheView,
+    EstadoEmisionesView,
+    ExportarPasajerosVueloView,
+    ExportarRecaudacionVuelosView,
+    ExportarReservasView,
     GestionarAvionesView,    
     GestionarPasajerosView,
     GestionarUsuariosView,
@@ -22,14 +28,17 @@ from .views import (
     GestionarReservasEmpleadoView,
     GestionarVuelosView,
     HistorialVuelosClienteView,
+    ImportarHorariosView,
     PanelClienteView,
     PanelEmpleadoView,
+    PerfiladoPedidosView,
     SeleccionarAsientoView,
     SeleccionarPasajerosView,
     VerBoletoView,
     VerReservasClienteView,
     VerVuelosClienteView,
     ReportePasajerosVueloView,
+    ReintentarEmisionView,
     MiPerfilView
 )
 
@@ -65,9 +74,14 @@ urlpatterns = [
     
     # Rutas para Empleados(reservas)
     path('empleado/reservas/', GestionarReservasEmpleadoView.as_view(), name='gestionar_reservas_empleado'),
+    path('empleado/reservas/exportar/', ExportarReservasView.as_view(), name='exportar_reservas_empleado'),
     path('empleado/reservas/<str:filtro>/', GestionarReservasEmpleadoView.as_view(), name='gestionar_reservas_empleado_filtradas'),
     path('empleado/reservas/confirmar/<int:reserva_id>/', ConfirmarReservaView.as_view(), name='confirmar_reserva_empleado'),
     path('empleado/reservas/cancelar/<int:reserva_id>/', CancelarReservaEmpleadoView.as_view(), name='cancelar_reserva_empleado'),
+    path('empleado/cache/estado/', EstadoCacheView.as_view(), name='estado_cache'),
+    path('empleado/perfilado/', PerfiladoPedidosView.as_view(), name='perfilado_pedidos'),
+    path('empleado/emisiones/estado/', EstadoEmisionesView.as_view(), name='estado_emisiones'),
+    path('empleado/emisiones/reintentar/<int:reserva_id>/', ReintentarEmisionView.as_view(), name='reintentar_emision'),
 
     #Ruta para Boleto
     path('reservas/boleto/<int:reserva_id>/', VerBoletoView.as_view(), name='ver_boleto'),
@@ -75,8 +89,12 @@ urlpatterns = [
     # Rutas para Empleados (vuelos)
     path('empleado/vuelos/', GestionarVuelosView.as_view(), name='gestionar_vuelos_empleado'),
     path('empleado/vuelos/crear/', CrearVueloView.as_view(), name='crear_vuelo_empleado'),
+    path('empleado/vuelos/importar/', ImportarHorariosView.as_view(), name='importar_horarios_empleado'),
     path('empleado/vuelos/editar/<int:vuelo_id>/', EditarVueloView.as_view(), name='editar_vuelo_empleado'),
     path('empleado/vuelos/eliminar/<int:vuelo_id>/', EliminarVueloView.as_view(), name='eliminar_vuelo_empleado'),
+    path('empleado/vuelos/<int:vuelo_id>/documentos/', DocumentosVueloView.as_view(), name='documentos_vuelo_empleado'),
+    path('empleado/vuelos/<int:vuelo_id>/pasajeros/exportar/', ExportarPasajerosVueloView.as_view(), name='exportar_pasajeros_vuelo'),
+    path('empleado/vuelos/recaudacion/exportar/', ExportarRecaudacionVuelosView.as_view(), name='exportar_recaudacion_vuelos'),
 
     # Rutas para Empleados (aviones)
     path('empleado/aviones/', GestionarAvionesView.as_view(), name='gestionar_aviones_empleado'),
@@ -0,0 +1,31 @@
+import posixpath
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+
+
+def _descartar_versiones_anteriores(vigente):
+    carpeta = posixpath.dirname(vigente)
+    if not default_storage.exists(carpeta):
+        return
+    _, archivos = default_storage.listdir(carpeta)
+    for archivo in archivos:
+        ruta = posixpath.join(carpeta, archivo)
+        if ruta != vigente:
+            default_storage.delete(ruta)
+
+
+def leer_cacheado(ruta):
+    if not default_storage.exists(ruta):
+        return None
+    with default_storage.open(ruta, 'rb') as archivo:
+        return archivo.read()
+
+
+def guardar_cacheado(ruta, contenido):
+    # Cada archivo cacheado vive solo en su carpeta: al guardar una versión nueva se borran las anteriores
+    _descartar_versiones_anteriores(ruta)
+    guardado = default_storage.save(ruta, ContentFile(contenido))
+    if guardado != ruta:
+        # Otro proceso guardó el mismo archivo al mismo tiempo; el contenido es idéntico
+        default_storage.delete(guardado)
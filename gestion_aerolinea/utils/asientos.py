@@ -0,0 +1,23 @@
+from ..models import Asiento
+from .inventario import InventarioAsientos
+from .vencimientos import reservas_vencidas
+
+
+def construir_mapa_asientos(vuelo):
+    # Los asientos ocupados salen del inventario del vuelo, sin consultar las reservas
+    inventario = InventarioAsientos.de_vuelo(vuelo)
+    # Una reserva vencida se muestra libre aunque el barrido todavía no la haya liberado
+    vencidos = set(reservas_vencidas().filter(vuelo=vuelo).values_list('asiento_id', flat=True))
+    por_posicion = {}
+    reservados = set()
+    for asiento in Asiento.objects.filter(avion_id=vuelo.avion_id):
+        asiento.reservado = inventario.ocupado(asiento.fila, asiento.columna) and asiento.id not in vencidos
+        if asiento.reservado:
+            reservados.add(asiento.id)
+        por_posicion[(asiento.fila, asiento.columna)] = asiento
+
+    layout = {
+        fila: [por_posicion.get((fila, columna)) for columna in range(1, vuelo.avion.columnas + 1)]
+        for fila in range(1, vuelo.avion.filas + 1)
+    }
+    return layout, reservados
@@ -0,0 +1,26 @@
+from django.conf import settings
+
+
+def configurar_sqlite(sender, connection, **kwargs):
+    # WAL deja leer mientras otra conexión escribe; busy_timeout espera el bloqueo en lugar de fallar
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA journal_mode=WAL')
+        cursor.execute(f'PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}')
+        cursor.execute('PRAGMA synchronous=NORMAL')
+
+
+def describir_conexion(connection):
+    # Resumen del perfil activo, para que los benchmarks digan contra qué corrieron
+    ajustes = connection.settings_dict
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA journal_mode')
+            modo = cursor.fetchone()[0]
+            cursor.execute('PRAGMA synchronous')
+            sincronico = {0: 'OFF', 1: 'NORMAL', 2: 'FULL', 3: 'EXTRA'}.get(cursor.fetchone()[0])
+        return f"sqlite (journal_mode={modo}, synchronous={sincronico})"
+    pool = ajustes['OPTIONS'].get('pool')
+    conexiones = f"pool {pool['min_size']}-{pool['max_size']}" if pool else f"CONN_MAX_AGE={ajustes['CONN_MAX_AGE']}"
+    return f"{connection.vendor} ({conexiones})"
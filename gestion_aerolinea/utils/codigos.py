@@ -0,0 +1,137 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import IntegrityError, connection, connections, transaction
+from django.db.models import F, Q
+
+from ..models import SecuenciaCodigo
+
+# Base 32 de Crockford: sin I, L, O ni U para que no se confundan al dictarlos o tipearlos
+ALFABETO = '0123456789ABCDEFGHJKMNPQRSTVWXYZ'
+BASE = len(ALFABETO)
+# Ancho fijo: el orden alfabético de los códigos es el de sus números y los inserts van al final del índice
+DIGITOS_CODIGO = 7
+LARGO_CODIGO = DIGITOS_CODIGO + 1
+MAXIMO_CODIGO = BASE ** DIGITOS_CODIGO - 1
+TAMANO_BLOQUE_CODIGOS = 100
+
+_VALORES = {caracter: valor for valor, caracter in enumerate(ALFABETO)}
+_VALORES.update({'O': 0, 'I': 1, 'L': 1})
+# Luhn mod 32: suma de los dígitos en base 32 de cada valor duplicado
+_DUPLICADOS = [2 * valor // BASE + 2 * valor % BASE for valor in range(BASE)]
+
+
+def _digito_control(valores):
+    # Luhn mod N: detecta cualquier carácter cambiado y casi todas las transposiciones de vecinos
+    suma = 0
+    for posicion, valor in enumerate(reversed(valores)):
+        suma += _DUPLICADOS[valor] if posicion % 2 == 0 else valor
+    return (BASE - suma % BASE) % BASE
+
+
+def codificar(numero):
+    if not 0 < numero <= MAXIMO_CODIGO:
+        raise ValueError(f"{numero} no entra en {DIGITOS_CODIGO} dígitos de base {BASE}.")
+    valores = [0] * DIGITOS_CODIGO
+    for posicion in range(DIGITOS_CODIGO - 1, -1, -1):
+        numero, valores[posicion] = divmod(numero, BASE)
+    valores.append(_digito_control(valores))
+    return ''.join([ALFABETO[valor] for valor in valores])
+
+
+def decodificar(codigo):
+    # Devuelve el número del código, o ValueError si no es un código válido; no consulta la base
+    texto = codigo.strip().upper().replace('-', '').replace(' ', '')
+    if len(texto) != LARGO_CODIGO:
+        raise ValueError(f"El código debe tener {LARGO_CODIGO} caracteres.")
+    try:
+        valores = [_VALORES[caracter] for caracter in texto]
+    except KeyError:
+        raise ValueError("El código tiene caracteres inválidos.")
+    if _digito_control(valores[:-1]) != valores[-1]:
+        raise ValueError("El código no es válido; revisa que esté bien escrito.")
+    numero = 0
+    for valor in valores[:-1]:
+        numero = numero * BASE + valor
+    return numero
+
+
+def normalizar(codigo):
+    # Forma guardada en la base de un código tipeado a mano (minúsculas, guiones, O por 0...)
+    return codificar(decodificar(codigo))
+
+
+def filtro_codigo(campo, texto):
+    # Búsqueda directa por el número del código: se valida el dígito de control sin consultar la base y la
+    # consulta es una igualdad sobre el índice único. None si el texto no es un código válido.
+    # El número es de la secuencia de códigos, no el id de la fila: los ids también los asignan otros caminos.
+    try:
+        numero = decodificar(texto)
+    except ValueError:
+        return None
+    return Q(**{campo: codificar(numero)})
+
+
+def _reservar_bloque(nombre, tamano):
+    with transaction.atomic():
+        if not SecuenciaCodigo.objects.filter(nombre=nombre).update(siguiente=F('siguiente') + tamano):
+            # Primer bloque de la secuencia; si otro proceso la creó al mismo tiempo, se actualiza la suya
+            try:
+                with transaction.atomic():
+                    SecuenciaCodigo.objects.create(nombre=nombre, siguiente=1 + tamano)
+            except IntegrityError:
+                SecuenciaCodigo.objects.filter(nombre=nombre).update(siguiente=F('siguiente') + tamano)
+        fin = SecuenciaCodigo.objects.values_list('siguiente', flat=True).get(nombre=nombre)
+    return fin - tamano, fin
+
+
+def _reservar_bloque_aparte(nombre, tamano):
+    try:
+        return _reservar_bloque(nombre, tamano)
+    finally:
+        connections.close_all()
+
+
+def reservar_bloque(nombre, tamano):
+    # Devuelve el rango [desde, hasta) de números que quedan para este proceso
+    if not connection.in_atomic_block:
+        return _reservar_bloque(nombre, tamano)
+    # Dentro de una transacción el bloque se toma en otra conexión: si la de afuera se revierte, otro
+    # proceso podría recibir los mismos números. En SQLite eso espera a que la de afuera suelte la
+    # escritura, así que los códigos se piden antes de escribir.
+    with ThreadPoolExecutor(max_workers=1) as hilo:
+        return hilo.submit(_reservar_bloque_aparte, nombre, tamano).result()
+
+
+class GeneradorCodigos:
+    # Códigos únicos sin reintentos: cada proceso reparte números de un bloque reservado en SecuenciaCodigo
+    # y solo vuelve a la base cuando se le acaba. Los números que no se usan quedan como huecos.
+    def __init__(self, nombre, tamano_bloque=TAMANO_BLOQUE_CODIGOS):
+        self.nombre = nombre
+        self.tamano_bloque = tamano_bloque
+        self._bloqueo = threading.Lock()
+        self._siguiente = self._fin = 0
+        self._pid = None
+
+    def tomar(self, cantidad=1):
+        numeros = []
+        with self._bloqueo:
+            if self._pid != os.getpid():
+                # Un proceso hijo no puede seguir con el bloque que heredó del padre
+                self._siguiente = self._fin = 0
+                self._pid = os.getpid()
+            while len(numeros) < cantidad:
+                if self._siguiente >= self._fin:
+                    self._siguiente, self._fin = reservar_bloque(self.nombre, max(self.tamano_bloque, cantidad - len(numeros)))
+                hasta = min(self._fin, self._siguiente + cantidad - len(numeros))
+                numeros.extend(range(self._siguiente, hasta))
+                self._siguiente = hasta
+        return [codificar(numero) for numero in numeros]
+
+    def siguiente(self):
+        return self.tomar()[0]
+
+
+codigos_reserva = GeneradorCodigos('reserva')
+codigos_boleto = GeneradorCodigos('boleto')
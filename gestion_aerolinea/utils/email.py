@@ -1,19 +1,18 @@
 from django.core.mail import EmailMessage
 from django.template.loader import render_to_string
 from django.conf import settings
-from weasyprint import HTML
 from ..models import Boleto
+from .pdf import obtener_pdf_boleto
 
-def enviar_boleto_por_email(boleto_id, request):
+def enviar_boleto_por_email(boleto_id, url_base):
     try:
-        boleto = Boleto.objects.get(id=boleto_id)
+        boleto = Boleto.objects.select_related(
+            'reserva__vuelo__aeropuerto_origen', 'reserva__vuelo__aeropuerto_destino', 'reserva__asiento', 'reserva__pasajero', 'reserva__usuario_reserva'
+        ).get(id=boleto_id)
         reserva = boleto.reserva
         usuario = reserva.usuario_reserva
         
-        context = {'boleto': boleto, 'reserva': reserva}
-        html_string = render_to_string('cliente/boleto_pdf.html', context)
-        html = HTML(string=html_string, base_url=request.build_absolute_uri())
-        pdf_content = html.write_pdf()
+        pdf_content = obtener_pdf_boleto(boleto, url_base)
 
         asunto = f"Tu Boleto de Vuelo - Reserva #{reserva.codigo_reserva}"
         mensaje_html = render_to_string('cliente/boleto_email.html', {'reserva': reserva, 'boleto': boleto})
@@ -0,0 +1,76 @@
+import uuid
+from datetime import timedelta
+
+from django.db import close_old_connections
+from django.db.models import F, Q
+from django.utils import timezone
+
+from ..models import EmisionBoleto
+from .email import enviar_boleto_por_email
+
+MAX_INTENTOS_EMISION = 5
+ESPERA_BASE_EMISION = timedelta(seconds=30)
+# Un trabajo 'procesando' sin novedades por este tiempo se considera abandonado por un worker caído
+TIEMPO_MAXIMO_PROCESANDO = timedelta(minutes=10)
+
+
+def encolar_emision(boleto, url_base):
+    return EmisionBoleto.objects.create(boleto=boleto, url_base=url_base)
+
+
+def tomar_trabajos(limite):
+    ahora = timezone.now()
+    disponibles = EmisionBoleto.objects.filter(
+        Q(estado='pendiente', proximo_intento__lte=ahora)
+        | Q(estado='procesando', fecha_actualizacion__lt=ahora - TIEMPO_MAXIMO_PROCESANDO)
+    ).order_by('proximo_intento').values_list('id', flat=True)[:limite]
+
+    # El UPDATE condicional reparte los trabajos entre workers sin depender de SELECT ... FOR UPDATE
+    token = uuid.uuid4().hex
+    EmisionBoleto.objects.filter(
+        Q(estado='pendiente') | Q(estado='procesando', fecha_actualizacion__lt=ahora - TIEMPO_MAXIMO_PROCESANDO),
+        id__in=list(disponibles),
+    ).update(
+        estado='procesando',
+        tomado_por=token,
+        intentos=F('intentos') + 1,
+        fecha_actualizacion=ahora,
+    )
+    return list(EmisionBoleto.objects.filter(tomado_por=token, estado='procesando'))
+
+
+def procesar_trabajo(trabajo):
+    close_old_connections()
+    try:
+        exito, mensaje = enviar_boleto_por_email(trabajo.boleto_id, trabajo.url_base)
+        proximo_intento = trabajo.proximo_intento
+        if exito:
+            estado, ultimo_error = 'enviado', ''
+        elif trabajo.intentos >= MAX_INTENTOS_EMISION:
+            estado, ultimo_error = 'fallido', mensaje
+        else:
+            estado, ultimo_error = 'pendiente', mensaje
+            proximo_intento = timezone.now() + ESPERA_BASE_EMISION * 2 ** (trabajo.intentos - 1)
+
+        # Si otro worker lo reclamó por abandonado, el resultado de este se descarta
+        actualizado = EmisionBoleto.objects.filter(
+            pk=trabajo.pk, tomado_por=trabajo.tomado_por, estado='procesando',
+        ).update(
+            estado=estado,
+            ultimo_error=ultimo_error,
+            proximo_intento=proximo_intento,
+            fecha_actualizacion=timezone.now(),
+        )
+        if not actualizado:
+            return 'descartado'
+        trabajo.estado, trabajo.ultimo_error, trabajo.proximo_intento = estado, ultimo_error, proximo_intento
+        return estado
+    finally:
+        close_old_connections()
+
+
+def reintentar_emision(emision):
+    emision.estado = 'pendiente'
+    emision.intentos = 0
+    emision.proximo_intento = timezone.now()
+    emision.save(update_fields=['estado', 'intentos', 'proximo_intento', 'fecha_actualizacion'])
@@ -0,0 +1,233 @@
+import csv
+import io
+import re
+import zipfile
+from datetime import date, datetime
+from decimal import Decimal
+from xml.sax.saxutils import escape
+
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+from ..models import Reserva, Vuelo
+from .lotes import zip_en_streaming
+
+# Filas que trae cada viaje al cursor del servidor y filas por bloque enviado al cliente
+TAMANO_LOTE_EXPORTACION = 2000
+FILAS_POR_BLOQUE = 500
+
+TIPOS_CONTENIDO = {
+    'csv': 'text/csv; charset=utf-8',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+FORMATOS_EXPORTACION = list(TIPOS_CONTENIDO)
+
+# Caracteres de control que XML no admite
+_CARACTERES_INVALIDOS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+_CARACTERES_INVALIDOS_HOJA = re.compile(r'[\[\]:*?/\\]')
+_ORIGEN_EXCEL = datetime(1899, 12, 30)
+# Un texto que empieza así la planilla lo toma como fórmula; se antepone un apóstrofo
+_INICIO_FORMULA = ('=', '+', '-', '@', '\t', '\r')
+
+
+def exportar_reservas(reservas=None):
+    columnas = [
+        'Código', 'Fecha de reserva', 'Estado', 'Vuelo', 'Origen', 'Destino', 'Salida', 'Asiento',
+        'Nombre', 'Apellido', 'Tipo de documento', 'Número de documento', 'Usuario', 'Precio',
+    ]
+    reservas = reservas if reservas is not None else Reserva.objects.all()
+    filas = reservas.order_by('-fecha_reserva', '-id').values_list(
+        'codigo_reserva', 'fecha_reserva', 'estado', 'vuelo_id', 'vuelo__origen', 'vuelo__destino',
+        'vuelo__fecha_salida', 'asiento__numero', 'pasajero__nombre', 'pasajero__apellido',
+        'pasajero__tipo_documento', 'pasajero__numero_documento', 'usuario_reserva__username', 'precio_total',
+    ).iterator(chunk_size=TAMANO_LOTE_EXPORTACION)
+    return columnas, filas
+
+
+def exportar_pasajeros_vuelo(vuelo):
+    columnas = ['Asiento', 'Nombre', 'Apellido', 'Tipo de documento', 'Número de documento', 'Email', 'Código de reserva']
+    filas = Reserva.objects.filter(vuelo=vuelo, estado='confirmada').order_by(
+        'asiento__fila', 'asiento__columna',
+    ).values_list(
+        'asiento__numero', 'pasajero__nombre', 'pasajero__apellido', 'pasajero__tipo_documento',
+        'pasajero__numero_documento', 'pasajero__email', 'codigo_reserva',
+    ).iterator(chunk_size=TAMANO_LOTE_EXPORTACION)
+    return columnas, filas
+
+
+def exportar_recaudacion_vuelos():
+    # Lee los contadores del vuelo: no agrupa reservas
+    columnas = [
+        'Vuelo', 'Origen', 'Destino', 'Salida', 'Estado', 'Avión', 'Capacidad',
+        'Confirmados', 'Pendientes', 'Libres', 'Recaudación',
+    ]
+    filas = Vuelo.objects.order_by('fecha_salida', 'id').values_list(
+        'id', 'origen', 'destino', 'fecha_salida', 'estado', 'avion__modelo', 'avion__capacidad',
+        'asientos_confirmados', 'asientos_pendientes', 'asientos_libres', 'recaudacion',
+    ).iterator(chunk_size=TAMANO_LOTE_EXPORTACION)
+    return columnas, filas
+
+
+def _sin_formula(texto):
+    return f"'{texto}" if texto.startswith(_INICIO_FORMULA) else texto
+
+
+def _texto(valor):
+    if valor is None:
+        return ''
+    if isinstance(valor, str):
+        return _sin_formula(valor)
+    if isinstance(valor, datetime):
+        if timezone.is_aware(valor):
+            valor = timezone.localtime(valor)
+        return valor.strftime('%Y-%m-%d %H:%M')
+    return str(valor)
+
+
+def _en_bloques(filas):
+    bloque = []
+    for fila in filas:
+        bloque.append(fila)
+        if len(bloque) == FILAS_POR_BLOQUE:
+            yield bloque
+            bloque = []
+    if bloque:
+        yield bloque
+
+
+def csv_en_streaming(columnas, filas):
+    # BOM para que Excel reconozca UTF-8 y muestre bien los acentos
+    salida = io.StringIO()
+    escritor = csv.writer(salida)
+    salida.write('\ufeff')
+    escritor.writerow(columnas)
+    for bloque in _en_bloques(filas):
+        escritor.writerows([_texto(valor) for valor in fila] for fila in bloque)
+        yield salida.getvalue().encode()
+        salida.seek(0)
+        salida.truncate()
+    yield salida.getvalue().encode()
+
+
+def _columna_excel(indice):
+    letras = ''
+    indice += 1
+    while indice:
+        indice, resto = divmod(indice - 1, 26)
+        letras = chr(65 + resto) + letras
+    return letras
+
+
+def _celda(referencia, valor):
+    # Estilos de xl/styles.xml: 1 = fecha y hora, 2 = fecha
+    if valor is None:
+        return ''
+    if isinstance(valor, bool):
+        return f'<c r="{referencia}" t="b"><v>{int(valor)}</v></c>'
+    if isinstance(valor, (int, float, Decimal)):
+        return f'<c r="{referencia}"><v>{valor}</v></c>'
+    if isinstance(valor, datetime):
+        if timezone.is_aware(valor):
+            valor = timezone.make_naive(valor)
+        serial = (valor - _ORIGEN_EXCEL).total_seconds() / 86400
+        return f'<c r="{referencia}" s="1"><v>{serial:.8f}</v></c>'
+    if isinstance(valor, date):
+        return f'<c r="{referencia}" s="2"><v>{(valor - _ORIGEN_EXCEL.date()).days}</v></c>'
+    texto = escape(_sin_formula(_CARACTERES_INVALIDOS.sub('', str(valor))))
+    return f'<c r="{referencia}" t="inlineStr"><is><t xml:space="preserve">{texto}</t></is></c>'
+
+
+def _hoja_xlsx(columnas, filas):
+    letras = [_columna_excel(i) for i in range(len(columnas))]
+
+    def fila_xml(numero, valores):
+        celdas = ''.join(_celda(f'{letra}{numero}', valor) for letra, valor in zip(letras, valores))
+        return f'<row r="{numero}">{celdas}</row>'
+
+    yield (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+        + fila_xml(1, columnas)
+    ).encode()
+    numero = 1
+    for bloque in _en_bloques(filas):
+        partes = []
+        for valores in bloque:
+            numero += 1
+            partes.append(fila_xml(numero, valores))
+        yield ''.join(partes).encode()
+    yield b'</sheetData></worksheet>'
+
+
+def xlsx_en_streaming(columnas, filas, hoja='Datos'):
+    # XLSX mínimo (un libro, una hoja, textos en línea) escrito por partes dentro del ZIP
+    nombre_hoja = escape(_CARACTERES_INVALIDOS_HOJA.sub('-', hoja)[:31])
+    partes = [
+        ('[Content_Types].xml', (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/xl/workbook.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+            '<Override PartName="/xl/worksheets/sheet1.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+            '<Override PartName="/xl/styles.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+            '</Types>'
+        ).encode()),
+        ('_rels/.rels', (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            '<Relationship Id="rId1" '
+            'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+            'Target="xl/workbook.xml"/>'
+            '</Relationships>'
+        ).encode()),
+        ('xl/workbook.xml', (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+            'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+            f'<sheets><sheet name="{nombre_hoja}" sheetId="1" r:id="rId1"/></sheets>'
+            '</workbook>'
+        ).encode()),
+        ('xl/_rels/workbook.xml.rels', (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            '<Relationship Id="rId1" '
+            'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+            'Target="worksheets/sheet1.xml"/>'
+            '<Relationship Id="rId2" '
+            'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" '
+            'Target="styles.xml"/>'
+            '</Relationships>'
+        ).encode()),
+        ('xl/styles.xml', (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+            '<numFmts count="1"><numFmt numFmtId="164" formatCode="yyyy-mm-dd hh:mm"/></numFmts>'
+            '<fonts count="1"><font><sz val="11"/><name val="Calibri"/></font></fonts>'
+            '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+            '<fill><patternFill patternType="gray125"/></fill></fills>'
+            '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+            '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+            '<cellXfs count="3"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+            '<xf numFmtId="164" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+            '<xf numFmtId="14" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/></cellXfs>'
+            '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+            '</styleSheet>'
+        ).encode()),
+        ('xl/worksheets/sheet1.xml', _hoja_xlsx(columnas, filas)),
+    ]
+    return zip_en_streaming(partes, compresion=zipfile.ZIP_DEFLATED)
+
+
+def respuesta_exportacion(nombre, formato, columnas, filas):
+    if formato == 'xlsx':
+        contenido = xlsx_en_streaming(columnas, filas, hoja=nombre)
+    else:
+        formato = 'csv'
+        contenido = csv_en_streaming(columnas, filas)
+    response = StreamingHttpResponse(contenido, content_type=TIPOS_CONTENIDO[formato])
+    response['Content-Disposition'] = f'attachment; filename="{nombre}.{formato}"'
+    return response
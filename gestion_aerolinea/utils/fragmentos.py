@@ -0,0 +1,77 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+CLAVE_VERSION_VUELOS = 'fragmentos:version:vuelos'
+PREFIJO_ESTADISTICAS = 'fragmentos:estadisticas'
+# Nombres de los fragmentos cacheados, para listar sus contadores
+FRAGMENTOS = ['vuelos_sugeridos', 'catalogo_vuelos']
+
+
+def _nueva_version():
+    # Basada en el reloj: si la caché perdió la versión, la nueva no coincide con claves viejas
+    return int(time.time() * 1000)
+
+
+def version_vuelos():
+    version = cache.get(CLAVE_VERSION_VUELOS)
+    if version is None:
+        cache.add(CLAVE_VERSION_VUELOS, _nueva_version(), None)
+        version = cache.get(CLAVE_VERSION_VUELOS)
+    return version
+
+
+def invalidar_vuelos():
+    try:
+        cache.incr(CLAVE_VERSION_VUELOS)
+    except ValueError:
+        cache.set(CLAVE_VERSION_VUELOS, _nueva_version(), None)
+
+
+def invalidar_vuelos_al_confirmar(sender, **kwargs):
+    # Receptor de post_save/post_delete: invalidar antes del commit dejaría cachear los datos viejos con la versión nueva
+    transaction.on_commit(invalidar_vuelos)
+
+
+def _contar(nombre, resultado):
+    clave = f'{PREFIJO_ESTADISTICAS}:{nombre}:{resultado}'
+    try:
+        cache.incr(clave)
+    except ValueError:
+        if not cache.add(clave, 1, None):
+            cache.incr(clave)
+
+
+def fragmento_vuelos(nombre, calcular, variante=''):
+    # La clave combina la versión (cambia con cada alta, edición o baja de vuelos) y la franja de tiempo,
+    # así lo que depende de "ahora" (vuelos que ya salieron, asientos libres) se renueva al cambiar de franja.
+    duracion = settings.CACHE_FRAGMENTOS_SEGUNDOS
+    franja = int(time.time() // duracion)
+    clave = f'fragmentos:{nombre}:v{version_vuelos()}:f{franja}:{variante}'
+
+    valor = cache.get(clave)
+    if valor is not None:
+        _contar(nombre, 'aciertos')
+        return valor
+    _contar(nombre, 'fallos')
+    valor = calcular()
+    cache.set(clave, valor, duracion)
+    return valor
+
+
+def estadisticas_fragmentos():
+    claves = {
+        f'{PREFIJO_ESTADISTICAS}:{nombre}:{resultado}': (nombre, resultado)
+        for nombre in FRAGMENTOS
+        for resultado in ('aciertos', 'fallos')
+    }
+    valores = cache.get_many(claves)
+    estadisticas = {nombre: {'aciertos': 0, 'fallos': 0} for nombre in FRAGMENTOS}
+    for clave, (nombre, resultado) in claves.items():
+        estadisticas[nombre][resultado] = valores.get(clave, 0)
+    for datos in estadisticas.values():
+        total = datos['aciertos'] + datos['fallos']
+        datos['tasa_aciertos'] = round(datos['aciertos'] / total, 3) if total else None
+    return estadisticas
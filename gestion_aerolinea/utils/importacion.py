@@ -0,0 +1,193 @@
+import csv
+import io
+import json
+from dataclasses import dataclass, field
+
+from django import forms
+from django.db import transaction
+from django.utils import timezone
+
+from ..forms import AvionForm, VueloForm, validar_fecha_salida, validar_horario_vuelo
+from ..models import Aeropuerto, Avion, Vuelo
+from .fragmentos import invalidar_vuelos
+from .resumenes import registrar_vuelos_creados
+from .texto import normalizar_busqueda
+
+TAMANO_LOTE_IMPORTACION = 1000
+MAX_ERRORES_IMPORTACION = 100
+# Mismos campos y reglas que el alta manual; el avión se resuelve aparte, sin una consulta por fila
+CAMPOS_VUELO = ['origen', 'destino', 'fecha_salida', 'fecha_llegada', 'estado', 'precio_base']
+ESTADO_POR_DEFECTO = 'programado'
+
+
+@dataclass
+class ResultadoImportacion:
+    vuelos_creados: int = 0
+    vuelos_duplicados: int = 0
+    aviones_creados: int = 0
+    filas_leidas: int = 0
+    errores: list = field(default_factory=list)
+    descartado: bool = False
+
+    def agregar_error(self, fila, mensaje):
+        self.errores.append((fila, mensaje))
+
+
+def _mensajes(error):
+    if hasattr(error, 'error_dict'):
+        return [f"{campo}: {mensaje}" for campo, errores in error.message_dict.items() for mensaje in errores]
+    return list(error.messages)
+
+
+def leer_horario(archivo, nombre):
+    # Devuelve (aviones, filas de vuelos). Cada fila es (número, dict); en CSV el número es la línea del archivo.
+    if nombre.lower().endswith('.json'):
+        datos = json.load(io.TextIOWrapper(archivo, encoding='utf-8-sig'))
+        if isinstance(datos, list):
+            datos = {'vuelos': datos}
+        if not isinstance(datos, dict):
+            raise ValueError("El JSON debe ser una lista de vuelos o un objeto con 'vuelos' y 'aviones'.")
+        return datos.get('aviones') or [], enumerate(datos.get('vuelos') or [], start=1)
+
+    lector = csv.DictReader(io.TextIOWrapper(archivo, encoding='utf-8-sig', newline=''))
+    faltantes = {'origen', 'destino', 'fecha_salida', 'fecha_llegada', 'precio_base', 'avion'} - set(lector.fieldnames or [])
+    if faltantes:
+        raise ValueError("Faltan columnas en el CSV: " + ", ".join(sorted(faltantes)))
+    return [], ((lector.line_num, fila) for fila in lector)
+
+
+class _ResolutorHorario:
+    # Cachea aviones (una sola consulta al empezar) y aeropuertos (una resolución por ciudad distinta)
+    def __init__(self):
+        self.aviones_por_id = {}
+        self.aviones_por_modelo = {}
+        for avion in Avion.objects.only('id', 'modelo', 'capacidad'):
+            self._registrar_avion(avion)
+        self.aeropuertos = {}
+        self.campos = {nombre: VueloForm.base_fields[nombre] for nombre in CAMPOS_VUELO}
+
+    def _registrar_avion(self, avion):
+        self.aviones_por_id[avion.id] = avion
+        self.aviones_por_modelo.setdefault(avion.modelo.strip().lower(), []).append(avion)
+
+    def crear_aviones(self, aviones, resultado):
+        for numero, datos in enumerate(aviones, start=1):
+            if not isinstance(datos, dict):
+                resultado.agregar_error(f"Avión {numero}", "Se esperaba un objeto.")
+                continue
+            if str(datos.get('modelo', '')).strip().lower() in self.aviones_por_modelo:
+                continue
+            form = AvionForm(datos)
+            if not form.is_valid():
+                for campo, mensajes in form.errors.items():
+                    for mensaje in mensajes:
+                        resultado.agregar_error(f"Avión {numero}", f"{campo}: {mensaje}")
+                continue
+            self._registrar_avion(form.save())
+            resultado.aviones_creados += 1
+
+    def avion(self, clave):
+        clave = str(clave or '').strip()
+        if clave.isdigit() and int(clave) in self.aviones_por_id:
+            return self.aviones_por_id[int(clave)]
+        candidatos = self.aviones_por_modelo.get(clave.lower(), [])
+        if len(candidatos) == 1:
+            return candidatos[0]
+        if candidatos:
+            raise forms.ValidationError(f"Hay varios aviones '{clave}'; indique el id.")
+        raise forms.ValidationError(f"No existe el avión '{clave}'.")
+
+    def aeropuerto(self, texto):
+        # La misma clave que Aeropuerto.clave_busqueda: "Córdoba" y "cordoba" son un solo aeropuerto
+        clave = normalizar_busqueda(texto)
+        if clave not in self.aeropuertos:
+            self.aeropuertos[clave] = Aeropuerto.resolver(texto)
+        return self.aeropuertos[clave]
+
+    def vuelo(self, datos, ahora):
+        if not isinstance(datos, dict):
+            raise forms.ValidationError("Se esperaba un objeto con los datos del vuelo.")
+        datos = {**datos, 'estado': datos.get('estado') or ESTADO_POR_DEFECTO}
+        limpios, errores = {}, {}
+        for nombre, campo in self.campos.items():
+            try:
+                limpios[nombre] = campo.clean(datos.get(nombre))
+            except forms.ValidationError as error:
+                errores[nombre] = error.messages
+        try:
+            avion = self.avion(datos.get('avion'))
+        except forms.ValidationError as error:
+            errores['avion'] = error.messages
+        if errores:
+            raise forms.ValidationError(errores)
+
+        validar_fecha_salida(limpios['fecha_salida'], ahora)
+        validar_horario_vuelo(limpios['fecha_salida'], limpios['fecha_llegada'])
+        # Lo mismo que completa Vuelo.save, que bulk_create no llama
+        return Vuelo(
+            **limpios,
+            avion=avion,
+            duracion=limpios['fecha_llegada'] - limpios['fecha_salida'],
+            aeropuerto_origen=self.aeropuerto(limpios['origen']),
+            aeropuerto_destino=self.aeropuerto(limpios['destino']),
+            inventario_asientos=b'',
+            asientos_libres=avion.capacidad,
+        )
+
+
+CAMPOS_CLAVE_VUELO = ['avion_id', 'aeropuerto_origen_id', 'aeropuerto_destino_id', 'fecha_salida']
+
+
+def _clave(vuelo):
+    # Mismo avión, ruta y salida; los aeropuertos ya vienen resueltos con la clave normalizada
+    return tuple(getattr(vuelo, campo) for campo in CAMPOS_CLAVE_VUELO)
+
+
+def _guardar_lote(vuelos, lote, resultado):
+    # Un vuelo ya cargado (mismo avión, ruta y salida) se omite: reimportar un horario no lo duplica
+    existentes = set(Vuelo.objects.filter(
+        avion_id__in={vuelo.avion_id for vuelo in vuelos},
+        fecha_salida__in={vuelo.fecha_salida for vuelo in vuelos},
+    ).values_list(*CAMPOS_CLAVE_VUELO))
+    nuevos = [vuelo for vuelo in vuelos if _clave(vuelo) not in existentes]
+    resultado.vuelos_duplicados += len(vuelos) - len(nuevos)
+    Vuelo.objects.bulk_create(nuevos, batch_size=lote)
+    registrar_vuelos_creados(nuevos)
+    resultado.vuelos_creados += len(nuevos)
+
+
+def importar_horario(aviones, filas, lote=TAMANO_LOTE_IMPORTACION, todo_o_nada=False, simular=False):
+    # Valida e inserta por lotes; las filas con errores se informan y, salvo todo_o_nada, el resto se importa
+    resultado = ResultadoImportacion()
+    ahora = timezone.now()
+    with transaction.atomic():
+        resolutor = _ResolutorHorario()
+        resolutor.crear_aviones(aviones, resultado)
+
+        pendientes, vistos = [], set()
+        for numero, datos in filas:
+            resultado.filas_leidas += 1
+            try:
+                vuelo = resolutor.vuelo(datos, ahora)
+            except forms.ValidationError as error:
+                for mensaje in _mensajes(error):
+                    resultado.agregar_error(numero, mensaje)
+            else:
+                if _clave(vuelo) in vistos:
+                    resultado.vuelos_duplicados += 1
+                else:
+                    vistos.add(_clave(vuelo))
+                    pendientes.append(vuelo)
+            if len(pendientes) >= lote:
+                _guardar_lote(pendientes, lote, resultado)
+                pendientes = []
+        if pendientes:
+            _guardar_lote(pendientes, lote, resultado)
+
+        if simular or (todo_o_nada and resultado.errores):
+            transaction.set_rollback(True)
+            resultado.descartado = True
+        elif resultado.vuelos_creados:
+            # bulk_create no dispara post_save
+            transaction.on_commit(invalidar_vuelos)
+    return resultado
@@ -0,0 +1,225 @@
+from collections import Counter
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+
+from ..models import ESTADOS_RESERVA_ACTIVA, Reserva, Vuelo
+from .resumenes import registrar_movimiento
+
+ESTADOS_OCUPADOS = ESTADOS_RESERVA_ACTIVA
+CONTADORES_VUELO = ['asientos_pendientes', 'asientos_confirmados', 'recaudacion']
+TAMANO_LOTE_INVENTARIOS = 200
+
+
+class AsientosNoDisponibles(ValueError):
+    def __init__(self, asientos):
+        self.asientos = list(asientos)
+        numeros = ', '.join(asiento.numero for asiento in self.asientos)
+        super().__init__(f'Los asientos {numeros} ya han sido reservados.')
+
+
+class InventarioAsientos:
+    # Un bit por asiento, en orden fila por fila: 1 = ocupado
+    def __init__(self, filas, columnas, datos=b''):
+        self.filas = filas
+        self.columnas = columnas
+        tamano = (filas * columnas + 7) // 8
+        datos = bytes(datos or b'')
+        self.bits = bytearray(datos) if len(datos) == tamano else bytearray(tamano)
+
+    @classmethod
+    def de_vuelo(cls, vuelo):
+        return cls(vuelo.avion.filas, vuelo.avion.columnas, vuelo.inventario_asientos)
+
+    def _indice(self, fila, columna):
+        if not (1 <= fila <= self.filas and 1 <= columna <= self.columnas):
+            raise ValueError(f'El asiento {fila}-{columna} no existe en este avión.')
+        return (fila - 1) * self.columnas + (columna - 1)
+
+    def ocupado(self, fila, columna):
+        indice = self._indice(fila, columna)
+        return bool(self.bits[indice >> 3] & (1 << (indice & 7)))
+
+    def ocupar(self, fila, columna):
+        indice = self._indice(fila, columna)
+        self.bits[indice >> 3] |= 1 << (indice & 7)
+
+    def liberar(self, fila, columna):
+        indice = self._indice(fila, columna)
+        self.bits[indice >> 3] &= ~(1 << (indice & 7))
+
+    def ocupados(self):
+        return int.from_bytes(self.bits, 'little').bit_count()
+
+    def posiciones_ocupadas(self):
+        return {
+            (fila, columna)
+            for fila in range(1, self.filas + 1)
+            for columna in range(1, self.columnas + 1)
+            if self.ocupado(fila, columna)
+        }
+
+    def __bytes__(self):
+        return bytes(self.bits)
+
+
+def construir_inventario(vuelo):
+    inventario = InventarioAsientos(vuelo.avion.filas, vuelo.avion.columnas)
+    posiciones = Reserva.objects.filter(
+        vuelo=vuelo,
+        estado__in=ESTADOS_OCUPADOS,
+    ).values_list('asiento__fila', 'asiento__columna')
+    for fila, columna in posiciones:
+        inventario.ocupar(fila, columna)
+    return inventario
+
+
+def _conteo_reservas():
+    return {
+        'asientos_pendientes': Count('id', filter=Q(estado='pendiente')),
+        'asientos_confirmados': Count('id', filter=Q(estado='confirmada')),
+        'recaudacion': Sum('precio_total', filter=Q(estado='confirmada'), default=Decimal('0')),
+    }
+
+
+def contar_reservas(vuelo):
+    # Recuento desde las reservas; es lo que los contadores del vuelo deberían valer
+    return Reserva.objects.filter(vuelo=vuelo).aggregate(**_conteo_reservas())
+
+
+def reconstruir_inventario(vuelo):
+    inventario = construir_inventario(vuelo)
+    vuelo.inventario_asientos = bytes(inventario)
+    vuelo.asientos_libres = vuelo.avion.capacidad - inventario.ocupados()
+    contadores = contar_reservas(vuelo)
+    for campo, valor in contadores.items():
+        setattr(vuelo, campo, valor)
+    Vuelo.objects.filter(id=vuelo.id).update(
+        inventario_asientos=vuelo.inventario_asientos,
+        asientos_libres=vuelo.asientos_libres,
+        **contadores,
+    )
+    return inventario
+
+
+def reconstruir_inventarios_avion(avion):
+    # reconstruir_inventario para todos los vuelos del avión (p. ej. al cambiar su grilla) con una
+    # consulta de posiciones, una de contadores y updates en lote, sin importar cuántos vuelos tenga
+    vuelos = list(Vuelo.objects.filter(avion=avion).only('id', 'avion_id'))
+    inventarios = {vuelo.id: InventarioAsientos(avion.filas, avion.columnas) for vuelo in vuelos}
+    posiciones = Reserva.objects.filter(
+        vuelo__avion=avion, estado__in=ESTADOS_OCUPADOS,
+    ).values_list('vuelo_id', 'asiento__fila', 'asiento__columna')
+    for vuelo_id, fila, columna in posiciones:
+        inventarios[vuelo_id].ocupar(fila, columna)
+    contadores = {
+        fila.pop('vuelo_id'): fila
+        for fila in Reserva.objects.filter(vuelo__avion=avion).values('vuelo_id').annotate(**_conteo_reservas()).order_by()
+    }
+    vacios = {'asientos_pendientes': 0, 'asientos_confirmados': 0, 'recaudacion': Decimal('0')}
+    for vuelo in vuelos:
+        inventario = inventarios[vuelo.id]
+        vuelo.inventario_asientos = bytes(inventario)
+        vuelo.asientos_libres = avion.capacidad - inventario.ocupados()
+        for campo, valor in contadores.get(vuelo.id, vacios).items():
+            setattr(vuelo, campo, valor)
+    Vuelo.objects.bulk_update(
+        vuelos, ['inventario_asientos', 'asientos_libres', *CONTADORES_VUELO], batch_size=TAMANO_LOTE_INVENTARIOS,
+    )
+    return len(vuelos)
+
+
+def verificar_inventario(vuelo):
+    registrado = InventarioAsientos.de_vuelo(vuelo)
+    esperado = construir_inventario(vuelo)
+    marcados = registrado.posiciones_ocupadas()
+    reservados = esperado.posiciones_ocupadas()
+    return {
+        'sin_marcar': sorted(reservados - marcados),
+        'marcados_sin_reserva': sorted(marcados - reservados),
+        'libres_registrados': vuelo.asientos_libres,
+        'libres_esperados': vuelo.avion.capacidad - esperado.ocupados(),
+        'contadores_registrados': {campo: getattr(vuelo, campo) for campo in CONTADORES_VUELO},
+        'contadores_esperados': contar_reservas(vuelo),
+    }
+
+
+def _actualizar_inventario(vuelo_id, movimientos, ocupar, evento):
+    # movimientos: pares (asiento, cambios en los contadores del vuelo). Al liberar solo cuentan los
+    # asientos que seguían ocupados, así una reserva liberada dos veces no descuenta dos veces.
+    with transaction.atomic():
+        vuelo = Vuelo.objects.select_for_update().select_related('avion').get(id=vuelo_id)
+        inventario = InventarioAsientos.de_vuelo(vuelo)
+
+        if ocupar:
+            no_disponibles = [a for a, _ in movimientos if inventario.ocupado(a.fila, a.columna)]
+            if no_disponibles:
+                raise AsientosNoDisponibles(no_disponibles)
+            cambios = movimientos
+        else:
+            cambios = [(a, c) for a, c in movimientos if inventario.ocupado(a.fila, a.columna)]
+        if not cambios:
+            return vuelo
+
+        contadores = Counter()
+        for asiento, cambio in cambios:
+            if ocupar:
+                inventario.ocupar(asiento.fila, asiento.columna)
+            else:
+                inventario.liberar(asiento.fila, asiento.columna)
+            contadores.update(cambio)
+
+        delta = -len(cambios) if ocupar else len(cambios)
+        contadores = {campo: cambio for campo, cambio in contadores.items() if cambio}
+        Vuelo.objects.filter(id=vuelo.id).update(
+            inventario_asientos=bytes(inventario),
+            asientos_libres=F('asientos_libres') + delta,
+            **{campo: F(campo) + cambio for campo, cambio in contadores.items()},
+        )
+        vuelo.inventario_asientos = bytes(inventario)
+        vuelo.asientos_libres += delta
+        for campo, cambio in contadores.items():
+            setattr(vuelo, campo, getattr(vuelo, campo) + cambio)
+        registrar_movimiento(vuelo, contadores, **{evento: len(cambios)})
+        return vuelo
+
+
+def reclamar_asientos(vuelo_id, asientos):
+    # Marca todos los asientos o ninguno para reservas pendientes; la fila del vuelo queda bloqueada hasta el commit
+    movimientos = [(asiento, {'asientos_pendientes': 1}) for asiento in asientos]
+    return _actualizar_inventario(vuelo_id, movimientos, ocupar=True, evento='reservas')
+
+
+def liberar_asientos(vuelo_id, movimientos, motivo='canceladas'):
+    return _actualizar_inventario(vuelo_id, list(movimientos), ocupar=False, evento=motivo)
+
+
+def liberar_reservas(reservas, motivo='canceladas'):
+    # Llamar antes de cambiar el estado de las reservas, con las filas bloqueadas: los contadores se
+    # descuentan según el estado actual. motivo es la columna del resumen horario que suma la
+    # liberación: canceladas o vencidas.
+    por_vuelo = {}
+    for reserva in reservas:
+        if reserva.estado not in ESTADOS_OCUPADOS:
+            continue
+        if reserva.estado == 'confirmada':
+            cambio = {'asientos_confirmados': -1, 'recaudacion': -reserva.precio_total}
+        else:
+            cambio = {'asientos_pendientes': -1}
+        por_vuelo.setdefault(reserva.vuelo_id, []).append((reserva.asiento, cambio))
+    for vuelo_id, movimientos in por_vuelo.items():
+        liberar_asientos(vuelo_id, movimientos, motivo)
+
+
+def registrar_confirmacion(reserva):
+    # La reserva pasa de pendiente a confirmada: el asiento ya estaba ocupado en el inventario
+    contadores = {
+        'asientos_pendientes': -1,
+        'asientos_confirmados': 1,
+        'recaudacion': reserva.precio_total,
+    }
+    Vuelo.objects.filter(id=reserva.vuelo_id).update(
+        **{campo: F(campo) + cambio for campo, cambio in contadores.items()}
+    )
+    registrar_movimiento(reserva.vuelo, contadores, confirmadas=1)
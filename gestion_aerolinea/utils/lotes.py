@@ -0,0 +1,96 @@
+import multiprocessing
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+from django.template.loader import render_to_string
+
+from ..models import Reserva
+from .almacenamiento import guardar_cacheado, leer_cacheado
+from .pdf import html_a_pdf, html_boleto, ruta_pdf_boleto
+from .reportes import reporte_pasajeros
+
+PLANTILLA_MANIFIESTO_PDF = 'empleado/manifiesto_pdf.html'
+
+
+def documentos_vuelo(vuelo, url_base, procesos=None):
+    # Genera (nombre, pdf) para cada boleto confirmado del vuelo y el manifiesto.
+    # Los boletos ya cacheados se leen del storage; el resto se reparte en un pool de procesos,
+    # salvo con procesos=1, que los renderiza en el mismo proceso.
+    reservas = Reserva.objects.filter(
+        vuelo=vuelo,
+        estado='confirmada',
+        boleto__isnull=False,
+    ).select_related(
+        'vuelo__aeropuerto_origen', 'vuelo__aeropuerto_destino', 'asiento', 'pasajero', 'boleto',
+    ).order_by('asiento__fila', 'asiento__columna')
+
+    pendientes = []
+    for reserva in reservas:
+        boleto = reserva.boleto
+        nombre = f"Boleto-{boleto.codigo_barra}.pdf"
+        ruta = ruta_pdf_boleto(boleto)
+        pdf = leer_cacheado(ruta)
+        if pdf is not None:
+            yield nombre, pdf
+        else:
+            pendientes.append((nombre, html_boleto(boleto), ruta))
+
+    pendientes.append((
+        f"Manifiesto-Vuelo-{vuelo.id}.pdf",
+        render_to_string(PLANTILLA_MANIFIESTO_PDF, reporte_pasajeros(vuelo)),
+        None,
+    ))
+
+    htmls = [html for _, html, _ in pendientes]
+    if procesos == 1:
+        yield from _guardar_generados(pendientes, map(html_a_pdf, htmls, repeat(url_base)))
+        return
+
+    # 'spawn' evita heredar conexiones abiertas y threads del servidor en los procesos hijos
+    contexto = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=procesos, mp_context=contexto) as pool:
+        yield from _guardar_generados(pendientes, pool.map(html_a_pdf, htmls, repeat(url_base)))
+
+
+def _guardar_generados(pendientes, pdfs):
+    for (nombre, _, ruta), pdf in zip(pendientes, pdfs):
+        if ruta:
+            guardar_cacheado(ruta, pdf)
+        yield nombre, pdf
+
+
+class _SalidaZip:
+    # Archivo de solo escritura: zipfile lo trata como no posicionable y escribe en secuencia
+    def __init__(self):
+        self.partes = []
+
+    def write(self, datos):
+        self.partes.append(bytes(datos))
+        return len(datos)
+
+    def flush(self):
+        pass
+
+    def extraer(self):
+        datos = b''.join(self.partes)
+        self.partes = []
+        return datos
+
+
+def zip_en_streaming(documentos, compresion=zipfile.ZIP_STORED):
+    # El contenido puede ser bytes o un iterable de bytes, que se escribe por partes sin juntarlo en memoria
+    salida = _SalidaZip()
+    with zipfile.ZipFile(salida, 'w', compression=compresion) as archivo:
+        for nombre, contenido in documentos:
+            if isinstance(contenido, bytes):
+                archivo.writestr(nombre, contenido)
+            else:
+                with archivo.open(nombre, 'w', force_zip64=True) as entrada:
+                    for parte in contenido:
+                        entrada.write(parte)
+                        datos = salida.extraer()
+                        if datos:
+                            yield datos
+            yield salida.extraer()
+    yield salida.extraer()
@@ -0,0 +1,147 @@
+import base64
+import hashlib
+import json
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+TAMANO_PAGINA = 25
+
+
+@dataclass
+class PaginaKeyset:
+    objetos: list = field(default_factory=list)
+    url_siguiente: str = None
+    url_anterior: str = None
+
+    def __iter__(self):
+        return iter(self.objetos)
+
+    def __len__(self):
+        return len(self.objetos)
+
+    def __bool__(self):
+        return bool(self.objetos)
+
+    @property
+    def tiene_otras_paginas(self):
+        return bool(self.url_siguiente or self.url_anterior)
+
+
+def _campos_orden(orden):
+    # El id desempata filas con el mismo valor para que ninguna se repita ni se pierda entre páginas
+    campos = [(campo.lstrip('-'), campo.startswith('-')) for campo in orden]
+    if campos[-1][0] not in ('id', 'pk'):
+        campos.append(('id', campos[0][1]))
+    return campos
+
+
+def _valor(objeto, campo):
+    for parte in campo.split('__'):
+        objeto = getattr(objeto, parte)
+    return objeto
+
+
+class _CodificadorCursor(DjangoJSONEncoder):
+    # DjangoJSONEncoder recorta las fechas a milisegundos y se saltearían las filas del mismo milisegundo
+    def default(self, o):
+        if isinstance(o, datetime):
+            return {'fecha_hora': o.isoformat()}
+        return super().default(o)
+
+
+def _leer_valor(objeto):
+    if objeto.keys() == {'fecha_hora'}:
+        fecha_hora = parse_datetime(objeto['fecha_hora'])
+        if fecha_hora is None:
+            raise ValueError(objeto['fecha_hora'])
+        return fecha_hora
+    return objeto
+
+
+def codificar_cursor(objeto, campos):
+    valores = [_valor(objeto, campo) for campo, _ in campos]
+    return base64.urlsafe_b64encode(json.dumps(valores, cls=_CodificadorCursor).encode()).decode()
+
+
+def decodificar_cursor(cursor, campos):
+    try:
+        valores = json.loads(base64.urlsafe_b64decode(cursor.encode()), object_hook=_leer_valor)
+    except (ValueError, TypeError):
+        return None
+    if not isinstance(valores, list) or len(valores) != len(campos):
+        return None
+    return valores
+
+
+def _filtro_despues(campos, valores, invertir=False):
+    # (a, b, id) > (va, vb, vid) expandido, respetando el sentido de cada columna
+    condicion = Q()
+    for i, (campo, descendente) in enumerate(campos):
+        operador = 'lt' if descendente != invertir else 'gt'
+        tramo = Q(**{f'{campo}__{operador}': valores[i]})
+        for j in range(i):
+            tramo &= Q(**{campos[j][0]: valores[j]})
+        condicion |= tramo
+    return condicion
+
+
+def _url(request, parametro, cursor, conservar=None):
+    # conservar: parámetros del pedido que siguen en los enlaces; None los conserva todos
+    parametros = request.GET.copy()
+    for nombre in list(parametros):
+        if nombre in ('despues', 'antes') or (conservar is not None and nombre not in conservar):
+            del parametros[nombre]
+    parametros[parametro] = cursor
+    return f'?{parametros.urlencode()}'
+
+
+def _cursor_pedido(request, campos):
+    # El mismo cursor que usa paginar_keyset: 'antes' tiene prioridad y uno inválido equivale a la primera página
+    for parametro in ('antes', 'despues'):
+        valores = decodificar_cursor(request.GET.get(parametro, ''), campos)
+        if valores is not None:
+            return parametro, valores
+    return None, None
+
+
+def clave_pagina(request, orden):
+    # Identifica la página pedida solo por su cursor decodificado, para cachearla sin el resto de la query string
+    parametro, valores = _cursor_pedido(request, _campos_orden(orden))
+    if parametro is None:
+        return ''
+    contenido = json.dumps(valores, cls=_CodificadorCursor)
+    return f"{parametro}:{hashlib.sha256(contenido.encode()).hexdigest()[:32]}"
+
+
+def paginar_keyset(request, queryset, orden, tamano=TAMANO_PAGINA, conservar=None):
+    # Pagina por cursor sobre el orden dado: cada página es un LIMIT sobre el índice, sin OFFSET ni COUNT
+    campos = _campos_orden(orden)
+    orden_asc = [f"{'-' if descendente else ''}{campo}" for campo, descendente in campos]
+    orden_inv = [f"{'' if descendente else '-'}{campo}" for campo, descendente in campos]
+
+    parametro, valores = _cursor_pedido(request, campos)
+    antes = valores if parametro == 'antes' else None
+    despues = valores if parametro == 'despues' else None
+
+    if antes is not None:
+        filas = list(queryset.filter(_filtro_despues(campos, antes, invertir=True)).order_by(*orden_inv)[:tamano + 1])
+        hay_mas = len(filas) > tamano
+        objetos = filas[:tamano][::-1]
+        hay_anterior, hay_siguiente = hay_mas, True
+    else:
+        if despues is not None:
+            queryset = queryset.filter(_filtro_despues(campos, despues))
+        filas = list(queryset.order_by(*orden_asc)[:tamano + 1])
+        objetos = filas[:tamano]
+        hay_anterior, hay_siguiente = despues is not None, len(filas) > tamano
+
+    pagina = PaginaKeyset(objetos=objetos)
+    if objetos and hay_siguiente:
+        pagina.url_siguiente = _url(request, 'despues', codificar_cursor(objetos[-1], campos), conservar)
+    if objetos and hay_anterior:
+        pagina.url_anterior = _url(request, 'antes', codificar_cursor(objetos[0], campos), conservar)
+    return pagina
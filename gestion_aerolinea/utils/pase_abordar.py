@@ -0,0 +1,87 @@
+import base64
+import hashlib
+import posixpath
+
+from django.conf import settings
+from django.utils import timezone
+
+from .almacenamiento import guardar_cacheado, leer_cacheado
+from .qr import VERSION_CODIFICADOR, codificar_qr
+from .texto import normalizar_busqueda
+
+CARPETA_QR_BOLETOS = 'boletos_qr'
+NIVEL_QR = 'M'
+ESCALA_PNG_QR = 4
+COMPARTIMENTOS = {'economica': 'Y', 'ejecutiva': 'C', 'premium': 'F'}
+# Estado del pasajero en BCBP: 0 = boleto emitido, sin check-in
+ESTADO_PASAJERO = '0'
+
+
+def _campo(texto, largo):
+    # Mayúsculas sin acentos, recortado o completado con espacios hasta el largo fijo del campo
+    return normalizar_busqueda(str(texto)).upper()[:largo].ljust(largo)
+
+
+def _codigo_aeropuerto(aeropuerto, ciudad):
+    if aeropuerto is not None and aeropuerto.codigo_iata:
+        return aeropuerto.codigo_iata
+    return _campo(ciudad, 3)
+
+
+def datos_bcbp(boleto):
+    # Datos obligatorios de un tramo del pase de abordar IATA BCBP (Resolución 792). El código de
+    # reserva ocupa los 7 caracteres del PNR; el código del boleto va en el campo libre de la aerolínea.
+    reserva = boleto.reserva
+    vuelo = reserva.vuelo
+    asiento = reserva.asiento
+    columna = chr(ord('A') + asiento.columna - 1) if 1 <= asiento.columna <= 26 else '0'
+    return ''.join([
+        'M1',
+        _campo(f"{reserva.pasajero.apellido}/{reserva.pasajero.nombre}", 20),
+        'E',
+        _campo(reserva.codigo_reserva, 7),
+        _codigo_aeropuerto(vuelo.aeropuerto_origen, vuelo.origen),
+        _codigo_aeropuerto(vuelo.aeropuerto_destino, vuelo.destino),
+        _campo(settings.DESIGNADOR_AEROLINEA, 3),
+        f"{vuelo.id % 10000:04d} ",
+        f"{timezone.localtime(vuelo.fecha_salida).timetuple().tm_yday:03d}",
+        COMPARTIMENTOS.get(asiento.tipo, 'Y'),
+        f"{asiento.fila % 1000:03d}{columna}",
+        f"{reserva.id % 10000:04d} ",
+        ESTADO_PASAJERO,
+        f"{len(boleto.codigo_barra):02X}",
+        boleto.codigo_barra,
+    ])
+
+
+def clave_qr_boleto(boleto, datos=None):
+    partes = [VERSION_CODIFICADOR, NIVEL_QR, ESCALA_PNG_QR, datos or datos_bcbp(boleto)]
+    return hashlib.sha256('|'.join(str(parte) for parte in partes).encode()).hexdigest()[:32]
+
+
+def ruta_qr_boleto(boleto, formato, clave=None):
+    return posixpath.join(CARPETA_QR_BOLETOS, formato, str(boleto.id), f"{clave or clave_qr_boleto(boleto)}.{formato}")
+
+
+def obtener_qr_boleto(boleto, formato):
+    # formato: 'svg' o 'png'. Se codifica una vez por contenido del pase y se guardan los dos formatos.
+    datos = datos_bcbp(boleto)
+    clave = clave_qr_boleto(boleto, datos)
+    imagen = leer_cacheado(ruta_qr_boleto(boleto, formato, clave))
+    if imagen is None:
+        codigo = codificar_qr(datos, NIVEL_QR)
+        imagenes = {'svg': codigo.a_svg().encode(), 'png': codigo.a_png(escala=ESCALA_PNG_QR)}
+        for otro_formato, contenido in imagenes.items():
+            guardar_cacheado(ruta_qr_boleto(boleto, otro_formato, clave), contenido)
+        imagen = imagenes[formato]
+    return imagen
+
+
+def qr_svg_boleto(boleto):
+    # Para incrustar en la página; el SVG no lleva texto del pasajero, solo la geometría del código
+    return obtener_qr_boleto(boleto, 'svg').decode()
+
+
+def qr_png_boleto(boleto):
+    # Como data URI: WeasyPrint no tiene que pedir la imagen al servidor
+    return 'data:image/png;base64,' + base64.b64encode(obtener_qr_boleto(boleto, 'png')).decode()
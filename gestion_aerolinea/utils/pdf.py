@@ -0,0 +1,65 @@
+import hashlib
+import posixpath
+from functools import lru_cache
+
+from django.template.loader import get_template, render_to_string
+
+from weasyprint import HTML
+
+from .almacenamiento import guardar_cacheado, leer_cacheado
+from .pase_abordar import clave_qr_boleto, qr_png_boleto
+from .perfilado import medir
+
+PLANTILLA_BOLETO_PDF = 'cliente/boleto_pdf.html'
+CARPETA_BOLETOS_PDF = 'boletos_pdf'
+
+
+@lru_cache(maxsize=None)
+def version_plantilla(nombre):
+    # Cambiar la plantilla cambia la clave, así los PDF viejos no se vuelven a servir
+    fuente = get_template(nombre).template.source
+    return hashlib.sha256(fuente.encode()).hexdigest()[:12]
+
+
+def clave_pdf_boleto(boleto):
+    reserva = boleto.reserva
+    vuelo = reserva.vuelo
+    partes = [
+        version_plantilla(PLANTILLA_BOLETO_PDF),
+        boleto.id, boleto.codigo_barra, boleto.estado, boleto.fecha_emision.isoformat(),
+        reserva.id, reserva.codigo_reserva, reserva.estado,
+        reserva.asiento.fila, reserva.asiento.columna,
+        reserva.pasajero.nombre, reserva.pasajero.apellido,
+        vuelo.origen, vuelo.destino, vuelo.fecha_salida.isoformat(),
+        clave_qr_boleto(boleto),
+    ]
+    return hashlib.sha256('|'.join(str(parte) for parte in partes).encode()).hexdigest()[:32]
+
+
+def ruta_pdf_boleto(boleto, clave=None):
+    return posixpath.join(CARPETA_BOLETOS_PDF, str(boleto.id), f"{clave or clave_pdf_boleto(boleto)}.pdf")
+
+
+def html_a_pdf(html_string, url_base):
+    # Sin dependencias de Django: se puede ejecutar en procesos hijos del pool de lotes
+    return HTML(string=html_string, base_url=url_base).write_pdf()
+
+
+def html_boleto(boleto):
+    context = {'boleto': boleto, 'reserva': boleto.reserva, 'qr_png': qr_png_boleto(boleto)}
+    return render_to_string(PLANTILLA_BOLETO_PDF, context)
+
+
+def renderizar_pdf_boleto(boleto, url_base):
+    html = html_boleto(boleto)
+    with medir('weasyprint_ms'):
+        return html_a_pdf(html, url_base)
+
+
+def obtener_pdf_boleto(boleto, url_base, clave=None):
+    ruta = ruta_pdf_boleto(boleto, clave)
+    pdf = leer_cacheado(ruta)
+    if pdf is None:
+        pdf = renderizar_pdf_boleto(boleto, url_base)
+        guardar_cacheado(ruta, pdf)
+    return pdf
@@ -0,0 +1,144 @@
+import heapq
+import io
+import math
+import pstats
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+# Tiempos acumulados del pedido en curso; None cuando no se está perfilando
+_muestra_actual = ContextVar('muestra_perfilado', default=None)
+
+_bloqueo = threading.Lock()
+_muestras = {}
+_perfiles = []
+_contador_perfiles = 0
+
+METRICAS = ['total_ms', 'consultas', 'bd_ms', 'plantillas_ms', 'weasyprint_ms']
+
+
+def nueva_muestra():
+    return {'consultas': 0, 'bd_ms': 0.0, 'plantillas_ms': 0.0, 'weasyprint_ms': 0.0}
+
+
+@contextmanager
+def perfilando(muestra):
+    token = _muestra_actual.set(muestra)
+    try:
+        yield muestra
+    finally:
+        _muestra_actual.reset(token)
+
+
+@contextmanager
+def medir(metrica):
+    # Suma el tiempo del bloque a la métrica del pedido en curso; sin perfilado no hace nada
+    muestra = _muestra_actual.get()
+    if muestra is None:
+        yield
+        return
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        muestra[metrica] += (time.perf_counter() - inicio) * 1000
+
+
+def contar_consultas(execute, sql, params, many, context):
+    # Para connection.execute_wrapper
+    muestra = _muestra_actual.get()
+    if muestra is None:
+        return execute(sql, params, many, context)
+    muestra['consultas'] += 1
+    with medir('bd_ms'):
+        return execute(sql, params, many, context)
+
+
+def instrumentar_plantillas():
+    # render() y render_to_string() pasan por el Template del backend de Django; las inclusiones quedan adentro
+    from django.template.backends.django import Template
+
+    if getattr(Template.render, 'perfilado', False):
+        return
+    render_original = Template.render
+
+    def render(self, *args, **kwargs):
+        with medir('plantillas_ms'):
+            return render_original(self, *args, **kwargs)
+
+    render.perfilado = True
+    Template.render = render
+
+
+def registrar_muestra(vista, muestra):
+    with _bloqueo:
+        if vista not in _muestras:
+            _muestras[vista] = deque(maxlen=settings.PERFILADO_MUESTRAS_POR_VISTA)
+        _muestras[vista].append(muestra)
+
+
+def capturar_cprofile():
+    return settings.PERFILADO_CPROFILE_FRACCION > 0 and (
+        settings.PERFILADO_CPROFILE_FRACCION >= 1 or _sortear(settings.PERFILADO_CPROFILE_FRACCION)
+    )
+
+
+def _sortear(fraccion):
+    # Cada 1/fraccion pedidos, sin depender de random para que sea reproducible
+    global _contador_perfiles
+    with _bloqueo:
+        _contador_perfiles += 1
+        return _contador_perfiles % max(1, round(1 / fraccion)) == 0
+
+
+def guardar_perfil(vista, ruta, total_ms, perfil):
+    # Solo se conservan los PERFILADO_CPROFILE_GUARDADOS pedidos más lentos
+    limite = settings.PERFILADO_CPROFILE_GUARDADOS
+    with _bloqueo:
+        if len(_perfiles) >= limite and total_ms <= _perfiles[0][0]:
+            return
+    salida = io.StringIO()
+    pstats.Stats(perfil, stream=salida).sort_stats('cumulative').print_stats(30)
+    entrada = (total_ms, time.time(), {'vista': vista, 'ruta': ruta, 'total_ms': round(total_ms, 2), 'estadisticas': salida.getvalue()})
+    with _bloqueo:
+        if len(_perfiles) < limite:
+            heapq.heappush(_perfiles, entrada)
+        elif total_ms > _perfiles[0][0]:
+            heapq.heapreplace(_perfiles, entrada)
+
+
+def percentil(ordenados, p):
+    # Método del rango más cercano
+    return ordenados[max(0, math.ceil(p / 100 * len(ordenados)) - 1)]
+
+
+def resumen_perfilado():
+    with _bloqueo:
+        copias = {vista: list(muestras) for vista, muestras in _muestras.items()}
+    resumen = {}
+    for vista, muestras in copias.items():
+        datos = {'pedidos': len(muestras)}
+        for metrica in METRICAS:
+            valores = sorted(muestra[metrica] for muestra in muestras)
+            datos[metrica] = {
+                'p50': round(percentil(valores, 50), 2),
+                'p95': round(percentil(valores, 95), 2),
+                'p99': round(percentil(valores, 99), 2),
+            }
+        resumen[vista] = datos
+    return dict(sorted(resumen.items(), key=lambda item: -item[1]['total_ms']['p95']))
+
+
+def perfiles_lentos():
+    with _bloqueo:
+        return [datos for _, _, datos in sorted(_perfiles, reverse=True)]
+
+
+def reiniciar_perfilado():
+    with _bloqueo:
+        _muestras.clear()
+        _perfiles.clear()
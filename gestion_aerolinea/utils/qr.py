@@ -0,0 +1,316 @@
+import re
+import struct
+import zlib
+from dataclasses import dataclass
+from functools import lru_cache
+
+# Codificador QR (ISO/IEC 18004) en modo byte, sin dependencias de Django ni librerías externas.
+# Cambiar cómo se dibujan los códigos obliga a subir VERSION_CODIFICADOR para invalidar los cacheados.
+VERSION_CODIFICADOR = 1
+
+# Bits del nivel de corrección en la información de formato
+NIVELES = {'L': 1, 'M': 0, 'Q': 3, 'H': 2}
+# Por versión 1..40 (el índice 0 no se usa): bytes de corrección por bloque y cantidad de bloques
+_CORRECCION_POR_BLOQUE = {
+    'L': (0, 7, 10, 15, 20, 26, 18, 20, 24, 30, 18, 20, 24, 26, 30, 22, 24, 28, 30, 28, 28, 28, 28, 30, 30, 26, 28, 30, 30, 30, 30, 30, 30, 30, 30, 30, 30, 30, 30, 30, 30),
+    'M': (0, 10, 16, 26, 18, 24, 16, 18, 22, 22, 26, 30, 22, 22, 24, 24, 28, 28, 26, 26, 26, 26, 28, 28, 28, 28, 28, 28, 28, 28, 28, 28, 28, 28, 28, 28, 28, 28, 28, 28, 28),
+    'Q': (0, 13, 22, 18, 26, 18, 24, 18, 22, 20, 24, 28, 26, 24, 20, 30, 24, 28, 28, 26, 30, 28, 30, 30, 30, 30, 28, 30, 30, 30, 30, 30, 30, 30, 30, 30, 30, 30, 30, 30, 30),
+    'H': (0, 17, 28, 22, 16, 22, 28, 26, 26, 24, 28, 24, 28, 22, 24, 24, 30, 28, 28, 26, 28, 30, 24, 30, 30, 30, 30, 30, 30, 30, 30, 30, 30, 30, 30, 30, 30, 30, 30, 30, 30),
+}
+_BLOQUES = {
+    'L': (0, 1, 1, 1, 1, 1, 2, 2, 2, 2, 4, 4, 4, 4, 4, 6, 6, 6, 6, 7, 8, 8, 9, 9, 10, 12, 12, 12, 13, 14, 15, 16, 17, 18, 19, 19, 20, 21, 22, 24, 25),
+    'M': (0, 1, 1, 1, 2, 2, 4, 4, 4, 5, 5, 5, 8, 9, 9, 10, 10, 11, 13, 14, 16, 17, 17, 18, 20, 21, 23, 25, 26, 28, 29, 31, 33, 35, 37, 38, 40, 43, 45, 47, 49),
+    'Q': (0, 1, 1, 2, 2, 4, 4, 6, 6, 8, 8, 8, 10, 12, 16, 12, 17, 16, 18, 21, 20, 23, 23, 25, 27, 29, 34, 34, 35, 38, 40, 43, 45, 48, 51, 53, 56, 59, 62, 65, 68),
+    'H': (0, 1, 1, 2, 4, 4, 4, 5, 6, 8, 8, 11, 11, 16, 16, 18, 16, 19, 21, 25, 25, 25, 34, 30, 32, 35, 37, 40, 42, 45, 48, 51, 54, 57, 60, 63, 66, 70, 74, 77, 81),
+}
+_MASCARAS = (
+    lambda x, y: (x + y) % 2 == 0,
+    lambda x, y: y % 2 == 0,
+    lambda x, y: x % 3 == 0,
+    lambda x, y: (x + y) % 3 == 0,
+    lambda x, y: (x // 3 + y // 2) % 2 == 0,
+    lambda x, y: x * y % 2 + x * y % 3 == 0,
+    lambda x, y: (x * y % 2 + x * y % 3) % 2 == 0,
+    lambda x, y: ((x + y) % 2 + x * y % 3) % 2 == 0,
+)
+# Rachas de 5 o más módulos iguales y patrones 1:1:3:1:1 con 4 módulos claros a un lado (penalidades N1 y N3)
+_RACHAS = re.compile(r'0{5,}|1{5,}')
+_PARECIDOS_A_LOCALIZADOR = ('00001011101', '10111010000')
+
+# Campo de Galois GF(256) con el polinomio 0x11D
+_EXP = [0] * 512
+_LOG = [0] * 256
+_valor = 1
+for _i in range(255):
+    _EXP[_i] = _valor
+    _LOG[_valor] = _i
+    _valor <<= 1
+    if _valor & 0x100:
+        _valor ^= 0x11D
+for _i in range(255, 512):
+    _EXP[_i] = _EXP[_i - 255]
+
+
+class DatosDemasiadoLargos(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class CodigoQR:
+    version: int
+    nivel: str
+    mascara: int
+    # Una cadena de '0' y '1' por fila; '1' es un módulo oscuro
+    filas: tuple
+
+    @property
+    def tamano(self):
+        return len(self.filas)
+
+    def a_svg(self, borde=4):
+        # Un solo path con una línea de un módulo de alto por cada racha horizontal de módulos oscuros
+        lado = self.tamano + 2 * borde
+        trazos = [
+            f"M{racha.start() + borde} {y}.5h{racha.end() - racha.start()}"
+            for y, fila in enumerate(self.filas, start=borde)
+            for racha in re.finditer('1+', fila)
+        ]
+        return (
+            f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {lado} {lado}" shape-rendering="crispEdges">'
+            f'<path fill="#fff" d="M0 0h{lado}v{lado}H0z"/><path stroke="#000" d="{"".join(trazos)}"/></svg>'
+        )
+
+    def a_png(self, escala=4, borde=4):
+        # Escala de grises de 1 bit: el 0 es negro, así que se invierten los módulos
+        ancho = (self.tamano + 2 * borde) * escala
+        ampliar = str.maketrans({'0': '1' * escala, '1': '0' * escala})
+        relleno = '1' * (-ancho % 8)
+        claro = b'\x00' + int('1' * ancho + relleno, 2).to_bytes((ancho + 7) // 8, 'big')
+        lineas = [claro] * (borde * escala)
+        for fila in self.filas:
+            bits = '1' * (borde * escala) + fila.translate(ampliar) + '1' * (borde * escala) + relleno
+            lineas.extend([b'\x00' + int(bits, 2).to_bytes((ancho + 7) // 8, 'big')] * escala)
+        lineas.extend([claro] * (borde * escala))
+        return b''.join([
+            b'\x89PNG\r\n\x1a\n',
+            _bloque_png(b'IHDR', struct.pack('>IIBBBBB', ancho, ancho, 1, 0, 0, 0, 0)),
+            _bloque_png(b'IDAT', zlib.compress(b''.join(lineas), 9)),
+            _bloque_png(b'IEND', b''),
+        ])
+
+
+def _bloque_png(tipo, datos):
+    return struct.pack('>I', len(datos)) + tipo + datos + struct.pack('>I', zlib.crc32(tipo + datos))
+
+
+def _modulos_de_datos(version):
+    # Módulos que quedan para datos y corrección una vez dibujados los patrones fijos
+    modulos = (16 * version + 128) * version + 64
+    if version >= 2:
+        alineacion = version // 7 + 2
+        modulos -= (25 * alineacion - 10) * alineacion - 55
+        if version >= 7:
+            modulos -= 36
+    return modulos
+
+
+def capacidad(version, nivel):
+    # Bytes de datos (incluidos modo y largo) que entran en la versión
+    return _modulos_de_datos(version) // 8 - _CORRECCION_POR_BLOQUE[nivel][version] * _BLOQUES[nivel][version]
+
+
+def _posiciones_alineacion(version):
+    if version == 1:
+        return []
+    cantidad = version // 7 + 2
+    paso = (version * 8 + cantidad * 3 + 5) // (cantidad * 4 - 4) * 2
+    return [6] + [4 * version + 17 - 7 - i * paso for i in range(cantidad - 2, -1, -1)]
+
+
+@lru_cache(maxsize=None)
+def _generador(grado):
+    # Polinomio generador de Reed-Solomon, coeficientes de mayor a menor grado sin el principal
+    polinomio = [1]
+    for i in range(grado):
+        siguiente = polinomio + [0]
+        for j, coeficiente in enumerate(polinomio):
+            if coeficiente:
+                siguiente[j + 1] ^= _EXP[_LOG[coeficiente] + i]
+        polinomio = siguiente
+    return polinomio[1:]
+
+
+def _correccion(datos, grado):
+    generador = _generador(grado)
+    resto = [0] * grado
+    for byte in datos:
+        factor = byte ^ resto[0]
+        resto = resto[1:] + [0]
+        if factor:
+            logaritmo = _LOG[factor]
+            for i, coeficiente in enumerate(generador):
+                if coeficiente:
+                    resto[i] ^= _EXP[_LOG[coeficiente] + logaritmo]
+    return resto
+
+
+@lru_cache(maxsize=None)
+def _plantilla(version):
+    # Filas como enteros (bit más alto = columna 0) con los patrones fijos, máscara de módulos fijos,
+    # orden en que se llenan los módulos de datos y las 8 máscaras ya recortadas a la zona de datos
+    tamano = 4 * version + 17
+    oscuros = [[False] * tamano for _ in range(tamano)]
+    fijos = [[False] * tamano for _ in range(tamano)]
+
+    def fijar(x, y, oscuro):
+        oscuros[y][x] = oscuro
+        fijos[y][x] = True
+
+    for i in range(tamano):
+        fijar(6, i, i % 2 == 0)
+        fijar(i, 6, i % 2 == 0)
+    for cx, cy in ((3, 3), (tamano - 4, 3), (3, tamano - 4)):
+        for dy in range(-4, 5):
+            for dx in range(-4, 5):
+                if 0 <= cx + dx < tamano and 0 <= cy + dy < tamano:
+                    fijar(cx + dx, cy + dy, max(abs(dx), abs(dy)) not in (2, 4))
+    posiciones = _posiciones_alineacion(version)
+    ultima = len(posiciones) - 1
+    for i, cy in enumerate(posiciones):
+        for j, cx in enumerate(posiciones):
+            if (i, j) in ((0, 0), (0, ultima), (ultima, 0)):
+                continue
+            for dy in range(-2, 3):
+                for dx in range(-2, 3):
+                    fijar(cx + dx, cy + dy, max(abs(dx), abs(dy)) != 1)
+    # Zona de la información de formato (se escribe con cada máscara) y módulo oscuro fijo
+    for x, y in _posiciones_formato(tamano):
+        fijar(x, y, False)
+    fijar(8, tamano - 8, True)
+    if version >= 7:
+        resto = version
+        for _ in range(12):
+            resto = (resto << 1) ^ ((resto >> 11) * 0x1F25)
+        bits = version << 12 | resto
+        for i in range(18):
+            oscuro = bool(bits >> i & 1)
+            fijar(tamano - 11 + i % 3, i // 3, oscuro)
+            fijar(i // 3, tamano - 11 + i % 3, oscuro)
+
+    orden = []
+    for derecha in range(tamano - 1, 0, -2):
+        if derecha <= 6:
+            derecha -= 1
+        subiendo = (derecha + 1) & 2 == 0
+        for vertical in range(tamano):
+            y = tamano - 1 - vertical if subiendo else vertical
+            for x in (derecha, derecha - 1):
+                if not fijos[y][x]:
+                    orden.append((y, tamano - 1 - x))
+
+    def a_enteros(matriz):
+        return [int(''.join('1' if valor else '0' for valor in fila), 2) for fila in matriz]
+
+    mascaras = [
+        a_enteros([[condicion(x, y) and not fijos[y][x] for x in range(tamano)] for y in range(tamano)])
+        for condicion in _MASCARAS
+    ]
+    return tamano, a_enteros(oscuros), orden, mascaras
+
+
+def _posiciones_formato(tamano):
+    # Las dos copias de los 15 bits de formato, en el orden del bit 0 al 14
+    primera = [(8, i) for i in range(6)] + [(8, 7), (8, 8), (7, 8)] + [(14 - i, 8) for i in range(9, 15)]
+    segunda = [(tamano - 1 - i, 8) for i in range(8)] + [(8, tamano - 15 + i) for i in range(8, 15)]
+    return primera + segunda
+
+
+@lru_cache(maxsize=None)
+def _bits_formato(nivel, mascara):
+    datos = NIVELES[nivel] << 3 | mascara
+    resto = datos
+    for _ in range(10):
+        resto = (resto << 1) ^ ((resto >> 9) * 0x537)
+    return (datos << 10 | resto) ^ 0x5412
+
+
+def _palabras(datos, version, nivel):
+    # Modo byte, largo, datos, terminador y relleno; luego bloques intercalados con su corrección
+    bits_largo = 8 if version <= 9 else 16
+    bits = f"0100{len(datos):0{bits_largo}b}" + ''.join(f"{byte:08b}" for byte in datos)
+    lugar = capacidad(version, nivel) * 8
+    bits += '0' * min(4, lugar - len(bits))
+    bits += '0' * (-len(bits) % 8)
+    palabras = list(int(bits[i:i + 8], 2) for i in range(0, len(bits), 8))
+    palabras += [0xEC, 0x11] * ((lugar // 8 - len(palabras)) // 2) + [0xEC] * ((lugar // 8 - len(palabras)) % 2)
+
+    cantidad = _BLOQUES[nivel][version]
+    grado = _CORRECCION_POR_BLOQUE[nivel][version]
+    total = _modulos_de_datos(version) // 8
+    cortos = cantidad - total % cantidad
+    largo_corto = total // cantidad - grado
+    bloques = []
+    inicio = 0
+    for i in range(cantidad):
+        largo = largo_corto + (i >= cortos)
+        bloque = palabras[inicio:inicio + largo]
+        inicio += largo
+        bloques.append((bloque, _correccion(bloque, grado)))
+
+    resultado = []
+    for i in range(largo_corto + 1):
+        resultado.extend(bloque[i] for bloque, _ in bloques if i < len(bloque))
+    for i in range(grado):
+        resultado.extend(correccion[i] for _, correccion in bloques)
+    return resultado
+
+
+def _penalidad(filas, tamano):
+    texto_filas = [format(fila, f'0{tamano}b') for fila in filas]
+    # Todas las filas y columnas en un solo texto; el separador corta las rachas y los patrones
+    lineas = texto_filas + [''.join(columna) for columna in zip(*texto_filas)]
+    rachas = _RACHAS.findall('|'.join(lineas))
+    penalidad = sum(map(len, rachas)) - 2 * len(rachas)
+    # Fuera del código todo es claro: cada línea se extiende con 4 módulos claros a cada lado
+    con_margen = '0000' + '0000|0000'.join(lineas) + '0000'
+    penalidad += 40 * sum(con_margen.count(patron) for patron in _PARECIDOS_A_LOCALIZADOR)
+    # Bloques de 2x2 del mismo color
+    recorte = (1 << (tamano - 1)) - 1
+    for arriba, abajo in zip(filas, filas[1:]):
+        iguales = ~(arriba ^ abajo) & ~(arriba ^ (arriba >> 1)) & ~(abajo ^ (abajo >> 1))
+        penalidad += 3 * (iguales & recorte).bit_count()
+    oscuros = sum(fila.bit_count() for fila in filas)
+    total = tamano * tamano
+    penalidad += 10 * max(0, (abs(oscuros * 20 - total * 10) + total - 1) // total - 1)
+    return penalidad
+
+
+def codificar_qr(datos, nivel='M', mascara=None):
+    # datos: str (se codifica en UTF-8) o bytes. Usa la versión más chica en la que entran.
+    if isinstance(datos, str):
+        datos = datos.encode('utf-8')
+    for version in range(1, 41):
+        encabezado = 4 + (8 if version <= 9 else 16)
+        if encabezado + 8 * len(datos) <= capacidad(version, nivel) * 8:
+            break
+    else:
+        raise DatosDemasiadoLargos(f"{len(datos)} bytes no entran en un código QR de nivel {nivel}.")
+
+    tamano, base, orden, mascaras = _plantilla(version)
+    filas = list(base)
+    bits = ''.join(f"{palabra:08b}" for palabra in _palabras(datos, version, nivel))
+    for (y, desplazamiento), bit in zip(orden, bits):
+        if bit == '1':
+            filas[y] |= 1 << desplazamiento
+
+    posiciones = _posiciones_formato(tamano)
+    candidatas = []
+    for numero in (range(8) if mascara is None else [mascara]):
+        enmascaradas = [fila ^ patron for fila, patron in zip(filas, mascaras[numero])]
+        formato = _bits_formato(nivel, numero)
+        for i, (x, y) in enumerate(posiciones):
+            if formato >> (i % 15) & 1:
+                enmascaradas[y] |= 1 << (tamano - 1 - x)
+        candidatas.append((_penalidad(enmascaradas, tamano) if mascara is None else 0, numero, enmascaradas))
+    _, numero, enmascaradas = min(candidatas, key=lambda candidata: candidata[:2])
+    return CodigoQR(version, nivel, numero, tuple(format(fila, f'0{tamano}b') for fila in enmascaradas))
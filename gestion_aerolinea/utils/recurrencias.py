@@ -0,0 +1,87 @@
+from datetime import timedelta
+from itertools import islice
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from ..models import Vuelo, VueloRecurrente
+from .fragmentos import invalidar_vuelos
+from .resumenes import registrar_vuelos_creados
+
+TAMANO_LOTE_MATERIALIZACION = 500
+
+
+def fin_horizonte(hoy=None):
+    return (hoy or timezone.localdate()) + timedelta(days=settings.HORIZONTE_VUELOS_RECURRENTES_DIAS)
+
+
+def recurrencias_pendientes(hasta, hoy=None):
+    # Horarios activos a los que les faltan vuelos antes de `hasta`
+    hoy = hoy or timezone.localdate()
+    return VueloRecurrente.objects.filter(
+        Q(materializado_hasta__isnull=True)
+        | (Q(materializado_hasta__lt=hasta) & Q(materializado_hasta__lt=F('vigente_hasta'))),
+        activo=True,
+        vigente_hasta__gte=hoy,
+    )
+
+
+def _vuelo(recurrencia, salida):
+    # Lo mismo que completa Vuelo.save, que bulk_create no llama
+    return Vuelo(
+        origen=recurrencia.origen,
+        destino=recurrencia.destino,
+        aeropuerto_origen_id=recurrencia.aeropuerto_origen_id,
+        aeropuerto_destino_id=recurrencia.aeropuerto_destino_id,
+        fecha_salida=salida,
+        fecha_llegada=salida + recurrencia.duracion,
+        duracion=recurrencia.duracion,
+        estado='programado',
+        precio_base=recurrencia.precio_base,
+        avion=recurrencia.avion,
+        recurrencia=recurrencia,
+        inventario_asientos=b'',
+        asientos_libres=recurrencia.avion.capacidad,
+    )
+
+
+def materializar_recurrencia(recurrencia_id, hasta, hoy=None):
+    # El bloqueo de la fila evita que dos búsquedas simultáneas generen los mismos vuelos
+    hoy = hoy or timezone.localdate()
+    ahora = timezone.now()
+    creados = 0
+    with transaction.atomic():
+        recurrencia = VueloRecurrente.objects.select_for_update().select_related('avion').get(id=recurrencia_id)
+        desde = hoy
+        if recurrencia.materializado_hasta and recurrencia.materializado_hasta >= hoy:
+            desde = recurrencia.materializado_hasta + timedelta(days=1)
+        if desde > hasta:
+            return 0
+
+        salidas = (salida for salida in recurrencia.ocurrencias(desde, hasta) if salida >= ahora)
+        while lote := list(islice(salidas, TAMANO_LOTE_MATERIALIZACION)):
+            vuelos = Vuelo.objects.bulk_create([_vuelo(recurrencia, salida) for salida in lote])
+            registrar_vuelos_creados(vuelos)
+            creados += len(vuelos)
+        VueloRecurrente.objects.filter(id=recurrencia.id).update(materializado_hasta=hasta)
+        if creados:
+            # bulk_create no dispara post_save
+            transaction.on_commit(invalidar_vuelos)
+    return creados
+
+
+def materializar_vuelos_recurrentes(hasta=None, origenes=None, destinos=None):
+    # Sin horarios pendientes cuesta una consulta; las búsquedas pasan los aeropuertos para generar solo esas rutas
+    hoy = timezone.localdate()
+    hasta = hasta or fin_horizonte(hoy)
+    pendientes = recurrencias_pendientes(hasta, hoy)
+    if origenes is not None:
+        pendientes = pendientes.filter(aeropuerto_origen_id__in=origenes)
+    if destinos is not None:
+        pendientes = pendientes.filter(aeropuerto_destino_id__in=destinos)
+    return sum(
+        materializar_recurrencia(recurrencia_id, hasta, hoy)
+        for recurrencia_id in pendientes.values_list('id', flat=True)
+    )
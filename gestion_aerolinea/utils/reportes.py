@@ -0,0 +1,18 @@
+from ..models import Reserva
+
+
+def reporte_pasajeros(vuelo):
+    reservas = Reserva.objects.filter(
+        vuelo=vuelo,
+        estado='confirmada'
+    ).select_related('pasajero', 'asiento').only(
+        'codigo_reserva',
+        'pasajero__nombre', 'pasajero__apellido', 'pasajero__tipo_documento', 'pasajero__numero_documento',
+        'asiento__numero', 'asiento__fila', 'asiento__columna',
+    ).order_by('asiento__numero')
+
+    return {
+        'vuelo': vuelo,
+        'pasajeros': [reserva.pasajero for reserva in reservas],
+        'reservas': reservas,
+    }
@@ -0,0 +1,140 @@
+import random
+import time
+from dataclasses import dataclass, field
+
+from django.db import IntegrityError, OperationalError, transaction
+
+from ..models import ESTADOS_RESERVA_ACTIVA, Asiento, Pasajero, Reserva
+from .codigos import codigos_reserva
+from .inventario import AsientosNoDisponibles, liberar_reservas, reclamar_asientos
+from .vencimientos import reservas_vencidas, vencer_reservas, vencimiento_reserva
+
+MAX_INTENTOS_RESERVA = 5
+
+
+@dataclass
+class ResultadoReserva:
+    reservas: list = field(default_factory=list)
+    # asiento_id -> motivo por el que no se pudo reservar
+    conflictos: dict = field(default_factory=dict)
+    intentos: int = 0
+
+    @property
+    def exito(self):
+        return not self.conflictos
+
+
+def _a_entero(valor):
+    try:
+        return int(valor)
+    except (TypeError, ValueError):
+        return None
+
+
+def _reservar(vuelo, usuario, asignaciones, codigos):
+    # Asientos y pasajeros se resuelven con una consulta cada uno, sin importar el tamaño del grupo
+    conflictos = {}
+    ids_asientos = sorted({_a_entero(asiento_id) for asiento_id, _ in asignaciones} - {None})
+
+    # Bloqueo en orden de id para que dos reservas concurrentes nunca se esperen en círculo
+    asientos = {
+        asiento.id: asiento
+        for asiento in Asiento.objects.select_for_update().filter(
+            id__in=ids_asientos, avion_id=vuelo.avion_id
+        ).order_by('id')
+    }
+
+    pasajeros = Pasajero.objects.filter(
+        id__in={_a_entero(pasajero_id) for _, pasajero_id in asignaciones} - {None},
+        usuario=usuario,
+    ).in_bulk()
+
+    pares = []
+    vistos = set()
+    for asiento_id, pasajero_id in asignaciones:
+        asiento = asientos.get(_a_entero(asiento_id))
+        if asiento is None:
+            conflictos[asiento_id] = 'El asiento seleccionado no pertenece a este vuelo.'
+            continue
+        if asiento.id in vistos:
+            conflictos[asiento.id] = f'El asiento {asiento.numero} fue seleccionado más de una vez.'
+            continue
+        vistos.add(asiento.id)
+        pasajero = pasajeros.get(_a_entero(pasajero_id))
+        if pasajero is None:
+            conflictos[asiento.id] = f'El pasajero asignado al asiento {asiento.numero} no es válido.'
+            continue
+        pares.append((asiento, pasajero))
+
+    if conflictos:
+        return [], conflictos
+
+    # Las reservas vencidas que todavía no barrió el worker no deben bloquear estos asientos
+    vencer_reservas(
+        reservas_vencidas().filter(vuelo=vuelo, asiento__in=[asiento for asiento, _ in pares])
+        .select_related('asiento').select_for_update(of=('self',))
+    )
+    reclamar_asientos(vuelo.id, [asiento for asiento, _ in pares])
+
+    expira_en = vencimiento_reserva()
+
+    reservas = Reserva.objects.bulk_create([
+        Reserva(
+            vuelo=vuelo,
+            pasajero=pasajero,
+            asiento=asiento,
+            usuario_reserva=usuario,
+            estado='pendiente',
+            expira_en=expira_en,
+            precio_total=vuelo.precio_base,
+            codigo_reserva=codigo
+        )
+        for (asiento, pasajero), codigo in zip(pares, codigos)
+    ])
+    return reservas, {}
+
+
+def reservar_asientos(vuelo, usuario, asignaciones):
+    # asignaciones: lista de (asiento_id, pasajero_id). Se reservan todas o ninguna.
+    resultado = ResultadoReserva()
+    # Antes de abrir la transacción: tomar un bloque nuevo escribe en la base
+    codigos = codigos_reserva.tomar(len(asignaciones))
+
+    for intento in range(1, MAX_INTENTOS_RESERVA + 1):
+        resultado.intentos = intento
+        try:
+            with transaction.atomic():
+                resultado.reservas, resultado.conflictos = _reservar(vuelo, usuario, asignaciones, codigos)
+            return resultado
+        except AsientosNoDisponibles as e:
+            resultado.conflictos = {
+                asiento.id: f'El asiento {asiento.numero} ya ha sido reservado.'
+                for asiento in e.asientos
+            }
+            return resultado
+        except (IntegrityError, OperationalError):
+            # Otra transacción ganó la carrera (base bloqueada o restricción única): se reintenta
+            if intento < MAX_INTENTOS_RESERVA:
+                time.sleep(random.uniform(0, 0.02 * 2 ** intento))
+
+    resultado.conflictos = {
+        asiento_id: 'No se pudo completar la reserva por alta demanda. Intenta nuevamente.'
+        for asiento_id, _ in asignaciones
+    }
+    return resultado
+
+
+def cancelar_reserva(reserva):
+    # Devuelve False si la reserva ya no estaba activa: otro pedido la canceló, venció o la liberó antes.
+    # El estado se vuelve a leer con la fila bloqueada; el de la instancia puede ser viejo.
+    with transaction.atomic():
+        actual = Reserva.objects.select_for_update(of=('self',)).select_related('asiento').get(id=reserva.id)
+        if actual.estado not in ESTADOS_RESERVA_ACTIVA:
+            return False
+        # Condicionado al estado leído: los contadores que se descuentan dependen de él
+        if not Reserva.objects.filter(id=actual.id, estado=actual.estado).update(estado='cancelada', expira_en=None):
+            return False
+        liberar_reservas([actual])
+    reserva.estado = 'cancelada'
+    reserva.expira_en = None
+    return True
@@ -0,0 +1,188 @@
+from collections import Counter
+from datetime import timedelta, timezone as dt_timezone
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncHour
+from django.utils import timezone
+
+from ..models import Aeropuerto, Boleto, Reserva, ResumenAvion, ResumenHorario, Vuelo
+
+HORAS_PANEL = 24
+DIAS_PANEL = 30
+
+
+def hora_actual():
+    return timezone.now().replace(minute=0, second=0, microsecond=0)
+
+
+def _sumar(modelo, filtro, cambios):
+    cambios = {campo: valor for campo, valor in cambios.items() if valor}
+    if not cambios:
+        return
+    incrementos = {campo: F(campo) + valor for campo, valor in cambios.items()}
+    if modelo.objects.filter(**filtro).update(**incrementos):
+        return
+    try:
+        with transaction.atomic():
+            modelo.objects.create(**filtro, **cambios)
+    except IntegrityError:
+        # Otra transacción creó la fila primero
+        modelo.objects.filter(**filtro).update(**incrementos)
+
+
+def registrar_movimiento(vuelo, contadores=None, ofrecidos=0, **eventos):
+    # contadores: los mismos cambios aplicados a los contadores del vuelo.
+    # eventos: reservas, confirmadas, canceladas o vencidas ocurridas en esta hora.
+    contadores = contadores or {}
+    if vuelo.aeropuerto_origen_id and vuelo.aeropuerto_destino_id:
+        _sumar(
+            ResumenHorario,
+            {
+                'hora': hora_actual(),
+                'aeropuerto_origen_id': vuelo.aeropuerto_origen_id,
+                'aeropuerto_destino_id': vuelo.aeropuerto_destino_id,
+            },
+            {**eventos, 'recaudacion': contadores.get('recaudacion', 0)},
+        )
+    _sumar(ResumenAvion, {'avion_id': vuelo.avion_id}, {
+        'asientos_ofrecidos': ofrecidos,
+        'asientos_pendientes': contadores.get('asientos_pendientes', 0),
+        'asientos_confirmados': contadores.get('asientos_confirmados', 0),
+    })
+
+
+def registrar_vuelos_creados(vuelos):
+    # Para altas con bulk_create, que no pasan por Vuelo.save
+    ofrecidos = Counter()
+    for vuelo in vuelos:
+        ofrecidos[vuelo.avion_id] += vuelo.asientos_libres
+    for avion_id, asientos in ofrecidos.items():
+        _sumar(ResumenAvion, {'avion_id': avion_id}, {'asientos_ofrecidos': asientos})
+
+
+def reconstruir_resumen_avion(avion_id):
+    # Para cambios poco frecuentes (vuelos borrados, aviones redimensionados): recuenta solo ese avión
+    totales = Vuelo.objects.filter(avion_id=avion_id).aggregate(
+        ofrecidos=Sum('avion__capacidad', default=0),
+        pendientes=Sum('asientos_pendientes', default=0),
+        confirmados=Sum('asientos_confirmados', default=0),
+    )
+    ResumenAvion.objects.update_or_create(avion_id=avion_id, defaults={
+        'asientos_ofrecidos': totales['ofrecidos'],
+        'asientos_pendientes': totales['pendientes'],
+        'asientos_confirmados': totales['confirmados'],
+    })
+
+
+def recalcular_resumenes():
+    # Reconstruye todo desde las reservas. Cancelaciones y vencimientos no guardan fecha propia,
+    # así que se asignan a la hora en que se hizo la reserva.
+    utc = dt_timezone.utc
+    filas = {}
+
+    def fila(hora, origen, destino):
+        clave = (hora, origen, destino)
+        if clave not in filas:
+            filas[clave] = ResumenHorario(hora=hora, aeropuerto_origen_id=origen, aeropuerto_destino_id=destino)
+        return filas[clave]
+
+    reservas = Reserva.objects.filter(
+        vuelo__aeropuerto_origen__isnull=False, vuelo__aeropuerto_destino__isnull=False,
+    ).annotate(hora=TruncHour('fecha_reserva', tzinfo=utc)).values(
+        'hora', 'vuelo__aeropuerto_origen_id', 'vuelo__aeropuerto_destino_id',
+    ).annotate(
+        total=Count('id'),
+        total_canceladas=Count('id', filter=Q(estado='cancelada')),
+        total_vencidas=Count('id', filter=Q(estado='vencida')),
+    ).order_by()
+    for total in reservas:
+        resumen = fila(total['hora'], total['vuelo__aeropuerto_origen_id'], total['vuelo__aeropuerto_destino_id'])
+        resumen.reservas = total['total']
+        resumen.canceladas = total['total_canceladas']
+        resumen.vencidas = total['total_vencidas']
+
+    confirmaciones = Boleto.objects.filter(
+        reserva__vuelo__aeropuerto_origen__isnull=False, reserva__vuelo__aeropuerto_destino__isnull=False,
+    ).annotate(hora=TruncHour('fecha_emision', tzinfo=utc)).values(
+        'hora', 'reserva__vuelo__aeropuerto_origen_id', 'reserva__vuelo__aeropuerto_destino_id',
+    ).annotate(
+        total=Count('id'),
+        total_recaudacion=Sum('reserva__precio_total', filter=Q(reserva__estado='confirmada'), default=0),
+    ).order_by()
+    for total in confirmaciones:
+        resumen = fila(
+            total['hora'], total['reserva__vuelo__aeropuerto_origen_id'], total['reserva__vuelo__aeropuerto_destino_id']
+        )
+        resumen.confirmadas = total['total']
+        resumen.recaudacion = total['total_recaudacion']
+
+    aviones = Vuelo.objects.values('avion_id').annotate(
+        ofrecidos=Sum('avion__capacidad'),
+        pendientes=Sum('asientos_pendientes'),
+        confirmados=Sum('asientos_confirmados'),
+    ).order_by()
+
+    with transaction.atomic():
+        ResumenHorario.objects.all().delete()
+        ResumenHorario.objects.bulk_create(filas.values(), batch_size=500)
+        ResumenAvion.objects.all().delete()
+        ResumenAvion.objects.bulk_create([
+            ResumenAvion(
+                avion_id=total['avion_id'],
+                asientos_ofrecidos=total['ofrecidos'],
+                asientos_pendientes=total['pendientes'],
+                asientos_confirmados=total['confirmados'],
+            )
+            for total in aviones
+        ], batch_size=500)
+    return len(filas), len(aviones)
+
+
+def indicadores_panel():
+    # Solo lee resúmenes acotados por ventana de tiempo, cantidad de rutas y de aviones
+    hora = hora_actual()
+    desde_horas = hora - timedelta(hours=HORAS_PANEL - 1)
+    por_hora = dict(
+        ResumenHorario.objects.filter(hora__gte=desde_horas)
+        .values('hora').annotate(total=Sum('reservas')).order_by().values_list('hora', 'total')
+    )
+    horas = [desde_horas + timedelta(hours=i) for i in range(HORAS_PANEL)]
+    maximo = max(por_hora.values(), default=0) or 1
+    reservas_por_hora = [
+        {'hora': h, 'total': por_hora.get(h, 0), 'porcentaje': round(100 * por_hora.get(h, 0) / maximo)}
+        for h in horas
+    ]
+
+    ultimos_dias = ResumenHorario.objects.filter(hora__gte=hora - timedelta(days=DIAS_PANEL))
+    totales = ultimos_dias.aggregate(
+        reservas=Sum('reservas', default=0),
+        confirmadas=Sum('confirmadas', default=0),
+        canceladas=Sum('canceladas', default=0),
+        vencidas=Sum('vencidas', default=0),
+        recaudacion=Sum('recaudacion', default=0),
+    )
+    rutas = list(
+        ultimos_dias.values('aeropuerto_origen_id', 'aeropuerto_destino_id')
+        .annotate(total_recaudacion=Sum('recaudacion'), total_reservas=Sum('reservas'))
+        .order_by('-total_recaudacion')[:10]
+    )
+    aeropuertos = Aeropuerto.objects.in_bulk(
+        {ruta['aeropuerto_origen_id'] for ruta in rutas} | {ruta['aeropuerto_destino_id'] for ruta in rutas}
+    )
+    for ruta in rutas:
+        ruta['origen'] = aeropuertos.get(ruta['aeropuerto_origen_id'])
+        ruta['destino'] = aeropuertos.get(ruta['aeropuerto_destino_id'])
+
+    aviones = list(ResumenAvion.objects.select_related('avion').filter(asientos_ofrecidos__gt=0).order_by('avion__modelo'))
+
+    return {
+        'reservas_por_hora': reservas_por_hora,
+        'pendientes_confirmacion': sum(resumen.asientos_pendientes for resumen in aviones),
+        'totales': totales,
+        'tasa_cancelacion': round(100 * totales['canceladas'] / totales['reservas'], 1) if totales['reservas'] else 0,
+        'recaudacion_por_ruta': rutas,
+        'ocupacion_por_avion': aviones,
+        'dias': DIAS_PANEL,
+        'horas': HORAS_PANEL,
+    }
@@ -0,0 +1,8 @@
+import unicodedata
+
+
+def normalizar_busqueda(texto):
+    # "  San Martín de los Andes " -> "san martin de los andes"
+    sin_acentos = unicodedata.normalize('NFKD', texto or '')
+    sin_acentos = ''.join(c for c in sin_acentos if not unicodedata.combining(c))
+    return ' '.join(sin_acentos.casefold().split())
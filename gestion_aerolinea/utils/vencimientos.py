@@ -0,0 +1,87 @@
+import logging
+import threading
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from ..models import Reserva
+from .inventario import liberar_reservas
+
+logger = logging.getLogger(__name__)
+
+TAMANO_LOTE_VENCIMIENTOS = 500
+
+
+def tiempo_reserva_pendiente():
+    # Tiempo que una reserva pendiente retiene el asiento antes de liberarse
+    return timedelta(minutes=settings.MINUTOS_RESERVA_PENDIENTE)
+
+
+def vencimiento_reserva(desde=None):
+    return (desde or timezone.now()) + tiempo_reserva_pendiente()
+
+
+def reservas_vencidas(ahora=None):
+    # Usa el índice parcial reserva_pendiente_expira
+    return Reserva.objects.filter(estado='pendiente', expira_en__lte=ahora or timezone.now())
+
+
+def con_asientos_disponibles(vuelos, ahora=None):
+    # asientos_disponibles: los libres más los retenidos por reservas vencidas que el barrido todavía no liberó.
+    # Es una subconsulta por vuelo dentro de la misma consulta del listado.
+    vencidas = (
+        reservas_vencidas(ahora).filter(vuelo=OuterRef('pk'))
+        .order_by().values('vuelo').annotate(total=Count('id')).values('total')
+    )
+    return vuelos.annotate(asientos_disponibles=F('asientos_libres') + Coalesce(Subquery(vencidas), Value(0)))
+
+
+def vencer_reservas(reservas):
+    # Debe llamarse dentro de una transacción, con las reservas ya bloqueadas
+    reservas = list(reservas)
+    if not reservas:
+        return 0
+    liberar_reservas(reservas, motivo='vencidas')
+    return Reserva.objects.filter(
+        id__in=[reserva.id for reserva in reservas], estado='pendiente'
+    ).update(estado='vencida', expira_en=None)
+
+
+def liberar_reservas_vencidas(lote=TAMANO_LOTE_VENCIMIENTOS, ahora=None):
+    # Devuelve los asientos liberados por vuelo; cada lote es una transacción corta
+    ahora = ahora or timezone.now()
+    liberados = Counter()
+    while True:
+        with transaction.atomic():
+            reservas = list(
+                reservas_vencidas(ahora).select_related('asiento').select_for_update(of=('self',))
+                .order_by('expira_en', 'id')[:lote]
+            )
+            vencer_reservas(reservas)
+        liberados.update(reserva.vuelo_id for reserva in reservas)
+        if len(reservas) < lote:
+            return liberados
+
+
+def iniciar_barrido_periodico(intervalo):
+    # Hilo en segundo plano para despliegues sin cron; el comando liberar_reservas_vencidas hace lo mismo
+    detener = threading.Event()
+
+    def barrer():
+        while not detener.wait(intervalo):
+            try:
+                liberados = liberar_reservas_vencidas()
+                if liberados:
+                    logger.info("Reservas vencidas: %s asientos liberados", sum(liberados.values()))
+            except Exception:
+                logger.exception("Falló el barrido de reservas vencidas")
+            finally:
+                close_old_connections()
+
+    threading.Thread(target=barrer, name='barrido-reservas-vencidas', daemon=True).start()
+    return detener
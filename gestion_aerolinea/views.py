@@ -1,28 +1,52 @@
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth import get_user_model
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.db import transaction
-from django.http import HttpResponse
+from django.db.models import Q
+from django.http import HttpResponse, HttpResponseNotModified, JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
-from django.template.loader import get_template
 from django.utils import timezone
-from django.utils.crypto import get_random_string
+from django.utils.dateparse import parse_date
 from django.utils.decorators import method_decorator
+from django.utils.http import parse_etags
 from django.views import View
 
-from weasyprint import HTML
-
 from .forms import (
     AvionForm,
     CantidadPasajerosForm,
+    ImportarHorariosForm,
     PasajeroForm,
     SeleccionarVueloForm,
     UsuarioForm,
     VueloForm,
 )
 
-from .models import Asiento, Avion, Boleto, Pasajero, Reserva, Vuelo
-from .utils.email import enviar_boleto_por_email
+from .models import Aeropuerto, Avion, Boleto, EmisionBoleto, Pasajero, Reserva, Vuelo
+from .utils.asientos import construir_mapa_asientos
+from .utils.codigos import codigos_boleto
+from .utils.emision import encolar_emision, reintentar_emision
+from .utils.exportaciones import (
+    exportar_pasajeros_vuelo,
+    exportar_recaudacion_vuelos,
+    exportar_reservas,
+    respuesta_exportacion,
+)
+from .utils.fragmentos import estadisticas_fragmentos, fragmento_vuelos
+from .utils.importacion import MAX_ERRORES_IMPORTACION, importar_horario, leer_horario
+from .utils.inventario import liberar_reservas, registrar_confirmacion
+from .utils.lotes import documentos_vuelo, zip_en_streaming
+from .utils.paginacion import clave_pagina, paginar_keyset
+from .utils.pase_abordar import qr_svg_boleto
+from .utils.pdf import clave_pdf_boleto, obtener_pdf_boleto
+from .utils.perfilado import perfiles_lentos, reiniciar_perfilado, resumen_perfilado
+from .utils.recurrencias import materializar_vuelos_recurrentes
+from .utils.reportes import reporte_pasajeros
+from .utils.reservas import cancelar_reserva, reservar_asientos
+from .utils.resumenes import indicadores_panel
+from .utils.vencimientos import con_asientos_disponibles
 
 # from .utils import enviar_boleto_por_email
 
@@ -44,7 +68,7 @@ class MiPerfilView(View):
     def get(self, request):
         user = request.user
         usuario_form = UsuarioForm(instance=user)
-        pasajeros = Pasajero.objects.filter(usuario=user)
+        pasajeros = Pasajero.objects.filter(usuario=user).order_by('apellido', 'nombre')
 
         context = {
             'usuario_form': usuario_form,
@@ -61,7 +85,7 @@ class MiPerfilView(View):
             messages.success(request, "Tu perfil de usuario ha sido actualizado.")
             return redirect('mi_perfil')
 
-        pasajeros = Pasajero.objects.filter(usuario=user)
+        pasajeros = Pasajero.objects.filter(usuario=user).order_by('apellido', 'nombre')
         context = {
             'usuario_form': usuario_form,
             'pasajeros': pasajeros,
@@ -75,18 +99,25 @@ class BuscarVuelosView(View):
         origen = request.GET.get('origen')
         destino = request.GET.get('destino')
         
-        vuelos = Vuelo.objects.filter(
+        vuelos = con_asientos_disponibles(Vuelo.objects.filter(
             fecha_salida__gte=timezone.now()
-        )
+        ).select_related('avion'))
 
+        # Los aeropuertos se resuelven primero para que el filtro use el índice (origen, destino, salida)
+        origenes = destinos = None
         if origen:
-            vuelos = vuelos.filter(origen__icontains=origen)
+            origenes = list(Aeropuerto.buscar(origen).values_list('id', flat=True))
+            vuelos = vuelos.filter(aeropuerto_origen_id__in=origenes)
         
         if destino:
-            vuelos = vuelos.filter(destino__icontains=destino)
+            destinos = list(Aeropuerto.buscar(destino).values_list('id', flat=True))
+            vuelos = vuelos.filter(aeropuerto_destino_id__in=destinos)
+
+        # Genera los vuelos de horarios recurrentes de esta ruta que hayan entrado en el horizonte
+        materializar_vuelos_recurrentes(origenes=origenes, destinos=destinos)
         
         return render(request, 'cliente/ver_vuelos.html', {
-            'vuelos': vuelos,
+            'vuelos': paginar_keyset(request, vuelos, ['fecha_salida']),
             'origen_buscado': origen,
             'destino_buscado': destino,
         })
@@ -95,9 +126,15 @@ class BuscarVuelosView(View):
 @method_decorator(login_required, name='dispatch')
 class PanelClienteView(View):
     def get(self, request):
-        vuelos_sugeridos = Vuelo.objects.filter(
-            fecha_salida__gte=timezone.now()
-        ).order_by('fecha_salida')[:4]  
+        def calcular():
+            materializar_vuelos_recurrentes()
+            return list(Vuelo.objects.filter(
+                fecha_salida__gte=timezone.now()
+            ).select_related('avion').defer('inventario_asientos').order_by('fecha_salida')[:4])
+
+        # Es igual para todos los clientes: se calcula una vez por franja de tiempo o cambio de vuelos.
+        # El inventario de asientos queda fuera: no se muestra y en PostgreSQL llega como memoryview, que no se serializa
+        vuelos_sugeridos = fragmento_vuelos('vuelos_sugeridos', calcular)
         
         return render(request, 'cliente/panel_cliente.html', {
             'vuelos_sugeridos': vuelos_sugeridos,
@@ -106,7 +143,14 @@ class PanelClienteView(View):
 
 class VerVuelosClienteView(View):
     def get(self, request):
-        vuelos = Vuelo.objects.all()
+        def calcular():
+            materializar_vuelos_recurrentes()
+            vuelos = con_asientos_disponibles(Vuelo.objects.select_related('avion').defer('inventario_asientos'))
+            # Los enlaces solo llevan el cursor: la página cacheada no arrastra parámetros de otro pedido
+            return paginar_keyset(request, vuelos, ['fecha_salida'], conservar=())
+
+        # Cada página del catálogo se cachea por su cursor; otros parámetros de la URL no crean entradas nuevas
+        vuelos = fragmento_vuelos('catalogo_vuelos', calcular, variante=clave_pagina(request, ['fecha_salida']))
         return render(request, 'cliente/ver_vuelos.html', {'vuelos': vuelos})
 
 
@@ -117,6 +161,10 @@ class HistorialVuelosClienteView(View):
             usuario_reserva=request.user,
             estado='confirmada',
             vuelo__fecha_salida__lt=timezone.now()
+        ).select_related('vuelo', 'asiento', 'pasajero').only(
+            'codigo_reserva',
+            'vuelo__origen', 'vuelo__destino', 'vuelo__fecha_salida',
+            'asiento__numero', 'pasajero__nombre', 'pasajero__apellido',
         ).order_by('-vuelo__fecha_salida')
         
         return render(request, 'cliente/historial_vuelos.html', {
@@ -127,7 +175,7 @@ class HistorialVuelosClienteView(View):
 @method_decorator(login_required, name='dispatch')
 class DetallesVueloView(View):
     def get(self, request, vuelo_id):
-        vuelo = get_object_or_404(Vuelo, id=vuelo_id)
+        vuelo = get_object_or_404(con_asientos_disponibles(Vuelo.objects.select_related('avion')), id=vuelo_id)
         cantidad_pasajeros_form = CantidadPasajerosForm()
         if 'total_pasajeros' in request.session:
             del request.session['total_pasajeros']
@@ -160,27 +208,10 @@ class SeleccionarPasajerosView(View):
 @method_decorator(login_required, name='dispatch')
 class SeleccionarAsientoView(View):
     def get(self, request, vuelo_id):
-        vuelo = get_object_or_404(Vuelo, id=vuelo_id)
-        asientos_reservados_ids = Reserva.objects.filter(
-            vuelo=vuelo,
-            estado__in=['confirmada', 'pendiente']
-        ).values_list('asiento__id', flat=True)
-
-        asientos_avion = {asiento.id: asiento for asiento in Asiento.objects.filter(avion=vuelo.avion)}
-        layout_asientos = {}
-        filas = vuelo.avion.filas
-        columnas = vuelo.avion.columnas
-
-        for fila in range(1, filas + 1):
-            layout_asientos[fila] = []
-            for columna in range(1, columnas + 1):
-                asiento_encontrado = next(
-                    (asiento for asiento in asientos_avion.values() if asiento.fila == fila and asiento.columna == columna),
-                    None
-                )
-                layout_asientos[fila].append(asiento_encontrado)
+        vuelo = get_object_or_404(Vuelo.objects.select_related('avion'), id=vuelo_id)
+        layout_asientos, asientos_reservados_ids = construir_mapa_asientos(vuelo)
         
-        pasajeros = request.user.pasajeros_creados.all()
+        pasajeros = request.user.pasajeros_creados.order_by('apellido', 'nombre')
         pasajero_form = PasajeroForm()
         cantidad_pasajeros_form = CantidadPasajerosForm()
 
@@ -189,7 +220,7 @@ class SeleccionarAsientoView(View):
         return render(request, 'cliente/seleccionar_asiento.html', {
             'vuelo': vuelo,
             'layout_asientos': layout_asientos,
-            'asientos_reservados_ids': list(asientos_reservados_ids),
+            'asientos_reservados_ids': asientos_reservados_ids,
             'pasajeros': pasajeros,
             'pasajero_form': pasajero_form,
             'cantidad_pasajeros_form': cantidad_pasajeros_form,
@@ -231,30 +262,18 @@ class SeleccionarAsientoView(View):
             return redirect('seleccionar_asiento', vuelo_id=vuelo.id)
 
         try:
-            with transaction.atomic():
-                for asiento_id, pasajero_id in zip(asientos_seleccionados_ids, pasajeros_seleccionados_ids):
-                    asiento = get_object_or_404(Asiento, id=asiento_id)
-                    pasajero = get_object_or_404(Pasajero, id=pasajero_id, usuario=request.user)
-
-                    if Reserva.objects.filter(vuelo=vuelo, asiento=asiento, estado__in=['confirmada', 'pendiente']).exists():
-                        raise ValueError(f'El asiento {asiento.numero} ya ha sido reservado.')
-
-                    Reserva.objects.create(
-                        vuelo=vuelo,
-                        pasajero=pasajero,
-                        asiento=asiento,
-                        usuario_reserva=request.user,
-                        estado='pendiente',
-                        precio_total=vuelo.precio_base,
-                        codigo_reserva=get_random_string(length=10).upper()
-                    )
-            
-            del request.session['total_pasajeros']
-            messages.success(request, f'Reservas creadas exitosamente para {total_pasajeros} asientos.')
-            return redirect('ver_reservas_cliente')
-
-        except ValueError as e:
-            messages.error(request, str(e))
+            resultado = reservar_asientos(
+                vuelo,
+                request.user,
+                list(zip(asientos_seleccionados_ids, pasajeros_seleccionados_ids))
+            )
+            if resultado.exito:
+                del request.session['total_pasajeros']
+                messages.success(request, f'Reservas creadas exitosamente para {total_pasajeros} asientos.')
+                return redirect('ver_reservas_cliente')
+
+            for motivo in resultado.conflictos.values():
+                messages.error(request, motivo)
         except Exception:
             messages.error(request, 'Ocurrió un error inesperado al procesar las reservas.')
 
@@ -273,6 +292,11 @@ class VerReservasClienteView(View):
             ).order_by('-fecha_reserva')
         else:
             reservas = Reserva.objects.filter(usuario_reserva=request.user).order_by('-fecha_reserva')
+        reservas = reservas.select_related('vuelo', 'asiento', 'pasajero').only(
+            'codigo_reserva', 'estado', 'precio_total', 'fecha_reserva', 'expira_en',
+            'vuelo__origen', 'vuelo__destino', 'vuelo__fecha_salida',
+            'asiento__numero', 'pasajero__nombre', 'pasajero__apellido',
+        )
         
         return render(request, 'cliente/ver_reservas.html', {
             'reservas': reservas,
@@ -284,18 +308,18 @@ class VerReservasClienteView(View):
 class CancelarReservaView(View):
     def post(self, request, reserva_id):
         reserva = get_object_or_404(Reserva, id=reserva_id, usuario_reserva=request.user)
-    
-        reserva.estado = 'cancelada'
-        reserva.save()
 
-        messages.success(request, f'La reserva con código {reserva.codigo_reserva} ha sido cancelada exitosamente.')
+        if cancelar_reserva(reserva):
+            messages.success(request, f'La reserva con código {reserva.codigo_reserva} ha sido cancelada exitosamente.')
+        else:
+            messages.warning(request, f'La reserva con código {reserva.codigo_reserva} ya no estaba activa.')
         return redirect('ver_reservas_cliente')
 
 
 @method_decorator(login_required, name='dispatch')
 class GestionarPasajerosView(View):
     def get(self, request):
-        pasajeros = Pasajero.objects.filter(usuario=request.user)
+        pasajeros = Pasajero.objects.filter(usuario=request.user).order_by('apellido', 'nombre')
         form = PasajeroForm()
         return render(request, 'cliente/gestionar_pasajeros.html', {
             'pasajeros': pasajeros,
@@ -311,7 +335,7 @@ class GestionarPasajerosView(View):
             messages.success(request, "Pasajero registrado con éxito.")
             return redirect('gestionar_pasajeros')
         
-        pasajeros = Pasajero.objects.filter(usuario=request.user)
+        pasajeros = Pasajero.objects.filter(usuario=request.user).order_by('apellido', 'nombre')
         messages.error(request, "Error al registrar el pasajero. Por favor, revisa los datos.")
         return render(request, 'cliente/gestionar_pasajeros.html', {
             'pasajeros': pasajeros,
@@ -367,7 +391,9 @@ class CrearPasajeroView(View):
 class EliminarPasajeroView(View):
     def post(self, request, pasajero_id):
         pasajero = get_object_or_404(Pasajero, id=pasajero_id, usuario=request.user)
-        pasajero.delete()
+        with transaction.atomic():
+            liberar_reservas(pasajero.reservas.select_related('asiento').select_for_update(of=('self',)))
+            pasajero.delete()
         messages.success(request, "Pasajero eliminado con éxito.")
         return redirect('gestionar_pasajeros')
 
@@ -376,7 +402,7 @@ class EliminarPasajeroView(View):
 @method_decorator(user_passes_test(es_empleado_o_admin), name='dispatch')
 class PanelEmpleadoView(View):
     def get(self, request):
-        return render(request, 'empleado/panel_empleado.html')
+        return render(request, 'empleado/panel_empleado.html', indicadores_panel())
 
 
 @method_decorator(login_required, name='dispatch')
@@ -384,12 +410,21 @@ class PanelEmpleadoView(View):
 class GestionarReservasEmpleadoView(View):
     def get(self, request, filtro=None):
         if filtro:
-            reservas = Reserva.objects.filter(estado=filtro).order_by('-fecha_reserva')
+            reservas = Reserva.objects.filter(estado=filtro)
         else:
-            reservas = Reserva.objects.all().order_by('-fecha_reserva')
+            reservas = Reserva.objects.all()
+        # Una sola consulta por página: cada fila de la tabla lee vuelo, asiento, pasajero, usuario y emisión
+        reservas = reservas.select_related(
+            'vuelo', 'asiento', 'pasajero', 'usuario_reserva', 'boleto__emision'
+        ).only(
+            'codigo_reserva', 'estado', 'fecha_reserva',
+            'vuelo__origen', 'vuelo__destino', 'asiento__numero',
+            'pasajero__nombre', 'pasajero__apellido', 'usuario_reserva__username',
+            'boleto__emision__estado',
+        )
         
         return render(request, 'empleado/gestionar_reservas.html', {
-            'reservas': reservas,
+            'reservas': paginar_keyset(request, reservas, ['-fecha_reserva']),
             'filtro_activo': filtro,
         })
     
@@ -401,23 +436,24 @@ class ConfirmarReservaView(View):
         reserva = get_object_or_404(Reserva, id=reserva_id)
         
         try:
+            codigo_boleto = codigos_boleto.siguiente()
             with transaction.atomic():
-                if reserva.estado == 'pendiente':
-                    reserva.estado = 'confirmada'
-                    reserva.save()
-
-                    codigo_boleto = get_random_string(length=12).upper()
+                # Una reserva vencida que el barrido todavía no liberó ya figura como asiento disponible
+                confirmada = Reserva.objects.filter(
+                    Q(expira_en__isnull=True) | Q(expira_en__gt=timezone.now()),
+                    id=reserva.id, estado='pendiente',
+                ).update(estado='confirmada', expira_en=None)
+                if confirmada:
+                    registrar_confirmacion(reserva)
                     boleto = Boleto.objects.create(
                         reserva=reserva,
                         codigo_barra=codigo_boleto
                     )
-                    
-                    exito, mensaje = enviar_boleto_por_email(boleto.id, request)
-                    
-                    if exito:
-                        messages.success(request, f"Reserva {reserva.codigo_reserva} confirmada y boleto enviado por correo.")
-                    else:
-                        raise Exception(f"Fallo al enviar el email: {mensaje}")
+                    # El PDF y el correo los genera el worker procesar_emisiones fuera de esta transacción
+                    encolar_emision(boleto, request.build_absolute_uri('/'))
+                    messages.success(request, f"Reserva {reserva.codigo_reserva} confirmada. El boleto se enviará por correo en breve.")
+                elif Reserva.objects.filter(id=reserva.id, estado='pendiente').exists():
+                    messages.warning(request, f"La reserva {reserva.codigo_reserva} venció y su asiento quedó disponible.")
                 else:
                     messages.warning(request, f"La reserva {reserva.codigo_reserva} ya no está en estado pendiente.")
 
@@ -427,10 +463,69 @@ class ConfirmarReservaView(View):
         return redirect('gestionar_reservas_empleado')
 
 
+@method_decorator(login_required, name='dispatch')
+@method_decorator(user_passes_test(es_empleado_o_admin), name='dispatch')
+class EstadoEmisionesView(View):
+    def get(self, request):
+        ids = [int(i) for i in request.GET.get('reservas', '').split(',') if i.isdigit()]
+        emisiones = EmisionBoleto.objects.filter(boleto__reserva_id__in=ids).values_list(
+            'boleto__reserva_id', 'estado', 'intentos'
+        )
+        return JsonResponse({
+            str(reserva_id): {'estado': estado, 'intentos': intentos}
+            for reserva_id, estado, intentos in emisiones
+        })
+
+
+@method_decorator(login_required, name='dispatch')
+@method_decorator(user_passes_test(es_admin), name='dispatch')
+class EstadoCacheView(View):
+    def get(self, request):
+        return JsonResponse({
+            'backend': settings.CACHES['default']['BACKEND'],
+            'franja_segundos': settings.CACHE_FRAGMENTOS_SEGUNDOS,
+            'fragmentos': estadisticas_fragmentos(),
+        })
+
+
+@method_decorator(login_required, name='dispatch')
+@method_decorator(user_passes_test(es_empleado_o_admin), name='dispatch')
+class PerfiladoPedidosView(View):
+    # ?perfiles=1 agrega la salida de cProfile de los pedidos más lentos capturados
+    def get(self, request):
+        datos = {'activo': settings.PERFILADO_PEDIDOS, 'vistas': resumen_perfilado()}
+        if request.GET.get('perfiles') == '1':
+            datos['perfiles'] = perfiles_lentos()
+        return JsonResponse(datos, json_dumps_params={'ensure_ascii': False})
+
+    def post(self, request):
+        reiniciar_perfilado()
+        return JsonResponse({'reiniciado': True})
+
+
+@method_decorator(login_required, name='dispatch')
+@method_decorator(user_passes_test(es_empleado_o_admin), name='dispatch')
+class ReintentarEmisionView(View):
+    def post(self, request, reserva_id):
+        emision = get_object_or_404(EmisionBoleto, boleto__reserva_id=reserva_id)
+        if emision.estado == 'fallido':
+            reintentar_emision(emision)
+            messages.success(request, "El envío del boleto se volvió a encolar.")
+        else:
+            messages.info(request, "El envío del boleto no está en estado fallido.")
+        return redirect('gestionar_reservas_empleado')
+
+
 @method_decorator(login_required, name='dispatch')
 class VerBoletoView(View):
     def get(self, request, reserva_id):
-        reserva = get_object_or_404(Reserva, id=reserva_id, usuario_reserva=request.user)
+        reserva = get_object_or_404(
+            Reserva.objects.select_related(
+                'vuelo__aeropuerto_origen', 'vuelo__aeropuerto_destino', 'asiento', 'pasajero', 'boleto',
+            ),
+            id=reserva_id,
+            usuario_reserva=request.user
+        )
         
         if not hasattr(reserva, 'boleto'):
             messages.error(request, 'No se ha emitido un boleto para esta reserva.')
@@ -439,14 +534,22 @@ class VerBoletoView(View):
         context = {'boleto': reserva.boleto, 'reserva': reserva}
         
         if 'descargar' in request.GET:
-            html_string = get_template('cliente/boleto_pdf.html').render(context)
-            html = HTML(string=html_string, base_url=request.build_absolute_uri())
-            pdf = html.write_pdf()
+            clave = clave_pdf_boleto(reserva.boleto)
+            etag = f'"{clave}"'
+            if etag in parse_etags(request.headers.get('If-None-Match', '')):
+                response = HttpResponseNotModified()
+                response['ETag'] = etag
+                return response
+
+            pdf = obtener_pdf_boleto(reserva.boleto, request.build_absolute_uri(), clave)
 
             response = HttpResponse(pdf, content_type='application/pdf')
             response['Content-Disposition'] = f'attachment; filename="Boleto-{reserva.boleto.codigo_barra}.pdf"'
+            response['ETag'] = etag
+            response['Cache-Control'] = 'private, no-cache'
             return response
         
+        context['qr_svg'] = qr_svg_boleto(reserva.boleto)
         return render(request, 'cliente/boleto.html', context)
 
 
@@ -455,12 +558,10 @@ class VerBoletoView(View):
 class CancelarReservaEmpleadoView(View):
     def post(self, request, reserva_id):
         reserva = get_object_or_404(Reserva, id=reserva_id)
-        if reserva.estado != 'cancelada':
-            reserva.estado = 'cancelada'
-            reserva.save()
+        if cancelar_reserva(reserva):
             messages.success(request, f"La reserva {reserva.codigo_reserva} ha sido cancelada con éxito.")
         else:
-            messages.warning(request, f"La reserva {reserva.codigo_reserva} ya estaba cancelada.")
+            messages.warning(request, f"La reserva {reserva.codigo_reserva} ya no estaba activa.")
         
         return redirect(request.META.get('HTTP_REFERER', 'gestionar_reservas_empleado'))
 
@@ -469,7 +570,7 @@ class CancelarReservaEmpleadoView(View):
 @method_decorator(user_passes_test(es_empleado_o_admin), name='dispatch')
 class GestionarVuelosView(View):
     def get(self, request):
-        vuelos = Vuelo.objects.all().order_by('-fecha_salida')
+        vuelos = paginar_keyset(request, con_asientos_disponibles(Vuelo.objects.select_related('avion')), ['-fecha_salida'])
         return render(request, 'empleado/gestionar_vuelos.html', {'vuelos': vuelos})
 
 
@@ -485,9 +586,15 @@ class EditarVueloView(View):
         vuelo = get_object_or_404(Vuelo, id=vuelo_id)
         form = VueloForm(request.POST, instance=vuelo)
         if form.is_valid():
-            form.save()
-            messages.success(request, "Vuelo actualizado exitosamente.")
-            return redirect('gestionar_vuelos_empleado')
+            try:
+                form.save()
+            except ValueError as e:
+                # Una reserva entró entre la validación y el guardado en un asiento que el avión nuevo no tiene
+                vuelo.refresh_from_db()
+                form.add_error('avion', str(e))
+            else:
+                messages.success(request, "Vuelo actualizado exitosamente.")
+                return redirect('gestionar_vuelos_empleado')
         return render(request, 'empleado/editar_vuelo.html', {'form': form, 'vuelo': vuelo})
         
 
@@ -518,6 +625,32 @@ class CrearVueloView(View):
         return render(request, 'empleado/crear_vuelo.html', {'form': form})
 
 
+@method_decorator(login_required, name='dispatch')
+@method_decorator(user_passes_test(es_empleado_o_admin), name='dispatch')
+class ImportarHorariosView(View):
+    def get(self, request):
+        return render(request, 'empleado/importar_horarios.html', {'form': ImportarHorariosForm()})
+
+    def post(self, request):
+        form = ImportarHorariosForm(request.POST, request.FILES)
+        context = {'form': form, 'resultado': None}
+        if form.is_valid():
+            archivo = form.cleaned_data['archivo']
+            try:
+                aviones, filas = leer_horario(archivo, archivo.name)
+                resultado = importar_horario(aviones, filas, todo_o_nada=form.cleaned_data['todo_o_nada'])
+            except ValueError as error:
+                form.add_error('archivo', str(error))
+            else:
+                context['resultado'] = resultado
+                context['errores'] = resultado.errores[:MAX_ERRORES_IMPORTACION]
+                if resultado.descartado:
+                    messages.error(request, "El horario tiene errores: no se importó ningún vuelo.")
+                else:
+                    messages.success(request, f"Se importaron {resultado.vuelos_creados} vuelos.")
+        return render(request, 'empleado/importar_horarios.html', context)
+
+
 @method_decorator(login_required, name='dispatch')
 @method_decorator(user_passes_test(es_empleado_o_admin), name='dispatch')
 class GestionarAvionesView(View):
@@ -555,10 +688,14 @@ class EditarAvionView(View):
         avion = get_object_or_404(Avion, id=avion_id)
         form = AvionForm(request.POST, instance=avion)
         if form.is_valid():
-            form.save()
+            try:
+                form.save()
+            except ValueError as e:
+                messages.error(request, str(e))
+                return render(request, 'empleado/editar_avion.html', {'form': form, 'avion': avion})
             messages.success(request, "Avión editado exitosamente.")
             return redirect('gestionar_aviones_empleado')
-        
+
         return render(request, 'empleado/editar_avion.html', {'form': form, 'avion': avion})
 
 
@@ -580,7 +717,7 @@ class EliminarAvionView(View):
 @method_decorator(user_passes_test(es_empleado_o_admin), name='dispatch')
 class GestionarPasajerosEmpleadoView(View):
     def get(self, request):
-        pasajeros = Pasajero.objects.all().order_by('apellido', 'nombre')
+        pasajeros = paginar_keyset(request, Pasajero.objects.all(), ['apellido', 'nombre'])
         return render(request, 'empleado/gestionar_pasajeros.html', {'pasajeros': pasajeros})
 
 
@@ -589,7 +726,9 @@ class GestionarPasajerosEmpleadoView(View):
 class DetallePasajeroEmpleadoView(View):
     def get(self, request, pasajero_id):
         pasajero = get_object_or_404(Pasajero, id=pasajero_id)
-        reservas = pasajero.reservas.all().order_by('-fecha_reserva')
+        reservas = pasajero.reservas.select_related('vuelo').only(
+            'codigo_reserva', 'estado', 'fecha_reserva', 'pasajero', 'vuelo__origen', 'vuelo__destino',
+        ).order_by('-fecha_reserva')
         return render(request, 'empleado/detalle_pasajero.html', {
             'pasajero': pasajero,
             'reservas': reservas
@@ -612,27 +751,69 @@ class ReportePasajerosVueloView(View):
         context = {'form': form, 'reporte_data': None}
 
         if form.is_valid():
-            vuelo_seleccionado = form.cleaned_data['vuelo']
-            reservas = Reserva.objects.filter(
-                vuelo=vuelo_seleccionado,
-                estado='confirmada'
-            ).order_by('asiento__numero')
-            
-            context['reporte_data'] = {
-                'vuelo': vuelo_seleccionado,
-                'pasajeros': [reserva.pasajero for reserva in reservas],
-                'reservas': reservas,
-            }
+            context['reporte_data'] = reporte_pasajeros(form.cleaned_data['vuelo'])
         
         return render(request, 'empleado/reporte_pasajeros_vuelo.html', context)
     
 
+@method_decorator(login_required, name='dispatch')
+@method_decorator(user_passes_test(es_empleado_o_admin), name='dispatch')
+class ExportarReservasView(View):
+    def get(self, request):
+        reservas = Reserva.objects.all()
+        estado = request.GET.get('estado')
+        if estado:
+            reservas = reservas.filter(estado=estado)
+        # Límites en la zona horaria local sobre la columna, así el filtro puede usar el índice
+        desde = parse_date(request.GET.get('desde') or '')
+        hasta = parse_date(request.GET.get('hasta') or '')
+        if desde:
+            reservas = reservas.filter(fecha_reserva__gte=timezone.make_aware(datetime.combine(desde, time.min)))
+        if hasta:
+            reservas = reservas.filter(
+                fecha_reserva__lt=timezone.make_aware(datetime.combine(hasta + timedelta(days=1), time.min)),
+            )
+
+        columnas, filas = exportar_reservas(reservas)
+        return respuesta_exportacion('Reservas', request.GET.get('formato'), columnas, filas)
+
+
+@method_decorator(login_required, name='dispatch')
+@method_decorator(user_passes_test(es_empleado_o_admin), name='dispatch')
+class ExportarPasajerosVueloView(View):
+    def get(self, request, vuelo_id):
+        vuelo = get_object_or_404(Vuelo, id=vuelo_id)
+        columnas, filas = exportar_pasajeros_vuelo(vuelo)
+        return respuesta_exportacion(f'Pasajeros-Vuelo-{vuelo.id}', request.GET.get('formato'), columnas, filas)
+
+
+@method_decorator(login_required, name='dispatch')
+@method_decorator(user_passes_test(es_empleado_o_admin), name='dispatch')
+class ExportarRecaudacionVuelosView(View):
+    def get(self, request):
+        columnas, filas = exportar_recaudacion_vuelos()
+        return respuesta_exportacion('Recaudacion-Vuelos', request.GET.get('formato'), columnas, filas)
+
+
+@method_decorator(login_required, name='dispatch')
+@method_decorator(user_passes_test(es_empleado_o_admin), name='dispatch')
+class DocumentosVueloView(View):
+    def get(self, request, vuelo_id):
+        vuelo = get_object_or_404(Vuelo.objects.select_related('avion'), id=vuelo_id)
+        # Un request no levanta procesos; el render en paralelo queda para el comando generar_documentos_vuelo
+        documentos = documentos_vuelo(vuelo, request.build_absolute_uri('/'), procesos=1)
+
+        response = StreamingHttpResponse(zip_en_streaming(documentos), content_type='application/zip')
+        response['Content-Disposition'] = f'attachment; filename="Vuelo-{vuelo.id}-documentos.zip"'
+        return response
+
+
 @method_decorator(login_required, name='dispatch')
 @method_decorator(user_passes_test(es_admin), name='dispatch')
 class GestionarUsuariosView(View):
     def get(self, request):
         User = get_user_model()
-        usuarios = User.objects.all().order_by('perfil', 'username')
+        usuarios = paginar_keyset(request, User.objects.all(), ['perfil', 'username'])
         return render(request, 'empleado/gestionar_usuarios.html', {'usuarios': usuarios})
 
     def post(self, request):